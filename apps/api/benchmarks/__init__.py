@@ -0,0 +1 @@
+"""Performance benchmarks for the Hanfani API and worker (run with python -m benchmarks.<name>)."""
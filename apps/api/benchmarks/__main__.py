@@ -0,0 +1,66 @@
+"""
+Run the benchmark suites and report ops/sec, p50/p99 latency and allocations.
+
+Usage:
+    python -m benchmarks                              # all suites, table
+    python -m benchmarks --suite api --suite parsers  # selected suites
+    python -m benchmarks --output results.json        # JSON report for later comparison
+    python -m benchmarks --compare results.json       # % change against a previous report
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks import bench_api, bench_parsers, bench_scraper, bench_worker
+from benchmarks.harness import Result, compare, metadata
+
+SUITES = {
+    "api": bench_api.run,
+    "parsers": bench_parsers.run,
+    "scraper": bench_scraper.run,
+    "worker": bench_worker.run,
+}
+
+
+def _print_table(results: list[Result]) -> None:
+    print(f"{'benchmark':<52} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'alloc KB/op':>12}")
+    for r in results:
+        print(
+            f"{r['name']:<52} {r['ops_per_s'] or 0:>10.1f} {r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f}"
+            f" {r['alloc_kb_per_op']:>12.1f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run Hanfani API benchmarks.")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="Suite to run (repeatable; default all)")
+    parser.add_argument("--iterations", type=int, help="Timed iterations per benchmark (default: per-suite)")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file")
+    parser.add_argument("--compare", type=Path, help="Previous JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    results: list[Result] = []
+    for name in args.suite or list(SUITES):
+        run = SUITES[name]
+        results.extend(run(args.iterations) if args.iterations else run())
+
+    report = {"meta": metadata(), "results": results}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    _print_table(results)
+
+    if args.compare:
+        print(f"\nvs {args.compare} (negative p50 = faster)")
+        for row in compare(results, args.compare):
+            print(
+                f"{row['name']:<52} p50 {row['p50_change_pct']:>+7.1f}%  ops {row['ops_change_pct']:>+7.1f}%"
+                f"  alloc {row['alloc_change_pct'] if row['alloc_change_pct'] is not None else 0:>+7.1f}%"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,85 @@
+"""API endpoint benchmarks through an in-process ASGI client and in-memory MongoDB."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+import httpx
+
+from benchmarks.data import COUNTRIES, mention_items, trend_items
+from benchmarks.harness import Result, abench
+from benchmarks.memory_mongo import MemoryDatabase, memory_mongo
+
+
+def _seed(database: MemoryDatabase) -> None:
+    """Write trends for every country through the real sync store, plus prefetched mentions."""
+    from services.mentions_store import save_mentions
+    from services.trends_store import save_trends
+
+    for code in COUNTRIES:
+        save_trends(code, trend_items(code), source="feed")
+        save_mentions(code, f"{code} topic 0", mention_items())
+
+
+async def _fake_fetch(topic: str, country: str, limit: int = 25) -> list[dict[str, Any]]:
+    """Stands in for SerpApi: instant, non-empty (so results are cached)."""
+    return mention_items(limit)
+
+
+async def _suite(iterations: int) -> list[Result]:
+    import main
+
+    results: list[Result] = []
+    saved_ttl = main.trends_cache.ttl
+    main.trends_cache.clear()
+    main.trends_response_cache.clear()
+    main.trends_search_index.clear()
+    main.trends_cluster_index.clear()
+    main.mentions_cache.clear()
+    try:
+        with memory_mongo() as database, patch("main.fetch_topic_mentions_async", _fake_fetch):
+            _seed(database)
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+                async def get(url: str) -> None:
+                    resp = await client.get(url)
+                    resp.raise_for_status()
+
+                results.append(await abench("api./status", "api", lambda: get("/status"), iterations))
+                results.append(await abench("api./trends cached", "api", lambda: get("/trends?country=US"), iterations))
+                batch = ",".join(COUNTRIES)
+                results.append(await abench(
+                    "api./trends/batch cached", "api", lambda: get(f"/trends/batch?countries={batch}"), iterations,
+                ))
+                results.append(await abench(
+                    "api./trends/search", "api", lambda: get("/trends/search?q=topic%201"), iterations,
+                ))
+                results.append(await abench("api./trends/global", "api", lambda: get("/trends/global"), iterations))
+                main.trends_cache.ttl = main.trends_response_cache.ttl = 0  # every request reads MongoDB
+                results.append(await abench(
+                    "api./trends uncached", "api", lambda: get("/trends?country=US"), iterations,
+                ))
+                results.append(await abench(
+                    "api./trends/mentions precomputed", "api",
+                    lambda: get("/trends/mentions?topic=US%20topic%200&country=US"), iterations,
+                ))
+                results.append(await abench(
+                    "api./trends/mentions cached", "api",
+                    lambda: get("/trends/mentions?topic=something%20else&country=US"), iterations,
+                ))
+    finally:
+        main.trends_cache.ttl = main.trends_response_cache.ttl = saved_ttl
+        main.trends_cache.clear()
+        main.trends_response_cache.clear()
+        main.trends_search_index.clear()
+        main.trends_cluster_index.clear()
+        main.mentions_cache.clear()
+    return results
+
+
+def run(iterations: int = 500) -> list[Result]:
+    """Benchmark /status, /trends and /trends/mentions."""
+    return asyncio.run(_suite(iterations))
@@ -0,0 +1,40 @@
+"""Parser benchmarks on large synthetic inputs."""
+
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from benchmarks.data import news_entry, trends_csv
+from benchmarks.harness import Result, bench
+from services.topic_mentions import _parse_news_entry, _parse_news_results
+from services.trends_scraper import _parse_trends_csv
+
+NEWS_ENTRIES = 2000
+CSV_ROWS = 5000
+
+
+def run(iterations: int = 200) -> list[Result]:
+    """Benchmark _parse_trends_csv, _parse_news_entry and _parse_news_results."""
+    results: list[Result] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "trends.csv"
+        path.write_text(trends_csv(CSV_ROWS), encoding="utf-8")
+        results.append(bench(
+            f"parsers._parse_trends_csv {CSV_ROWS} rows", "parsers", lambda: _parse_trends_csv(path), iterations,
+        ))
+
+    entries = [news_entry(i) for i in range(NEWS_ENTRIES)]
+
+    def parse_entries() -> None:
+        for i, entry in enumerate(entries):
+            _parse_news_entry(entry, i + 1)
+
+    results.append(bench(f"parsers._parse_news_entry x{NEWS_ENTRIES}", "parsers", parse_entries, iterations))
+
+    response = {"news_results": entries}
+    results.append(bench(
+        f"parsers._parse_news_results {NEWS_ENTRIES}", "parsers",
+        lambda: _parse_news_results(response, NEWS_ENTRIES), iterations,
+    ))
+    return results
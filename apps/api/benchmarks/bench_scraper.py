@@ -0,0 +1,230 @@
+"""
+DOM extraction benchmark against a saved copy of the trending page.
+
+Compares _extract_from_dom (one page.evaluate) with the previous per-cell
+inner_text extraction. Timings come only from a real Chromium page and are
+skipped when Playwright or the browser is missing. Offline, a fixture page
+answers both styles from the parsed HTML and only counts browser round trips
+(printed, not reported as timings: a simulated latency would just multiply
+the count).
+"""
+
+from __future__ import annotations
+
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any
+
+from benchmarks.harness import Result, bench
+from services.trends_scraper import LIMIT, TrendItem, _extract_from_dom
+
+FIXTURE = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "trending_page_us.html"
+
+
+class _TableParser(HTMLParser):
+    """Rows of <td> texts (first text line per cell) and explore-link texts from the fixture."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.rows: list[list[str]] = []
+        self.links: list[str] = []
+        self._row: list[str] | None = None
+        self._cell: list[str] | None = None
+        self._link: list[str] | None = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "tr":
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self._cell = []
+        elif tag == "a" and "/trends/explore" in (dict(attrs).get("href") or ""):
+            self._link = []
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "td" and self._cell is not None and self._row is not None:
+            self._row.append(self._cell[0] if self._cell else "")
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+        elif tag == "a" and self._link is not None:
+            self.links.append(self._link[0] if self._link else "")
+            self._link = None
+
+    def handle_data(self, data: str) -> None:
+        text = data.strip()
+        if not text:
+            return
+        if self._cell is not None:
+            self._cell.append(text)
+        if self._link is not None:
+            self._link.append(text)
+
+
+class FixturePage:
+    """Page stand-in over the parsed fixture that counts browser round trips (no timing)."""
+
+    def __init__(self, html: str) -> None:
+        parser = _TableParser()
+        parser.feed(html)
+        self._rows = parser.rows  # includes the header row (no <td>)
+        self._links = parser.links
+        self.roundtrips = 0
+
+    def _roundtrip(self) -> None:
+        self.roundtrips += 1
+
+    def _first_column(self, selector: str) -> list[str]:
+        if "explore" in selector:
+            return self._links
+        return [cells[0] for cells in self._rows if cells]
+
+    # Single-evaluate API
+    def evaluate(self, script: str, arg: Any = None) -> dict[str, Any]:
+        self._roundtrip()
+        selectors, limit = arg
+        rows = [cells[:3] for cells in self._rows[1:] if cells]
+        return {"rows": rows, "fallback": [self._first_column(s)[: limit * 2] for s in selectors]}
+
+    # Per-element API used by the legacy extraction
+    def get_by_role(self, role: str) -> _Locator:
+        return _Locator(self, [_Element(self, cells) for cells in self._rows])
+
+    def locator(self, selector: str) -> _Locator:
+        return _Locator(self, [_Element(self, [t]) for t in self._first_column(selector)])
+
+
+class _Locator:
+    def __init__(self, page: FixturePage, elements: list[_Element]) -> None:
+        self._page = page
+        self._elements = elements
+
+    def all(self) -> list[_Element]:
+        self._page._roundtrip()
+        return self._elements
+
+
+class _Element:
+    def __init__(self, page: FixturePage, cells: list[str]) -> None:
+        self._page = page
+        self._cells = cells
+
+    def locator(self, selector: str) -> _Locator:
+        return _Locator(self._page, [_Element(self._page, [c]) for c in self._cells])
+
+    def inner_text(self) -> str:
+        self._page._roundtrip()
+        return self._cells[0] if self._cells else ""
+
+
+def legacy_extract_from_dom(page) -> list[TrendItem]:
+    """
+    The previous _extract_from_dom, unchanged (before the single page.evaluate):
+    one inner_text round trip per cell, then per fallback element.
+    """
+    skip = {
+        "trends", "tendances", "export", "exporter", "search", "recherche",
+        "trend", "volume", "started", "démarrée", "tendances de recherche",
+        "search trends", "composition", "état",
+    }
+    best: list[TrendItem] = []
+    seen: set[str] = set()
+
+    def _add(title: str, volume: str = "", started: str = "") -> None:
+        if not title or title.lower() in skip or title in seen or not (2 < len(title) < 200):
+            return
+        seen.add(title)
+        item: TrendItem = {"title": title}
+        if volume:
+            item["search_volume"] = volume
+        if started:
+            item["started"] = started
+        best.append(item)
+
+    try:
+        # 1. Rows via get_by_role - extract all columns
+        rows = page.get_by_role("row").all()
+        for row in rows[1:]:  # Skip header row
+            try:
+                cells = row.locator("td").all()
+                if len(cells) >= 1:
+                    title = cells[0].inner_text().strip().split("\n")[0].strip()
+                    volume = cells[1].inner_text().strip().split("\n")[0].strip() if len(cells) > 1 else ""
+                    started = cells[2].inner_text().strip().split("\n")[0].strip() if len(cells) > 2 else ""
+                    _add(title, volume, started)
+            except Exception:
+                pass
+            if len(best) >= LIMIT:
+                break
+
+        # 2. Fallback: first column only (no volume/started)
+        if len(best) < 5:
+            for sel in [
+                "tr[role='row'] td:first-child",
+                "[role='row'] td:first-child",
+                "table td:first-child",
+                "a[href*='/trends/explore']",
+            ]:
+                try:
+                    for el in page.locator(sel).all()[:LIMIT * 2]:
+                        try:
+                            raw = el.inner_text().strip()
+                            title = raw.split("\n")[0].strip() if raw else ""
+                            _add(title)
+                        except Exception:
+                            continue
+                    if len(best) >= LIMIT:
+                        break
+                except Exception:
+                    continue
+    except Exception:
+        pass
+
+    return best[:LIMIT]
+
+
+def _roundtrips(page: FixturePage, extract: Any) -> int:
+    page.roundtrips = 0
+    extract(page)
+    return page.roundtrips
+
+
+def roundtrips(html: str) -> dict[str, int]:
+    """Browser round trips each extraction makes on the fixture page."""
+    page = FixturePage(html)
+    return {
+        "_extract_from_dom": _roundtrips(page, _extract_from_dom),
+        "per-cell extraction": _roundtrips(page, legacy_extract_from_dom),
+    }
+
+
+def _chromium(html: str, iterations: int) -> list[Result]:
+    """Both extractions timed in a real Chromium page; [] when Playwright or the browser is missing."""
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        print("Skipping scraper timings: Playwright is not installed")
+        return []
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch()
+            try:
+                page = browser.new_page()
+                page.set_content(html)
+                return [
+                    bench("scraper._extract_from_dom", "scraper", lambda: _extract_from_dom(page), iterations),
+                    bench("scraper.per-cell extraction", "scraper", lambda: legacy_extract_from_dom(page), iterations),
+                ]
+            finally:
+                browser.close()
+    except Exception as e:
+        print(f"Skipping scraper timings: Chromium unavailable ({type(e).__name__})")
+        return []
+
+
+def run(iterations: int = 50) -> list[Result]:
+    """Print round trips on the saved trending page, and time both extractions in Chromium when installed."""
+    html = FIXTURE.read_text(encoding="utf-8")
+    counts = ", ".join(f"{name} {n}" for name, n in roundtrips(html).items())
+    print(f"scraper round trips on {FIXTURE.name}: {counts}")
+    return _chromium(html, iterations)
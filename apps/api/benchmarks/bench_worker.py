@@ -0,0 +1,36 @@
+"""Worker pipeline benchmark: worker.run against a fake trends source and in-memory MongoDB."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import os
+from typing import Any
+from unittest.mock import patch
+
+from benchmarks.data import COUNTRIES, trend_items
+from benchmarks.harness import Result, bench
+from benchmarks.memory_mongo import memory_mongo
+
+
+def _fake_source(country: str, client: object | None = None, scraper: object | None = None) -> tuple[list[dict[str, Any]], str]:
+    """Stands in for get_trending_topics: no network, no browser."""
+    return trend_items(country), "feed"
+
+
+def run(iterations: int = 20) -> list[Result]:
+    """Benchmark a full worker.run over all benchmark countries, serial and with 4 lanes."""
+    import worker
+
+    results: list[Result] = []
+    env = {"TRENDS_COUNTRIES": ",".join(COUNTRIES), "TRENDS_PREFETCH_MENTIONS": "0"}
+    with memory_mongo(), patch.dict(os.environ, env), patch("worker.get_trending_topics", _fake_source):
+        for concurrency in (1, 4):
+            def once(concurrency: int = concurrency) -> None:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    worker.run(concurrency=concurrency)
+
+            results.append(bench(
+                f"worker.run {len(COUNTRIES)} countries concurrency={concurrency}", "worker", once, iterations, warmup=1,
+            ))
+    return results
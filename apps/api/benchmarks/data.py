@@ -0,0 +1,50 @@
+"""Deterministic synthetic inputs for the benchmark suites."""
+
+from __future__ import annotations
+
+from typing import Any
+
+COUNTRIES = ["US", "GB", "FR", "DE", "IN", "JP", "BR", "CA", "AU", "ES", "IT", "MX", "NL", "PL", "TR", "KR"]
+
+
+def trend_items(country: str, n: int = 25) -> list[dict[str, Any]]:
+    """A full page of trending topics as the feed/scraper return them."""
+    return [
+        {"title": f"{country} topic {i}", "search_volume": f"{(n - i) * 10}K+", "started": f"{i + 1} hours ago"}
+        for i in range(n)
+    ]
+
+
+def news_entry(i: int) -> dict[str, Any]:
+    """One SerpApi Google News result."""
+    return {
+        "position": i + 1,
+        "title": f"  Headline number {i} about the trending topic  ",
+        "snippet": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 3,
+        "link": f"https://news.example.com/article/{i}",
+        "source": {"name": f"Outlet {i % 40}", "authors": [f"Author {i % 7}", f"Author {i % 11}"]},
+        "date": "01/15/2026, 08:00 AM, +0000 UTC",
+        "iso_date": "2026-01-15T08:00:00Z",
+        "thumbnail": f"https://img.example.com/{i}.jpg",
+    }
+
+
+def mention_items(n: int = 25) -> list[dict[str, Any]]:
+    """Parsed mentions as stored in the mentions collections."""
+    return [
+        {"title": f"Headline {i}", "source": f"Outlet {i}", "source_type": "news",
+         "link": f"https://news.example.com/{i}", "position": i + 1}
+        for i in range(n)
+    ]
+
+
+def trends_csv(rows: int = 5000, distinct: int = 25) -> str:
+    """
+    A large export CSV: header and comment noise plus many duplicate rows, with
+    the distinct titles spread to the end so the parser walks the whole file.
+    """
+    lines = ["# Trending searches export", "Trends,Search volume,Started", "Export,,"]
+    for i in range(rows):
+        title = f"Topic {i * distinct // rows}"
+        lines.append(f'"{title}",{(i % 50) + 1}K+,{i % 24} hours ago')
+    return "\n".join(lines) + "\n"
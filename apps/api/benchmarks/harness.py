@@ -0,0 +1,152 @@
+"""Timing, allocation and comparison helpers shared by the benchmark suites."""
+
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+Result = dict[str, Any]
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _summary(name: str, group: str, timings: list[float], peaks: list[int], retained: int) -> Result:
+    timings.sort()
+    total = sum(timings)
+    return {
+        "name": name,
+        "group": group,
+        "iterations": len(timings),
+        "ops_per_s": round(len(timings) / total, 1) if total else None,
+        "mean_ms": round(statistics.fmean(timings) * 1000, 4),
+        "p50_ms": round(_percentile(timings, 50) * 1000, 4),
+        "p99_ms": round(_percentile(timings, 99) * 1000, 4),
+        "alloc_kb_per_op": round(statistics.fmean(peaks) / 1024, 2),
+        "retained_kb_per_op": round(retained / len(peaks) / 1024, 2),
+    }
+
+
+def bench(name: str, group: str, fn: Callable[[], Any], iterations: int, warmup: int = 3) -> Result:
+    """
+    Time `fn` over `iterations` calls, then measure its allocations.
+
+    Timing and allocation tracking run separately: tracemalloc slows every
+    allocation, which would distort the latency numbers. alloc_kb_per_op is the
+    mean peak of memory allocated during one call; retained_kb_per_op is what
+    stays allocated afterwards (caches, leaks).
+    """
+    for _ in range(warmup):
+        fn()
+    timings: list[float] = []
+    gc.collect()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    peaks: list[int] = []
+    tracemalloc.start()
+    try:
+        start_size = tracemalloc.get_traced_memory()[0]
+        for _ in range(_alloc_ops(iterations)):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        retained = tracemalloc.get_traced_memory()[0] - start_size
+    finally:
+        tracemalloc.stop()
+    return _summary(name, group, timings, peaks, retained)
+
+
+async def abench(
+    name: str,
+    group: str,
+    fn: Callable[[], Awaitable[Any]],
+    iterations: int,
+    warmup: int = 3,
+) -> Result:
+    """Async counterpart of bench: awaits `fn()` on the running event loop."""
+    for _ in range(warmup):
+        await fn()
+    timings: list[float] = []
+    gc.collect()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - start)
+
+    peaks: list[int] = []
+    tracemalloc.start()
+    try:
+        start_size = tracemalloc.get_traced_memory()[0]
+        for _ in range(_alloc_ops(iterations)):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            await fn()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        retained = tracemalloc.get_traced_memory()[0] - start_size
+    finally:
+        tracemalloc.stop()
+    return _summary(name, group, timings, peaks, retained)
+
+
+def _alloc_ops(iterations: int) -> int:
+    """Calls traced for allocations (bounded: tracing is slow)."""
+    return max(1, min(iterations, 20))
+
+
+def metadata() -> dict[str, Any]:
+    """Environment recorded next to the results so runs can be compared fairly."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def compare(current: list[Result], baseline_path: Path) -> list[dict[str, Any]]:
+    """Relative change of p50 and ops/sec against a previous JSON report (negative p50 % is faster)."""
+    baseline = {r["name"]: r for r in json.loads(baseline_path.read_text())["results"]}
+    rows = []
+    for r in current:
+        old = baseline.get(r["name"])
+        if not old:
+            continue
+        rows.append({
+            "name": r["name"],
+            "p50_change_pct": _pct(old["p50_ms"], r["p50_ms"]),
+            "ops_change_pct": _pct(old["ops_per_s"], r["ops_per_s"]),
+            "alloc_change_pct": _pct(old["alloc_kb_per_op"], r["alloc_kb_per_op"]),
+        })
+    return rows
+
+
+def _pct(old: float | None, new: float | None) -> float | None:
+    if not old or new is None:
+        return None
+    return round((new - old) / old * 100, 1)
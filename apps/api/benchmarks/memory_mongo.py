@@ -0,0 +1,234 @@
+"""
+In-memory stand-in for the MongoDB collections the API and worker use.
+
+Supports just the query and update operators the stores issue (equality,
+$in/$gt/$gte/$lt/$lte, $and/$or, $set with dotted paths, $unset, $inc,
+projections, sort and limit), with a sync and an asyncio facade over the same
+data so worker writes are visible to API reads. Returned documents are deep
+copies, like decoded BSON. Writes are atomic per call (one lock per collection)
+and an upsert colliding with an existing _id raises DuplicateKeyError, as in
+MongoDB, so lease claims can be exercised from several threads.
+"""
+
+from __future__ import annotations
+
+import copy
+import itertools
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+_ids = itertools.count(1)
+
+_COMPARISONS = {
+    "$in": lambda value, arg: value in arg,
+    "$gt": lambda value, arg: value is not None and value > arg,
+    "$gte": lambda value, arg: value is not None and value >= arg,
+    "$lt": lambda value, arg: value is not None and value < arg,
+    "$lte": lambda value, arg: value is not None and value <= arg,
+}
+
+
+def _matches(doc: dict[str, Any], query: dict[str, Any]) -> bool:
+    for field, cond in query.items():
+        if field == "$and":
+            if not all(_matches(doc, q) for q in cond):
+                return False
+            continue
+        if field == "$or":
+            if not any(_matches(doc, q) for q in cond):
+                return False
+            continue
+        value = doc.get(field)
+        if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+            if not all(_COMPARISONS[op](value, arg) for op, arg in cond.items()):
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _project(doc: dict[str, Any], projection: dict[str, Any] | None) -> dict[str, Any]:
+    out = copy.deepcopy(doc)
+    if not projection:
+        return out
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        out = {k: v for k, v in out.items() if k in include or k == "_id"}
+    else:
+        out = {k: v for k, v in out.items() if projection.get(k, 1)}
+    if not projection.get("_id", 1):
+        out.pop("_id", None)
+    return out
+
+
+def _apply_update(doc: dict[str, Any], update: dict[str, Any]) -> None:
+    for path, value in update.get("$set", {}).items():
+        *parents, leaf = path.split(".")
+        target = doc
+        for key in parents:
+            target = target.setdefault(key, {})
+        target[leaf] = copy.deepcopy(value)
+    for path in update.get("$unset", {}):
+        doc.pop(path, None)
+    for path, amount in update.get("$inc", {}).items():
+        doc[path] = doc.get(path, 0) + amount
+
+
+class MemoryCollection:
+    """Synchronous collection backed by a list of dicts."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.docs: list[dict[str, Any]] = []
+        self._lock = threading.RLock()
+
+    def _first(self, query: dict[str, Any]) -> dict[str, Any] | None:
+        return next((d for d in self.docs if _matches(d, query)), None)
+
+    def find_one(self, query: dict[str, Any], projection: dict[str, Any] | None = None) -> dict[str, Any] | None:
+        with self._lock:
+            doc = self._first(query)
+            return None if doc is None else _project(doc, projection)
+
+    def find(
+        self,
+        query: dict[str, Any],
+        projection: dict[str, Any] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int = 0,
+        batch_size: int = 0,
+    ) -> MemoryCursor:
+        with self._lock:
+            docs = [d for d in self.docs if _matches(d, query)]
+            for field, direction in reversed(sort or []):
+                docs.sort(key=lambda d: d.get(field), reverse=direction < 0)
+            if limit:
+                docs = docs[:limit]
+            return MemoryCursor([_project(d, projection) for d in docs])
+
+    def insert_one(self, doc: dict[str, Any]) -> None:
+        doc.setdefault("_id", next(_ids))
+        with self._lock:
+            self.docs.append(copy.deepcopy(doc))
+
+    def update_one(self, query: dict[str, Any], update: dict[str, Any], upsert: bool = False) -> SimpleNamespace:
+        with self._lock:
+            matched = self._first(query) is not None
+            self.find_one_and_update(query, update, upsert=upsert)
+        return SimpleNamespace(matched_count=int(matched))
+
+    def find_one_and_update(
+        self,
+        query: dict[str, Any],
+        update: dict[str, Any],
+        projection: dict[str, Any] | None = None,
+        upsert: bool = False,
+        return_document: bool = ReturnDocument.BEFORE,
+    ) -> dict[str, Any] | None:
+        with self._lock:
+            doc = self._first(query)
+            before = None if doc is None else _project(doc, projection)
+            if doc is None:
+                if not upsert:
+                    return None
+                doc = {k: v for k, v in query.items() if not k.startswith("$") and not isinstance(v, dict)}
+                if "_id" in doc and self._first({"_id": doc["_id"]}) is not None:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} _id: {doc['_id']!r}")
+                doc.setdefault("_id", next(_ids))
+                self.docs.append(doc)
+            _apply_update(doc, update)
+            return _project(doc, projection) if return_document == ReturnDocument.AFTER else before
+
+    def replace_one(self, query: dict[str, Any], replacement: dict[str, Any], upsert: bool = False) -> None:
+        doc = self._first(query)
+        if doc is None:
+            if upsert:
+                self.insert_one({**{k: v for k, v in query.items() if not isinstance(v, dict)}, **replacement})
+            return
+        _id = doc.get("_id")
+        doc.clear()
+        doc.update(copy.deepcopy(replacement), _id=_id)
+
+    def create_index(self, *args: Any, **kwargs: Any) -> str:
+        return "memory"
+
+
+class MemoryCursor:
+    """Cursor over precomputed results; iterable both sync and async."""
+
+    def __init__(self, docs: list[dict[str, Any]]) -> None:
+        self._docs = iter(docs)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self._docs
+
+    def __aiter__(self) -> MemoryCursor:
+        return self
+
+    async def __anext__(self) -> dict[str, Any]:
+        try:
+            return next(self._docs)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+class AsyncMemoryCollection:
+    """Asyncio facade over a MemoryCollection (same data)."""
+
+    def __init__(self, sync: MemoryCollection) -> None:
+        self._sync = sync
+        self.name = sync.name
+
+    def find(self, *args: Any, **kwargs: Any) -> MemoryCursor:
+        return self._sync.find(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._sync, name)
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return method(*args, **kwargs)
+
+        return call
+
+
+class MemoryDatabase:
+    """Dict of named collections with a sync and an async view."""
+
+    def __init__(self) -> None:
+        self.collections: dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self.collections:
+            self.collections[name] = MemoryCollection(name)
+        return self.collections[name]
+
+    def command(self, *args: Any, **kwargs: Any) -> dict[str, Any]:
+        return {"ok": 1}
+
+    @property
+    def async_view(self) -> _AsyncDatabase:
+        return _AsyncDatabase(self)
+
+
+class _AsyncDatabase:
+    def __init__(self, db: MemoryDatabase) -> None:
+        self._db = db
+
+    def __getitem__(self, name: str) -> AsyncMemoryCollection:
+        return AsyncMemoryCollection(self._db[name])
+
+
+@contextmanager
+def memory_mongo() -> Iterator[MemoryDatabase]:
+    """Route db.get_db / db.get_async_db (and every collection getter) to one in-memory database."""
+    database = MemoryDatabase()
+    with patch("db.get_db", return_value=database), \
+            patch("db.get_async_db", return_value=database.async_view):
+        yield database
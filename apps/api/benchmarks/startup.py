@@ -0,0 +1,91 @@
+"""
+Cold-start benchmark: import time and resident memory of `main` and `worker`.
+
+Each run imports the module in a fresh interpreter, so nothing is cached
+between samples. Reports the median and worst import time, peak RSS, and which
+heavy optional dependencies ended up imported (they should stay lazy).
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+API_DIR = Path(__file__).resolve().parent.parent
+
+MODULES = ("main", "worker")
+
+# Imported on demand only (scraper, pytrends and SerpApi tiers)
+HEAVY_MODULES = ("pandas", "pytrends", "requests", "playwright")
+
+# Runs in the child interpreter; prints one JSON line
+_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "import_s": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure(module: str) -> dict[str, Any]:
+    """Import `module` once in a fresh interpreter and return its sample."""
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=API_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(runs: int = 5, modules: tuple[str, ...] = MODULES) -> dict[str, dict[str, Any]]:
+    """Benchmark each module `runs` times and summarize."""
+    results: dict[str, dict[str, Any]] = {}
+    for module in modules:
+        samples = [measure(module) for _ in range(runs)]
+        times = [s["import_s"] * 1000 for s in samples]
+        results[module] = {
+            "runs": runs,
+            "import_ms_median": round(statistics.median(times), 1),
+            "import_ms_max": round(max(times), 1),
+            "max_rss_mb": round(max(s["max_rss_mb"] for s in samples), 1),
+            "heavy_modules": samples[-1]["heavy"],
+        }
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure cold-start import time and RSS of main and worker.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module (default 5)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(max(1, args.runs))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for module, r in results.items():
+        heavy = ", ".join(r["heavy_modules"]) or "none"
+        print(
+            f"{module:<8} import {r['import_ms_median']:>7.1f} ms (max {r['import_ms_max']:.1f})"
+            f"  rss {r['max_rss_mb']:>6.1f} MB  heavy deps: {heavy}"
+        )
+
+
+if __name__ == "__main__":
+    main()
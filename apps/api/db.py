@@ -3,8 +3,12 @@
 from __future__ import annotations
 
 import os
+import threading
 
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient, monitoring
+from pymongo.errors import OperationFailure
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.collection import Collection
 from pymongo.database import Database
 
@@ -12,11 +16,172 @@ MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
 DB_NAME = os.getenv("MONGODB_DB", "hanfani")
 # Fail fast if MongoDB unreachable (default 30s can cause frontend "signal timed out")
 MONGODB_TIMEOUT_MS = int(os.getenv("MONGODB_TIMEOUT_MS", "5000"))
+# Connection pool sizing (shared by every request / worker call in the process)
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "50"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+MONGODB_MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000"))
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "2000"))
+# Worker-prefetched mentions older than this are dropped by a TTL index
+MENTIONS_PREFETCH_TTL_S = int(os.getenv("MENTIONS_PREFETCH_TTL_S", "172800"))
+# Trends snapshots (history) older than this are dropped by a TTL index
+TRENDS_HISTORY_RETENTION_DAYS = float(os.getenv("TRENDS_HISTORY_RETENTION_DAYS", "90"))
+# Worker run reports older than this are dropped by a TTL index
+WORKER_RUNS_RETENTION_DAYS = float(os.getenv("WORKER_RUNS_RETENTION_DAYS", "30"))
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters collected from pymongo CMAP events."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero all counters."""
+        with self._lock:
+            self.open = 0
+            self.checked_out = 0
+            self.waiting = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.waits = 0
+            self.wait_time_ms = 0.0
+
+    def snapshot(self) -> dict[str, int | float]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            return {
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "waits": self.waits,
+                "wait_time_ms": round(self.wait_time_ms, 3),
+                "max_pool_size": MONGODB_MAX_POOL_SIZE,
+            }
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self._lock:
+            self.open = max(0, self.open - 1)
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        with self._lock:
+            self.waiting += 1
+            # Every slot taken: this checkout has to wait for a connection to be returned
+            if self.checked_out >= MONGODB_MAX_POOL_SIZE:
+                self.waits += 1
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        with self._lock:
+            self.waiting = max(0, self.waiting - 1)
+            self.checked_out += 1
+            self.checkouts += 1
+            duration = getattr(event, "duration", None)
+            if duration:
+                self.wait_time_ms += duration * 1000
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        with self._lock:
+            self.waiting = max(0, self.waiting - 1)
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    # Unused CMAP events (required by the listener interface)
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+
+pool_stats = PoolStats()
+
+_client: MongoClient | None = None
+_client_lock = threading.Lock()
+_async_client: AsyncMongoClient | None = None
+
+
+def _client_options() -> dict:
+    """Connection and pool options shared by the sync and async clients."""
+    return {
+        "serverSelectionTimeoutMS": MONGODB_TIMEOUT_MS,
+        "maxPoolSize": MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": MONGODB_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGODB_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        "event_listeners": [pool_stats],
+    }
 
 
 def get_client() -> MongoClient:
-    """Get MongoDB client (creates new connection)."""
-    return MongoClient(MONGODB_URI, serverSelectionTimeoutMS=MONGODB_TIMEOUT_MS)
+    """
+    Get the shared MongoDB client (created lazily on first use).
+
+    MongoClient is thread-safe and owns its own connection pool, so one
+    instance is reused for the whole process instead of reconnecting per call.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MongoClient(MONGODB_URI, **_client_options())
+    return _client
+
+
+def open_client() -> MongoClient:
+    """Create the shared client eagerly (app startup / worker start)."""
+    return get_client()
+
+
+def close_client() -> None:
+    """Close the shared client and its pool (app shutdown / worker exit)."""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
+
+
+def get_async_client() -> AsyncMongoClient:
+    """
+    Get the shared asyncio MongoDB client (created lazily on first use).
+
+    Bound to the running event loop, so the API opens it in its lifespan.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncMongoClient(MONGODB_URI, **_client_options())
+    return _async_client
+
+
+async def close_async_client() -> None:
+    """Close the shared asyncio client and its pool."""
+    global _async_client
+    client, _async_client = _async_client, None
+    if client is not None:
+        await client.close()
+
+
+def get_pool_stats() -> dict[str, int | float]:
+    """Get connection pool stats (open, checked out, waiting, waits, ...)."""
+    return pool_stats.snapshot()
 
 
 def get_db() -> Database:
@@ -27,3 +192,105 @@ def get_db() -> Database:
 def get_trends_collection() -> Collection:
     """Get trends collection."""
     return get_db()["trends"]
+
+
+def get_trends_meta_collection() -> Collection:
+    """Get trends metadata collection (holds the trends version document)."""
+    return get_db()["trends_meta"]
+
+
+def get_mentions_cache_collection() -> Collection:
+    """Get SerpApi mentions response cache collection (TTL-expired)."""
+    return get_db()["mentions_cache"]
+
+
+def get_mentions_collection() -> Collection:
+    """Get worker-prefetched mentions collection (one document per country and topic)."""
+    return get_db()["mentions"]
+
+
+def get_trends_changes_collection() -> Collection:
+    """Get trends changes collection (latest refresh-over-refresh delta per country)."""
+    return get_db()["trends_changes"]
+
+
+def get_worker_runs_collection() -> Collection:
+    """Get worker run reports collection (one document per worker run)."""
+    return get_db()["worker_runs"]
+
+
+def get_worker_leases_collection() -> Collection:
+    """Get per-country worker leases collection (coordinates distributed workers; _id is the country)."""
+    return get_db()["worker_leases"]
+
+
+def get_trends_snapshots_collection() -> Collection:
+    """Get append-only trends history collection (one document per save_trends)."""
+    return get_db()["trends_snapshots"]
+
+
+def ensure_indexes() -> None:
+    """Create indexes the app relies on (idempotent; called at API and worker startup)."""
+    _ensure_ttl_index(get_mentions_cache_collection(), "expires_at", 0)
+    mentions = get_mentions_collection()
+    mentions.create_index([("country", 1), ("topic", 1)], unique=True)
+    _ensure_ttl_index(mentions, "fetched_at", MENTIONS_PREFETCH_TTL_S)
+    get_trends_changes_collection().create_index("country", unique=True)
+    snapshots = get_trends_snapshots_collection()
+    snapshots.create_index([("country", 1), ("fetched_at", -1)])
+    _ensure_ttl_index(snapshots, "fetched_at", int(TRENDS_HISTORY_RETENTION_DAYS * 86400))
+    _ensure_ttl_index(get_worker_runs_collection(), "started_at", int(WORKER_RUNS_RETENTION_DAYS * 86400))
+
+
+def _ensure_ttl_index(coll: Collection, field: str, seconds: int) -> None:
+    """Create a TTL index, or update expireAfterSeconds if it exists with another value."""
+    try:
+        coll.create_index(field, expireAfterSeconds=seconds)
+    except OperationFailure as e:
+        if e.code not in (85, 86):  # IndexOptionsConflict / IndexKeySpecsConflict
+            raise
+        coll.database.command(
+            "collMod",
+            coll.name,
+            index={"keyPattern": {field: 1}, "expireAfterSeconds": seconds},
+        )
+
+
+def get_async_db() -> AsyncDatabase:
+    """Get database instance on the asyncio client."""
+    return get_async_client()[DB_NAME]
+
+
+def get_async_trends_collection() -> AsyncCollection:
+    """Get trends collection on the asyncio client."""
+    return get_async_db()["trends"]
+
+
+def get_async_trends_meta_collection() -> AsyncCollection:
+    """Get trends metadata collection on the asyncio client."""
+    return get_async_db()["trends_meta"]
+
+
+def get_async_mentions_cache_collection() -> AsyncCollection:
+    """Get SerpApi mentions response cache collection on the asyncio client."""
+    return get_async_db()["mentions_cache"]
+
+
+def get_async_mentions_collection() -> AsyncCollection:
+    """Get worker-prefetched mentions collection on the asyncio client."""
+    return get_async_db()["mentions"]
+
+
+def get_async_trends_snapshots_collection() -> AsyncCollection:
+    """Get trends history collection on the asyncio client."""
+    return get_async_db()["trends_snapshots"]
+
+
+def get_async_trends_changes_collection() -> AsyncCollection:
+    """Get trends changes collection on the asyncio client."""
+    return get_async_db()["trends_changes"]
+
+
+def get_async_worker_runs_collection() -> AsyncCollection:
+    """Get worker run reports collection on the asyncio client."""
+    return get_async_db()["worker_runs"]
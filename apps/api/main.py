@@ -1,15 +1,100 @@
 """Hanfani AI FastAPI application entry point."""
 
+import hashlib
+import json
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Literal
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
-from services.topic_mentions import fetch_topic_mentions
-from services.trends_store import get_trends_from_db
+from db import close_async_client, close_client, ensure_indexes, get_async_client, get_pool_stats, open_client
+from services import metrics
+from services.mentions_cache import MentionsCache
+from services.http_client import close_async_http_client, get_async_http_client
+from services.mentions_store_async import get_mentions_from_db
+from services.topic_mentions import API_LIMIT, fetch_topic_mentions_async
+from services.trends_cache import TrendsCache
+from services.trends_normalize import select_topics
+from services.trends_clusters import TrendsClusterIndex
+from services.trends_search import TrendsSearchIndex
+from services.trends_store import trends_etag
+from models import TrendsDocument, TrendsResponse
+from services.trends_store_async import (
+    get_trends_changes,
+    get_trends_for_countries,
+    get_trends_from_db,
+    get_trends_cluster_entries,
+    get_trends_response,
+    get_trends_search_entries,
+    get_trends_versions,
+    iter_trends_history,
+)
+from services.worker_runs_store_async import get_worker_runs
+
+# Per-process cache in front of MongoDB for /trends (invalidated via the trends version document)
+trends_cache: TrendsCache[TrendsDocument] = TrendsCache.from_env()
+
+# Same, for the pre-serialized /trends bodies (JSON, gzip, brotli) written by save_trends
+trends_response_cache: TrendsCache[TrendsResponse] = TrendsCache.from_env()
+
+# In-memory mirror of the title token index for /trends/search (reloads only changed countries)
+trends_search_index = TrendsSearchIndex(poll_interval=float(os.getenv("TRENDS_CACHE_POLL_S", "5")))
+# In-memory LSH index grouping near-duplicate titles across countries for /trends/global
+trends_cluster_index = TrendsClusterIndex(
+    poll_interval=float(os.getenv("TRENDS_CACHE_POLL_S", "5")),
+    threshold=float(os.getenv("TRENDS_GLOBAL_SIMILARITY", "0.5")),
+)
+
+# Content-codings of stored /trends bodies, in server preference order
+RESPONSE_ENCODINGS = ("br", "gzip", "identity")
+
+# Memory + MongoDB (TTL) cache in front of SerpApi for /trends/mentions
+mentions_cache = MentionsCache.from_env()
+
+# Upper bound on countries per /trends/batch request
+BATCH_MAX_COUNTRIES = 50
+
+# Upper bound on topics per /trends page
+TRENDS_MAX_LIMIT = 100
+
+# Upper bound on matches per /trends/search request
+SEARCH_MAX_LIMIT = 200
+
+# Upper bound on clusters per /trends/global request
+GLOBAL_MAX_LIMIT = 200
+
+# Upper bound on snapshots per /trends/history request
+HISTORY_MAX_LIMIT = 1000
+
+# Upper bound on reports per /worker/runs request
+WORKER_RUNS_MAX_LIMIT = 100
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Open the shared MongoDB and HTTP clients on startup and close their pools on shutdown."""
+    open_client()
+    get_async_client()
+    get_async_http_client()
+    try:
+        ensure_indexes()
+    except Exception:
+        pass  # MongoDB unreachable at startup: reads fall back until it is back
+    try:
+        yield
+    finally:
+        await close_async_http_client()
+        await close_async_client()
+        close_client()
 
-app = FastAPI(title="Hanfani AI API", version="0.1.0")
+
+app = FastAPI(title="Hanfani AI API", version="0.1.0", lifespan=lifespan)
 
 # CORS: allow web app (different origin/port) to call /status and other endpoints
 _allowed_origins = os.getenv("CORS_ORIGINS", "http://localhost:3004,http://localhost:3000,http://localhost:3003").split(",")
@@ -21,6 +106,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency, status and in-flight metrics for /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
 
 @app.get("/health")
 def health_check() -> dict[str, str]:
@@ -36,42 +124,334 @@ def status() -> dict:
         "service": "hanfani-api",
         "version": "0.1.0",
         "timestamp": datetime.now(timezone.utc).isoformat(),
+        "db_pool": get_pool_stats(),
+        "trends_cache": trends_cache.stats(),
+        "trends_response_cache": trends_response_cache.stats(),
+        "trends_search_index": trends_search_index.stats(),
+        "trends_cluster_index": trends_cluster_index.stats(),
+        "mentions_cache": mentions_cache.stats(),
     }
 
 
-@app.get("/trends")
-def trends(country: str = "US") -> dict:
+@app.get("/metrics", response_model=None)
+def prometheus_metrics() -> Response:
+    """
+    Prometheus metrics in text exposition format.
+
+    Covers per-route request latency and in-flight counts, trends store
+    durations, SerpApi latency and errors by engine, and scraper outcomes.
+    Values are in-process: each API replica (and the worker) reports its own.
+    """
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/trends", response_model=None)
+async def trends(
+    request: Request,
+    response: Response,
+    country: str = "US",
+    sort: Literal["rank", "volume", "started"] = "rank",
+    min_volume: int | None = Query(None, ge=0),
+    limit: int | None = Query(None, ge=1, le=TRENDS_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+) -> dict | Response:
     """
     Get top trending topics for a specific country.
 
     Reads from MongoDB only (populated by worker). Never runs scraper in request path
     to avoid timeouts. If DB is empty or unreachable, returns empty list immediately.
+    The read is awaited on the event loop, so concurrent requests don't queue for
+    threadpool slots, and repeat requests are served from the in-process trends cache.
+
+    DB responses carry a strong ETag (content hash of the stored topics) and a
+    Last-Modified header (fetched_at). Matching If-None-Match / If-Modified-Since
+    requests get an empty 304 instead of the payload.
+
+    The body is the JSON that save_trends encoded at write time, sent as stored
+    bytes in the best Content-Encoding the client accepts (br, gzip or none);
+    documents written before that fall back to building the payload here.
+
+    sort / min_volume / limit / offset are applied on the server to the volume
+    and started_at that save_trends parsed from the display strings; such
+    views are built per request and get their own ETag.
 
     Args:
         country: ISO 3166-1 alpha-2 country code (e.g. US, GB, FR). Defaults to US.
+        sort: "rank" (as listed by Google), "volume" (highest first) or "started" (newest first).
+        min_volume: Only topics with at least this many approximate searches.
+        limit: Max topics returned (1-100). Defaults to all.
+        offset: Topics to skip after sorting and filtering.
 
     Returns:
         JSON with country, topics, source (db or fallback), and fetched_at.
     """
-    if not country or not country.strip():
-        raise HTTPException(status_code=400, detail="Country code is required")
-    code = country.strip().upper()
-    if len(code) != 2 or not code.isalpha():
-        raise HTTPException(status_code=400, detail=f"Invalid country code: {country}. Use ISO 3166-1 alpha-2 (e.g. US, GB).")
+    code = _validate_country(country)
+    view = None if (sort, min_volume, limit, offset) == ("rank", None, None, 0) else (sort, min_volume, limit, offset)
 
     try:
-        doc = get_trends_from_db(code)
+        if view is None:
+            stored = await trends_response_cache.get(code, get_trends_response, get_trends_versions)
+            if stored is not None:
+                return _stored_trends_response(request, stored)
+        doc = await trends_cache.get(code, get_trends_from_db, get_trends_versions)
         if doc and doc.topics:
-            return {
-                "country": doc.country,
-                "topics": doc.topics,
-                "source": "db",
-                "fetched_at": doc.fetched_at.isoformat(),
-            }
+            etag = trends_etag(doc.topics_hash, doc.fetched_at) if doc.topics_hash else None
+            if view and etag:
+                etag = _view_etag(etag, view)
+            headers = _validator_headers(etag, doc.fetched_at)
+            if _is_not_modified(request, etag, doc.fetched_at):
+                return Response(status_code=304, headers=headers)
+            response.headers.update(headers)
+            payload = _trends_payload(code, doc)
+            if view is not None:
+                payload["topics"] = select_topics(doc.topics, doc.fetched_at, sort, min_volume, limit, offset)
+            return payload
     except Exception:
         pass  # DB unreachable - return empty immediately (no slow scraper)
 
     # No data in DB - return empty immediately; worker populates DB in background
+    return _trends_payload(code, None)
+
+
+@app.get("/trends/batch")
+async def trends_batch(countries: str) -> dict:
+    """
+    Get top trending topics for several countries in one request.
+
+    All countries are read with a single MongoDB query (cache misses only).
+
+    Args:
+        countries: Comma-separated ISO 3166-1 alpha-2 codes (e.g. US,GB,FR).
+
+    Returns:
+        JSON with `countries`: map of code to the same shape as /trends, plus
+        `missing` (true when the DB has no topics for that country).
+    """
+    codes: list[str] = []
+    for raw in countries.split(","):
+        if raw.strip():
+            code = _validate_country(raw)
+            if code not in codes:
+                codes.append(code)
+    if not codes:
+        raise HTTPException(status_code=400, detail="At least one country code is required")
+    if len(codes) > BATCH_MAX_COUNTRIES:
+        raise HTTPException(status_code=400, detail=f"Too many countries (max {BATCH_MAX_COUNTRIES})")
+
+    try:
+        docs = await trends_cache.get_many(codes, get_trends_for_countries, get_trends_versions)
+    except Exception:
+        docs = {}  # DB unreachable - every country falls back to empty
+
+    results: dict[str, dict] = {}
+    for code in codes:
+        payload = _trends_payload(code, docs.get(code))
+        payload["missing"] = payload["source"] == "fallback"
+        results[code] = payload
+    return {"countries": results}
+
+
+@app.get("/trends/search")
+async def trends_search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(50, ge=1, le=SEARCH_MAX_LIMIT),
+) -> dict:
+    """
+    Find which countries are trending a topic, across every country's latest titles.
+
+    Served from an in-memory token index mirrored from the tokens save_trends
+    stores with each country (only changed countries are reloaded). Matching is
+    case- and accent-insensitive, and every query word matches by prefix
+    ("champ leag" finds "Champions League final").
+
+    Returns:
+        {"query", "countries": [codes with a match], "matches": [{country, title, rank, volume?}]},
+        best-ranked first. Empty lists when nothing matches or MongoDB is unreachable.
+    """
+    try:
+        await trends_search_index.sync(get_trends_search_entries, get_trends_versions)
+    except Exception:
+        pass  # DB unreachable on first load: answer from whatever is mirrored (possibly nothing)
+    matches = trends_search_index.search(q, limit=limit)
+    return {
+        "query": q,
+        "countries": sorted({m["country"] for m in matches}),
+        "matches": matches,
+    }
+
+
+@app.get("/trends/global")
+async def trends_global(
+    limit: int = Query(50, ge=1, le=GLOBAL_MAX_LIMIT),
+    min_countries: int = Query(2, ge=1),
+) -> dict:
+    """
+    Stories trending in several countries: near-duplicate titles grouped across every country's latest topics.
+
+    Titles are matched by MinHash similarity over words and character trigrams
+    (so "Champions League final" and "Champions League Final 2026" group, while
+    unrelated titles sharing one word don't), through an in-memory LSH index
+    that only re-buckets the countries a worker run refreshed.
+
+    Returns:
+        {"countries": indexed country count, "clusters": [{title, countries, country_count, volume, topics}]},
+        most countries first, then highest combined volume. Empty when MongoDB is unreachable.
+    """
+    try:
+        await trends_cluster_index.sync(get_trends_cluster_entries, get_trends_versions)
+    except Exception:
+        pass  # DB unreachable on first load: answer from whatever is mirrored (possibly nothing)
+    return {
+        "countries": trends_cluster_index.stats()["countries"],
+        "clusters": trends_cluster_index.clusters(min_countries=min_countries, limit=limit),
+    }
+
+
+@app.get("/trends/changes")
+async def trends_changes(country: str = "US") -> dict:
+    """
+    Get what changed in a country's trending topics since the previous refresh.
+
+    The delta is computed once by save_trends when the worker writes a country,
+    so readers do not need to download and diff two full payloads.
+
+    Args:
+        country: ISO 3166-1 alpha-2 country code (e.g. US, FR). Defaults to US.
+
+    Returns:
+        JSON with country, new, dropped and moved topics, fetched_at and
+        previous_fetched_at. Lists are empty (source fallback) until the
+        country has been refreshed twice.
+    """
+    code = _validate_country(country)
+    try:
+        changes = await get_trends_changes(code)
+    except Exception:
+        changes = None  # DB unreachable - return empty immediately
+
+    if not changes:
+        return {"country": code, "new": [], "dropped": [], "moved": [], "source": "fallback"}
+    previous_fetched_at = changes.get("previous_fetched_at")
+    return {
+        "country": code,
+        "new": changes.get("new", []),
+        "dropped": changes.get("dropped", []),
+        "moved": changes.get("moved", []),
+        "source": "db",
+        "fetched_at": _as_utc(changes["fetched_at"]).isoformat(),
+        "previous_fetched_at": _as_utc(previous_fetched_at).isoformat() if previous_fetched_at else None,
+    }
+
+
+@app.get("/trends/history", response_model=None)
+async def trends_history(
+    country: str = "US",
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    limit: int = Query(100, ge=1, le=HISTORY_MAX_LIMIT),
+) -> StreamingResponse:
+    """
+    Get past trends snapshots for a country, newest first.
+
+    Snapshots are streamed from a batched MongoDB cursor, so large ranges are
+    never held in memory. Snapshots older than TRENDS_HISTORY_RETENTION_DAYS
+    are expired by MongoDB.
+
+    Args:
+        country: ISO 3166-1 alpha-2 country code (e.g. US, FR). Defaults to US.
+        from: Only snapshots fetched at or after this ISO 8601 datetime.
+        to: Only snapshots fetched at or before this ISO 8601 datetime.
+        limit: Maximum snapshots to return (1-1000). Defaults to 100.
+
+    Returns:
+        JSON with country and snapshots (list of {country, topics, source, fetched_at}).
+    """
+    code = _validate_country(country)
+    if start is not None and end is not None and _as_utc(start) > _as_utc(end):
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
+    snapshots = iter_trends_history(
+        code,
+        _as_utc(start) if start else None,
+        _as_utc(end) if end else None,
+        limit,
+    )
+    # Read the first snapshot before committing to a 200 so an unreachable DB
+    # degrades to an empty history like /trends does
+    try:
+        first = await anext(snapshots, None)
+    except Exception:
+        first = None
+        await snapshots.aclose()
+
+    return StreamingResponse(_stream_history(code, first, snapshots), media_type="application/json")
+
+
+async def _stream_history(code: str, first: dict | None, rest: AsyncIterator[dict]) -> AsyncIterator[str]:
+    """Emit the /trends/history body as a JSON array, one snapshot at a time."""
+    yield f'{{"country": {json.dumps(code)}, "snapshots": ['
+    if first is not None:
+        yield _snapshot_json(first)
+        try:
+            async for snap in rest:
+                yield "," + _snapshot_json(snap)
+        except Exception:
+            pass  # DB dropped mid-stream: close the array with what was sent
+    yield "]}"
+
+
+def _snapshot_json(snap: dict) -> str:
+    return json.dumps({
+        "country": snap.get("country"),
+        "topics": snap.get("topics", []),
+        "source": snap.get("source"),
+        "fetched_at": _as_utc(snap["fetched_at"]).isoformat(),
+    })
+
+
+@app.get("/worker/runs")
+async def worker_runs(limit: int = Query(20, ge=1, le=WORKER_RUNS_MAX_LIMIT)) -> dict:
+    """
+    Get recent trends worker run reports, newest first (read-only).
+
+    Each report has started_at, finished_at, duration_ms, concurrency, ok and
+    failed counts, and per-country entries with the chosen source, item count,
+    duration and nested stage timings (feed, browser launch, goto, CSV
+    download, DOM extraction, SerpApi, pytrends, save_trends...).
+
+    Args:
+        limit: Maximum reports to return (1-100). Defaults to 20.
+    """
+    try:
+        runs = await get_worker_runs(limit)
+    except Exception:
+        runs = []  # DB unreachable - nothing to show
+    for run in runs:
+        for field in ("started_at", "finished_at"):
+            if run.get(field) is not None:
+                run[field] = _as_utc(run[field]).isoformat()
+    return {"runs": runs}
+
+
+def _validate_country(country: str) -> str:
+    """Normalize a country query value to an uppercase alpha-2 code or raise 400."""
+    if not country or not country.strip():
+        raise HTTPException(status_code=400, detail="Country code is required")
+    code = country.strip().upper()
+    if len(code) != 2 or not code.isalpha():
+        raise HTTPException(status_code=400, detail=f"Invalid country code: {country}. Use ISO 3166-1 alpha-2 (e.g. US, GB).")
+    return code
+
+
+def _trends_payload(code: str, doc: TrendsDocument | None) -> dict:
+    """Response body for one country: DB data when it has topics, else the empty fallback."""
+    if doc and doc.topics:
+        return {
+            "country": doc.country,
+            "topics": doc.topics,
+            "source": "db",
+            "fetched_at": doc.fetched_at.isoformat(),
+        }
     return {
         "country": code,
         "topics": [],
@@ -79,20 +459,112 @@ def trends(country: str = "US") -> dict:
     }
 
 
+def _stored_trends_response(request: Request, stored: TrendsResponse) -> Response:
+    """Serve a pre-serialized /trends body (or 304) in the best encoding the client accepts."""
+    encoding = _negotiate_encoding(request.headers.get("accept-encoding", ""), stored.bodies)
+    etag = stored.etag if encoding == "identity" else f"{stored.etag}-{encoding}"
+    headers = {**_validator_headers(etag, stored.fetched_at), "Vary": "Accept-Encoding"}
+    if _is_not_modified(request, stored.etag, stored.fetched_at):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(stored.bodies[encoding], media_type="application/json", headers=headers)
+
+
+def _view_etag(etag: str, view: tuple) -> str:
+    """ETag of a sorted/filtered/paged /trends view: the full response's ETag plus a digest of the view parameters."""
+    return f"{etag}-v{hashlib.sha256(repr(view).encode()).hexdigest()[:8]}"
+
+
+def _negotiate_encoding(accept_encoding: str, available: dict[str, bytes]) -> str:
+    """Pick the stored content-coding for an Accept-Encoding header: highest q, then br > gzip > identity."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        param = params.strip()
+        if param.startswith("q="):
+            try:
+                q = float(param[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    best, best_q = "identity", 0.0
+    for coding in RESPONSE_ENCODINGS:
+        if coding not in available:
+            continue
+        q = weights.get(coding, weights.get("*", 1.0 if coding == "identity" else 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _as_utc(dt: datetime) -> datetime:
+    """MongoDB returns naive UTC datetimes; make them aware."""
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def _validator_headers(etag: str | None, last_modified: datetime) -> dict[str, str]:
+    """ETag / Last-Modified / Cache-Control headers for a DB-backed trends response."""
+    headers = {
+        "Last-Modified": format_datetime(_as_utc(last_modified), usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+    if etag:
+        headers["ETag"] = f'"{etag}"'
+    return headers
+
+
+def _is_not_modified(request: Request, etag: str | None, last_modified: datetime) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against the stored data."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if not etag:
+            return False
+        # Compressed variants carry "<hash>-gzip" / "<hash>-br"; all represent the same content
+        candidates = {
+            t.strip().removeprefix("W/").replace("-gzip\"", "\"").replace("-br\"", "\"")
+            for t in if_none_match.split(",")
+        }
+        return "*" in candidates or f'"{etag}"' in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have second precision
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
 @app.get("/trends/mentions")
-def trend_mentions(topic: str, country: str = "US") -> dict:
+async def trend_mentions(topic: str, country: str = "US", refresh: bool = False) -> dict:
     """
     Get news articles and platform mentions for a trending topic.
 
-    Requires SERPAPI_KEY for live data. Returns articles sorted by relevance
-    (position in Google News) and date.
+    Serves mentions prefetched by the worker for top topics first. Otherwise
+    requires SERPAPI_KEY for live data. Returns articles sorted by relevance
+    (position in Google News) and date. Live responses are cached per
+    (topic, country) in memory and in MongoDB to save SerpApi quota; the live
+    call is awaited on the shared HTTP client and identical concurrent
+    requests share a single upstream call.
 
     Args:
         topic: The trending topic to search for.
         country: ISO 3166-1 alpha-2 country code (e.g. US, FR). Defaults to US.
+        refresh: Bypass prefetched and cached results and fetch live (the result
+            replaces the cached one).
 
     Returns:
-        JSON with topic, country, mentions (list of articles/platforms).
+        JSON with topic, country, mentions (list of articles/platforms) and
+        source (precomputed or live).
     """
     if not topic or not topic.strip():
         raise HTTPException(status_code=400, detail="Topic is required")
@@ -101,9 +573,23 @@ def trend_mentions(topic: str, country: str = "US") -> dict:
     if len(code) != 2 or not code.isalpha():
         raise HTTPException(status_code=400, detail=f"Invalid country code: {country}")
 
-    mentions = fetch_topic_mentions(topic.strip(), code, limit=25)
+    if not refresh:
+        try:
+            precomputed = await get_mentions_from_db(code, topic.strip())
+        except Exception:
+            precomputed = None  # DB unreachable - fall through to live
+        if precomputed:
+            return {
+                "topic": topic.strip(),
+                "country": code,
+                "mentions": precomputed[:API_LIMIT],
+                "source": "precomputed",
+            }
+
+    mentions = await mentions_cache.get_or_fetch(topic.strip(), code, API_LIMIT, fetch_topic_mentions_async, bypass=refresh)
     return {
         "topic": topic.strip(),
         "country": code,
         "mentions": mentions,
+        "source": "live",
     }
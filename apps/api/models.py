@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Literal
 
@@ -16,6 +17,23 @@ class TrendsDocument(BaseModel):
         default_factory=list,
         description="List of trend items: {title, search_volume?, started?}",
     )
-    source: Literal["api", "fallback", "scraper", "serpapi", "db"] = Field(default="fallback")
+    source: Literal["api", "fallback", "feed", "scraper", "serpapi", "db"] = Field(default="fallback")
     fetched_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    topics_hash: str | None = Field(default=None, description="Content hash of topics (ETag)")
+
+
+@dataclass(frozen=True, slots=True)
+class TrendsResponse:
+    """
+    Pre-serialized /trends body for one country, as written by save_trends.
+
+    A plain dataclass rather than a Pydantic model: the hot path hands the
+    stored bytes to the client without validating or re-encoding anything.
+    """
+
+    etag: str
+    fetched_at: datetime
+    updated_at: datetime
+    # Content-coding ("identity", "gzip", "br") -> response body bytes
+    bodies: dict[str, bytes]
@@ -1,6 +1,8 @@
 #!/usr/bin/env bash
 # Run the trends worker. Use with cron for daily runs:
 #   0 0 * * * /path/to/apps/api/run-worker.sh
+# or keep it running with adaptive per-country intervals:
+#   /path/to/apps/api/run-worker.sh --daemon
 
 set -e
 cd "$(dirname "$0")"
@@ -19,7 +21,7 @@ fi
 
 # Use python3 if python is not available
 if command -v python3 &>/dev/null; then
-  exec python3 -m worker
+  exec python3 -m worker "$@"
 else
-  exec python -m worker
+  exec python -m worker "$@"
 fi
@@ -0,0 +1,48 @@
+"""Shared async HTTP client for outbound API calls (SerpApi)."""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+
+import httpx
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY_S = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_S", "30"))
+HTTP_TIMEOUT_S = float(os.getenv("HTTP_TIMEOUT_S", "15"))
+
+_client: httpx.AsyncClient | None = None
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (httpx[http2])."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client (created lazily, opened in the app lifespan).
+
+    Keeps connections alive across requests and negotiates HTTP/2 when available.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=http2_available(),
+            timeout=httpx.Timeout(HTTP_TIMEOUT_S, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_S,
+            ),
+        )
+    return _client
+
+
+async def close_async_http_client() -> None:
+    """Close the shared client and its connection pool."""
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
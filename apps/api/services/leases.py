@@ -0,0 +1,216 @@
+"""Country leases in MongoDB so several worker processes can share one refresh pass."""
+
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from db import get_worker_leases_collection
+
+# A lease not extended for this long is considered abandoned (its worker died) and can be claimed again
+DEFAULT_LEASE_TTL_S = 120.0
+# Countries saved within this window are not claimed again by a later worker
+DEFAULT_FRESH_S = 60 * 60.0
+# A failed country can be claimed again after this; doubles per consecutive failure, capped at the fresh window
+DEFAULT_RETRY_S = 5 * 60.0
+
+
+class LeaseLost(RuntimeError):
+    """Our lease on a country expired and another worker claimed it: the country must not be saved."""
+
+
+def _env_seconds(name: str, default: float) -> float:
+    try:
+        return max(1.0, float(os.getenv(name, "")))
+    except ValueError:
+        return default
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def default_owner() -> str:
+    """Unique id for this worker process: host, pid and a random suffix."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaseManager:
+    """
+    Claims, heartbeats and releases per-country leases in the worker_leases collection.
+
+    One document per country: {_id: country, owner, expires_at, claimed_at,
+    attempted_at, ok, failures, retry_at}. A country is claimable when nobody
+    holds a live lease (expires_at unset or past) and it was neither attempted
+    within `fresh_s` nor failed with a retry_at still ahead (failed countries
+    back off from `retry_s`, doubling per consecutive failure).
+    Claims are a single find_one_and_update with upsert, so exactly one worker
+    wins each country; a worker that dies stops heartbeating and its lease
+    expires after `ttl_s`, letting another worker pick the country up.
+    """
+
+    def __init__(
+        self,
+        owner: str | None = None,
+        ttl_s: float | None = None,
+        fresh_s: float | None = None,
+        retry_s: float | None = None,
+    ) -> None:
+        self.owner = owner or default_owner()
+        self.ttl_s = ttl_s or _env_seconds("TRENDS_LEASE_TTL_S", DEFAULT_LEASE_TTL_S)
+        self.fresh_s = fresh_s or _env_seconds("TRENDS_LEASE_FRESH_S", DEFAULT_FRESH_S)
+        self.retry_s = retry_s or _env_seconds("TRENDS_LEASE_RETRY_S", DEFAULT_RETRY_S)
+
+    def _claimable(self, now: datetime) -> dict[str, Any]:
+        return {
+            "$and": [
+                {"$or": [{"expires_at": None}, {"expires_at": {"$lte": now}}]},
+                {"$or": [
+                    {"attempted_at": None},
+                    {"attempted_at": {"$lte": now - timedelta(seconds=self.fresh_s)}},
+                    {"retry_at": {"$lte": now}},
+                ]},
+            ]
+        }
+
+    def claim(self, country: str) -> bool:
+        """Atomically take the lease on `country`; False if another worker holds it or it is fresh."""
+        now = _now()
+        try:
+            doc = get_worker_leases_collection().find_one_and_update(
+                {"_id": country, **self._claimable(now)},
+                {"$set": {"owner": self.owner, "expires_at": now + timedelta(seconds=self.ttl_s), "claimed_at": now}},
+                projection={"owner": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # The document exists but did not match: leased elsewhere or recently attempted
+            return False
+        return doc is not None and doc.get("owner") == self.owner
+
+    def claim_next(self, countries: list[str]) -> str | None:
+        """Claim the first claimable country of `countries` (in order), or None."""
+        for country in self.pending(countries, include_leased=False):
+            if self.claim(country):
+                return country
+        return None
+
+    def pending(self, countries: list[str], include_leased: bool = True) -> list[str]:
+        """
+        Countries not attempted within the fresh window (or failed and due for a retry), in `countries` order.
+
+        include_leased=False leaves out countries another worker currently holds
+        (the ones this worker could claim right now). A failed country whose
+        retry_at is still ahead is not pending, so workers don't wait for it.
+        """
+        now = _now()
+        stale = now - timedelta(seconds=self.fresh_s)
+        docs = {
+            d["_id"]: d
+            for d in get_worker_leases_collection().find(
+                {"_id": {"$in": countries}}, {"expires_at": 1, "attempted_at": 1, "retry_at": 1},
+            )
+        }
+        out: list[str] = []
+        for country in countries:
+            doc = docs.get(country, {})
+            attempted_at = _as_utc(doc.get("attempted_at"))
+            retry_at = _as_utc(doc.get("retry_at"))
+            if attempted_at is not None and attempted_at > stale and not (retry_at is not None and retry_at <= now):
+                continue
+            expires_at = _as_utc(doc.get("expires_at"))
+            if not include_leased and expires_at is not None and expires_at > now:
+                continue
+            out.append(country)
+        return out
+
+    def heartbeat(self, country: str) -> bool:
+        """
+        Extend our lease on `country`; False if it was lost.
+
+        Fenced on both owner and expiry: a lease that already expired is lost
+        even if nobody has claimed it yet, since another worker may be about to.
+        """
+        now = _now()
+        result = get_worker_leases_collection().update_one(
+            {"_id": country, "owner": self.owner, "expires_at": {"$gt": now}},
+            {"$set": {"expires_at": now + timedelta(seconds=self.ttl_s)}},
+        )
+        return result.matched_count > 0
+
+    def retry_delay(self, failures: int) -> float:
+        """Seconds before a country that failed `failures` times in a row can be claimed again."""
+        return min(self.retry_s * 2 ** min(failures - 1, 30), self.fresh_s)
+
+    def release(self, country: str, ok: bool) -> None:
+        """
+        Drop our lease and record the attempt.
+
+        A saved country is skipped by every worker for the fresh window. A
+        failed one becomes claimable again after retry_delay(failures), so a
+        temporary error is retried by any worker still running (or the next pass).
+        """
+        collection = get_worker_leases_collection()
+        now = _now()
+        update: dict[str, Any] = {"$set": {"expires_at": None, "attempted_at": now, "ok": ok}, "$unset": {"owner": ""}}
+        if ok:
+            update["$unset"].update(failures="", retry_at="")
+        else:
+            doc = collection.find_one({"_id": country, "owner": self.owner}, {"failures": 1})
+            if doc is None:
+                return  # not (or no longer) ours
+            failures = doc.get("failures", 0) + 1
+            update["$set"].update(failures=failures, retry_at=now + timedelta(seconds=self.retry_delay(failures)))
+        collection.update_one({"_id": country, "owner": self.owner}, update)
+
+    @contextmanager
+    def keep_alive(self, country: str) -> Iterator[threading.Event]:
+        """
+        Heartbeat the lease on `country` every ttl/3 from a background thread while the block runs.
+
+        Yields an Event that is set once a heartbeat finds the lease lost (it
+        expired, and another worker may have claimed the country). The Event
+        can lag by up to ttl/3, so right before writing, callers must also
+        confirm with a synchronous heartbeat (see still_leased()).
+        """
+        stop = threading.Event()
+        lost = threading.Event()
+
+        def _beat() -> None:
+            while not stop.wait(self.ttl_s / 3):
+                try:
+                    if not self.heartbeat(country):
+                        print(f"Lost lease on {country}", flush=True)
+                        lost.set()
+                        return
+                except Exception as e:
+                    print(f"Lease heartbeat failed for {country}: {e}", flush=True)
+
+        thread = threading.Thread(target=_beat, name=f"lease-{country}", daemon=True)
+        thread.start()
+        try:
+            yield lost
+        finally:
+            stop.set()
+            thread.join()
+
+    def still_leased(self, country: str, lost: threading.Event) -> bool:
+        """Whether we still hold `country`: not flagged lost by keep_alive, and a fenced heartbeat succeeds now."""
+        return not lost.is_set() and self.heartbeat(country)
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    """pymongo returns naive UTC datetimes unless the client is tz_aware."""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
@@ -0,0 +1,192 @@
+"""Two-tier read-through cache for SerpApi topic mentions (memory LRU + MongoDB TTL)."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from db import get_async_mentions_cache_collection
+from services.topic_mentions import MentionItem
+
+Fetcher = Callable[..., Awaitable[list[MentionItem]]]
+
+
+def normalize_topic(topic: str) -> str:
+    """Cache key form of a topic: collapsed whitespace, case-folded."""
+    return " ".join(topic.split()).casefold()
+
+
+def cache_key(topic: str, country: str, limit: int) -> str:
+    """Key for (normalized topic, country, limit)."""
+    return f"{country.upper()}|{limit}|{normalize_topic(topic)}"
+
+
+class MentionsCache:
+    """
+    Read-through cache in front of fetch_topic_mentions_async.
+
+    Tier 1 is an in-process LRU; tier 2 is the `mentions_cache` collection whose
+    documents carry an `expires_at` removed by a MongoDB TTL index. A tier-2 hit
+    is copied into tier 1. Empty results (no key, SerpApi error) are never cached.
+    Identical concurrent requests share one lookup and at most one upstream call.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 21600.0, persist: bool = True) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.persist = persist
+        self._entries: OrderedDict[str, tuple[datetime, list[MentionItem]]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[list[MentionItem]]] = {}
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    @classmethod
+    def from_env(cls) -> MentionsCache:
+        """Build a cache from MENTIONS_CACHE_TTL_S and MENTIONS_CACHE_MAX_ENTRIES."""
+        return cls(
+            maxsize=int(os.getenv("MENTIONS_CACHE_MAX_ENTRIES", "512")),
+            ttl=float(os.getenv("MENTIONS_CACHE_TTL_S", "21600")),
+        )
+
+    async def get_or_fetch(
+        self,
+        topic: str,
+        country: str,
+        limit: int,
+        fetch: Fetcher,
+        bypass: bool = False,
+    ) -> list[MentionItem]:
+        """
+        Get mentions from cache, awaiting `fetch(topic, country, limit=limit)` on a miss.
+
+        Args:
+            bypass: Skip both tiers and refresh them with a live fetch.
+        """
+        key = cache_key(topic, country, limit)
+        # Coalesce: identical requests (same key and bypass flag) await the first one
+        flight = f"{key}|refresh" if bypass else key
+        pending = self._inflight.get(flight)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        fut: asyncio.Future[list[MentionItem]] = asyncio.get_running_loop().create_future()
+        self._inflight[flight] = fut
+        try:
+            mentions = await self._load(key, topic, country, limit, fetch, bypass)
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            self._inflight.pop(flight, None)
+        fut.set_result(mentions)
+        return mentions
+
+    async def _load(
+        self,
+        key: str,
+        topic: str,
+        country: str,
+        limit: int,
+        fetch: Fetcher,
+        bypass: bool,
+    ) -> list[MentionItem]:
+        if self.ttl <= 0:
+            return await fetch(topic, country, limit=limit)
+
+        if bypass:
+            self.bypasses += 1
+        else:
+            cached = await self.get(key)
+            if cached is not None:
+                return cached
+            self.misses += 1
+
+        mentions = await fetch(topic, country, limit=limit)
+        if mentions:
+            await self.put(key, topic, country, limit, mentions)
+        return mentions
+
+    async def get(self, key: str) -> list[MentionItem] | None:
+        """Look up a key in memory, then MongoDB. Returns None on a miss."""
+        now = datetime.now(timezone.utc)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+            del self._entries[key]
+
+        if not self.persist:
+            return None
+        try:
+            doc = await get_async_mentions_cache_collection().find_one(
+                {"_id": key, "expires_at": {"$gt": now}},
+                {"mentions": 1, "expires_at": 1},
+            )
+        except Exception:
+            return None  # DB unreachable: behave like a miss
+        if doc is None:
+            return None
+        self.db_hits += 1
+        expires_at = doc["expires_at"]
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        self._remember(key, expires_at, doc["mentions"])
+        return doc["mentions"]
+
+    async def put(self, key: str, topic: str, country: str, limit: int, mentions: list[MentionItem]) -> None:
+        """Store mentions in both tiers."""
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=self.ttl)
+        self._remember(key, expires_at, mentions)
+        if not self.persist:
+            return
+        try:
+            await get_async_mentions_cache_collection().replace_one(
+                {"_id": key},
+                {
+                    "topic": normalize_topic(topic),
+                    "country": country.upper(),
+                    "limit": limit,
+                    "mentions": mentions,
+                    "cached_at": now,
+                    "expires_at": expires_at,
+                },
+                upsert=True,
+            )
+        except Exception:
+            pass  # Memory tier still serves it
+
+    def clear(self) -> None:
+        """Drop memory entries and reset counters (MongoDB entries expire on their own)."""
+        self._entries.clear()
+        self.memory_hits = self.db_hits = self.misses = self.bypasses = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache counters for /status."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.maxsize,
+            "ttl_s": self.ttl,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+        }
+
+    def _remember(self, key: str, expires_at: datetime, mentions: list[MentionItem]) -> None:
+        self._entries[key] = (expires_at, mentions)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
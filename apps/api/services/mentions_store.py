@@ -0,0 +1,31 @@
+"""Worker-prefetched topic mentions storage in MongoDB."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from db import get_mentions_collection
+from services.mentions_cache import normalize_topic
+from services.topic_mentions import MentionItem
+
+
+def save_mentions(country: str, topic: str, mentions: list[MentionItem]) -> None:
+    """
+    Save or update prefetched mentions for a topic in a country.
+
+    Uses upsert on (country, normalized topic) so /trends/mentions can serve it
+    without calling SerpApi.
+    """
+    code = country.upper()
+    coll = get_mentions_collection()
+    coll.update_one(
+        {"country": code, "topic": normalize_topic(topic)},
+        {"$set": {
+            "country": code,
+            "topic": normalize_topic(topic),
+            "title": topic,
+            "mentions": mentions,
+            "fetched_at": datetime.now(timezone.utc),
+        }},
+        upsert=True,
+    )
@@ -0,0 +1,23 @@
+"""Async reads of worker-prefetched topic mentions (used by the API event loop)."""
+
+from __future__ import annotations
+
+from db import get_async_mentions_collection
+from services.mentions_cache import normalize_topic
+from services.topic_mentions import MentionItem
+
+
+async def get_mentions_from_db(country: str, topic: str) -> list[MentionItem] | None:
+    """
+    Get prefetched mentions for a topic in a country.
+
+    Returns None if the worker has not prefetched this topic.
+    """
+    coll = get_async_mentions_collection()
+    doc = await coll.find_one(
+        {"country": country.upper(), "topic": normalize_topic(topic)},
+        {"_id": 0, "mentions": 1},
+    )
+    if doc is None:
+        return None
+    return doc.get("mentions") or None
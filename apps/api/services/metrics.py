@@ -0,0 +1,287 @@
+"""In-process Prometheus metrics (counters, gauges, histograms) and the ASGI middleware feeding them."""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Seconds; request/DB latency sits at the low end, scraper and SerpApi at the high end
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = tuple[str, ...]
+
+
+class _Metric(ABC):
+    """Base for a metric family: a name, help text and fixed label names."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _series(self, key: LabelValues, suffix: str = "", extra: tuple[tuple[str, str], ...] = ()) -> str:
+        pairs = [*zip(self.labelnames, key), *extra]
+        labels = ",".join(f'{n}="{_escape(v)}"' for n, v in pairs)
+        return f"{self.name}{suffix}{{{labels}}}" if labels else f"{self.name}{suffix}"
+
+    @abstractmethod
+    def collect(self) -> list[str]:
+        """Sample lines of every series, in exposition format."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self.collect()]
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self._series(k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down per label set (e.g. requests in flight)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self._series(k)} {_fmt(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency distribution per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative) + overflow, sum]
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = _bucket_index(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the with-block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._values.items())
+        lines: list[str] = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip((*self.buckets, math.inf), counts):
+                cumulative += n
+                le = "+Inf" if bound == math.inf else _fmt(bound)
+                lines.append(f"{self._series(key, '_bucket', (('le', le),))} {cumulative}")
+            lines.append(f"{self._series(key, '_sum')} {_fmt(total)}")
+            lines.append(f"{self._series(key, '_count')} {cumulative}")
+        return lines
+
+
+def timed(histogram: Histogram, **labels: Any) -> Callable[[F], F]:
+    """Decorator observing each call's duration in `histogram` (sync or async functions)."""
+
+    def decorate(fn: F) -> F:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with histogram.time(**labels):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with histogram.time(**labels):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def _bucket_index(buckets: tuple[float, ...], value: float) -> int:
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            return i
+    return len(buckets)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+REGISTRY: list[_Metric] = []
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render() -> str:
+    """All metric families in Prometheus text exposition format."""
+    return "\n".join(m.render() for m in REGISTRY) + "\n"
+
+
+def reset() -> None:
+    """Zero every metric (tests)."""
+    for metric in REGISTRY:
+        with metric._lock:
+            metric._values.clear()  # type: ignore[attr-defined]
+
+
+# --- Metric families ---
+
+HTTP_REQUESTS = Counter(
+    "hanfani_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "hanfani_http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"),
+)
+HTTP_IN_FLIGHT = Gauge(
+    "hanfani_http_requests_in_flight", "HTTP requests currently being served by route.", ("method", "route"),
+)
+DB_OPERATION_DURATION = Histogram(
+    "hanfani_db_operation_duration_seconds", "MongoDB trends store call latency.", ("operation",),
+)
+SERPAPI_REQUEST_DURATION = Histogram(
+    "hanfani_serpapi_request_duration_seconds", "SerpApi call latency by engine.", ("engine",),
+)
+SERPAPI_ERRORS = Counter(
+    "hanfani_serpapi_errors_total", "SerpApi calls that failed (network error or non-2xx) by engine.", ("engine",),
+)
+SCRAPER_OUTCOMES = Counter(
+    "hanfani_scraper_outcomes_total", "Scrapes by extraction path: csv, dom (fallback) or failure.", ("path",),
+)
+SCRAPER_DURATION = Histogram(
+    "hanfani_scraper_duration_seconds", "Time to scrape one country by extraction path.", ("path",),
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency, status counts and in-flight requests.
+
+    Routes are labelled by their path template (/trends/history, not the raw URL),
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = _route_template(scope)
+        status = 500
+
+        async def send_wrapper(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method=method, route=route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method=method, route=route)
+            HTTP_IN_FLIGHT.dec(method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+
+
+def _route_template(scope: dict[str, Any]) -> str:
+    from starlette.routing import Match
+
+    app = scope.get("app")
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match is Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
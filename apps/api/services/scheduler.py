@@ -0,0 +1,134 @@
+"""Adaptive per-country refresh schedule for the worker daemon (priority queue keyed by next-due time)."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+from dataclasses import dataclass
+from typing import Any
+
+# Seconds between refreshes: volatile countries approach the min, quiet ones the max
+DEFAULT_MIN_INTERVAL_S = 30 * 60
+DEFAULT_MAX_INTERVAL_S = 24 * 60 * 60
+# First retry after a failed refresh; doubles per consecutive failure, capped at the max interval
+DEFAULT_RETRY_BASE_S = 5 * 60
+# Weight of the latest change ratio in the running average (1.0 = only the latest refresh counts)
+DEFAULT_SMOOTHING = 0.5
+
+
+def _env_minutes(name: str, default_s: float) -> float:
+    try:
+        return max(1.0, float(os.getenv(name, "")) * 60)
+    except ValueError:
+        return default_s
+
+
+def change_ratio(changes: dict[str, Any] | None, items: int) -> float:
+    """
+    Share of the topic list that turned over in one refresh, from 0.0 (same topics) to 1.0 (all new).
+
+    Topics that entered plus topics that left, over the union of old and new lists.
+    A first save (no previous topics) counts as fully changed.
+    """
+    if changes is None:
+        return 1.0
+    turned_over = changes.get("new", 0) + changes.get("dropped", 0)
+    union = items + changes.get("dropped", 0)
+    return min(1.0, turned_over / union) if union else 0.0
+
+
+@dataclass
+class CountrySchedule:
+    """Per-country scheduling state."""
+
+    country: str
+    due_at: float
+    interval_s: float
+    change_ratio: float | None = None
+    failures: int = 0
+
+
+class RefreshScheduler:
+    """
+    Min-heap of countries by next-due time, with intervals that follow topic churn.
+
+    After a successful refresh the country's smoothed change ratio moves its
+    interval geometrically between min_interval_s (ratio 1) and max_interval_s
+    (ratio 0). After a failure it is retried with exponential backoff from
+    retry_base_s. Times are plain floats (time.time()), passed in by the caller.
+    """
+
+    def __init__(
+        self,
+        countries: list[str],
+        now: float,
+        min_interval_s: float = DEFAULT_MIN_INTERVAL_S,
+        max_interval_s: float = DEFAULT_MAX_INTERVAL_S,
+        retry_base_s: float = DEFAULT_RETRY_BASE_S,
+        smoothing: float = DEFAULT_SMOOTHING,
+    ) -> None:
+        self.min_interval_s = min_interval_s
+        self.max_interval_s = max(min_interval_s, max_interval_s)
+        self.retry_base_s = retry_base_s
+        self.smoothing = smoothing
+        self._seq = itertools.count()
+        self._heap: list[tuple[float, int, str]] = []
+        self._states: dict[str, CountrySchedule] = {}
+        for country in dict.fromkeys(countries):
+            self._states[country] = CountrySchedule(country, now, self.max_interval_s)
+            self._push(country, now)
+
+    @classmethod
+    def from_env(cls, countries: list[str], now: float) -> RefreshScheduler:
+        """Bounds from TRENDS_REFRESH_MIN_MINUTES, TRENDS_REFRESH_MAX_MINUTES and TRENDS_REFRESH_RETRY_MINUTES."""
+        return cls(
+            countries,
+            now,
+            min_interval_s=_env_minutes("TRENDS_REFRESH_MIN_MINUTES", DEFAULT_MIN_INTERVAL_S),
+            max_interval_s=_env_minutes("TRENDS_REFRESH_MAX_MINUTES", DEFAULT_MAX_INTERVAL_S),
+            retry_base_s=_env_minutes("TRENDS_REFRESH_RETRY_MINUTES", DEFAULT_RETRY_BASE_S),
+        )
+
+    def _push(self, country: str, due_at: float) -> None:
+        self._states[country].due_at = due_at
+        heapq.heappush(self._heap, (due_at, next(self._seq), country))
+
+    def next_due(self) -> float | None:
+        """Earliest due time, or None when no country is scheduled (all popped)."""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> list[str]:
+        """Remove and return every country due at `now`, earliest first. Record each result to reschedule it."""
+        due: list[str] = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def interval_for(self, ratio: float) -> float:
+        """Interval for a smoothed change ratio: max at 0, min at 1, geometric in between."""
+        ratio = min(1.0, max(0.0, ratio))
+        return self.max_interval_s * (self.min_interval_s / self.max_interval_s) ** ratio
+
+    def record_success(self, country: str, ratio: float, now: float) -> float:
+        """Reschedule after a successful refresh; returns the new interval in seconds."""
+        state = self._states[country]
+        if state.change_ratio is None:
+            state.change_ratio = ratio
+        else:
+            state.change_ratio = self.smoothing * ratio + (1 - self.smoothing) * state.change_ratio
+        state.failures = 0
+        state.interval_s = self.interval_for(state.change_ratio)
+        self._push(country, now + state.interval_s)
+        return state.interval_s
+
+    def record_failure(self, country: str, now: float) -> float:
+        """Reschedule a failed refresh with exponential backoff; returns the delay in seconds."""
+        state = self._states[country]
+        state.failures += 1
+        delay = min(self.retry_base_s * 2 ** min(state.failures - 1, 30), self.max_interval_s)
+        self._push(country, now + delay)
+        return delay
+
+    def state(self, country: str) -> CountrySchedule:
+        return self._states[country]
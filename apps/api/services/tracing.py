@@ -0,0 +1,86 @@
+"""Lightweight nested timing spans for worker runs (no external tracer)."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+_current: ContextVar[Span | None] = ContextVar("trends_span", default=None)
+
+
+class Span:
+    """One timed stage with attributes and child stages."""
+
+    __slots__ = ("name", "attrs", "children", "_start", "duration_s")
+
+    def __init__(self, name: str, attrs: dict[str, Any] | None = None) -> None:
+        self.name = name
+        self.attrs: dict[str, Any] = attrs or {}
+        self.children: list[Span] = []
+        self._start = time.perf_counter()
+        self.duration_s: float | None = None
+
+    def set(self, **attrs: Any) -> None:
+        """Attach attributes (source, item counts, outcome...)."""
+        self.attrs.update(attrs)
+
+    def finish(self) -> None:
+        if self.duration_s is None:
+            self.duration_s = time.perf_counter() - self._start
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON/BSON-friendly tree: {name, duration_ms, attrs?, children?}."""
+        out: dict[str, Any] = {"name": self.name, "duration_ms": round((self.duration_s or 0.0) * 1000, 2)}
+        if self.attrs:
+            out["attrs"] = dict(self.attrs)
+        if self.children:
+            out["children"] = [c.to_dict() for c in self.children]
+        return out
+
+
+@contextmanager
+def trace(name: str, **attrs: Any) -> Iterator[Span]:
+    """Start a root span; span() calls in this context (and its callees) nest under it."""
+    root = Span(name, attrs)
+    token = _current.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        root.finish()
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span | None]:
+    """
+    Time a stage as a child of the current span.
+
+    Outside a trace (e.g. API processes) this yields None and records nothing,
+    so instrumented code pays only a context-variable lookup.
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, attrs)
+    parent.children.append(child)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        child.finish()
+        _current.reset(token)
+
+
+def current_span() -> Span | None:
+    """The innermost active span, if any."""
+    return _current.get()
@@ -3,10 +3,14 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Protocol
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, Protocol
 
-import pandas as pd
-import requests
+from services.metrics import SERPAPI_ERRORS, SERPAPI_REQUEST_DURATION
+from services.tracing import Span, span
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Sample data when Google Trends API is unavailable (e.g. 404 from deprecated endpoints)
 _MOCK_TOPICS: list[str] = [
@@ -59,16 +63,23 @@ class TrendsClient(Protocol):
         ...
 
 
-def get_trending_topics(country: str, client: object | None = None) -> tuple[list[dict[str, Any]], str]:
+def get_trending_topics(
+    country: str,
+    client: object | None = None,
+    scraper: object | None = None,
+) -> tuple[list[dict[str, Any]], str]:
     """
     Get the top trending topics for a specific country.
 
-    Tries trending_searches (hottrends) first, then realtime_trending_searches.
+    Tries the trending-now HTTP feed first, then the Playwright scraper, SerpApi,
+    and pytrends (trending_searches, then realtime_trending_searches).
     Falls back to sample data when Google's API is unavailable.
 
     Args:
         country: ISO 3166-1 alpha-2 country code (e.g. US, GB, FR).
         client: Optional trends client. If None, uses pytrends TrendReq.
+        scraper: Optional ScraperSession to reuse its browser. If None, the
+            scraper launches a browser for this call only.
 
     Returns:
         Tuple of (topics list of dicts with title/search_volume/started, source).
@@ -89,69 +100,98 @@ def get_trending_topics(country: str, client: object | None = None) -> tuple[lis
     if os.getenv("TRENDS_USE_MOCK", "").lower() in ("1", "true", "yes"):
         return (_to_items(_MOCK_TOPICS.copy()), "fallback")
 
-    # Scrape: no API key, uses Playwright to scrape trends.google.com/trending (primary)
-    if os.getenv("TRENDS_USE_SCRAPER", "true").lower() in ("1", "true", "yes"):
-        try:
-            from services.trends_scraper import scrape_trending_topics
+    # Feed: plain HTTP, no browser (primary; set TRENDS_USE_FEED=false to skip)
+    if os.getenv("TRENDS_USE_FEED", "true").lower() in ("1", "true", "yes"):
+        with span("feed") as stage:
+            try:
+                from services.trends_feed import fetch_trending_feed
 
-            topics = scrape_trending_topics(code)
-            if topics:
-                return (topics, "scraper")
-        except Exception:
-            pass
+                topics = fetch_trending_feed(code)
+                _record(stage, topics)
+                if topics:
+                    return (topics, "feed")
+            except Exception:
+                pass
+
+    # Scrape: no API key, uses Playwright to scrape trends.google.com/trending (when the feed fails)
+    if os.getenv("TRENDS_USE_SCRAPER", "true").lower() in ("1", "true", "yes"):
+        with span("scraper") as stage:
+            try:
+                if scraper is not None:
+                    topics = scraper.scrape(code)
+                else:
+                    from services.trends_scraper import scrape_trending_topics
+
+                    topics = scrape_trending_topics(code)
+                _record(stage, topics)
+                if topics:
+                    return (topics, "scraper")
+            except Exception:
+                pass
 
     # SerpApi: optional, requires SERPAPI_KEY (100 free searches/month)
     api_key = os.getenv("SERPAPI_KEY", "").strip()
     if api_key:
-        titles = _fetch_via_serpapi(code, api_key)
+        with span("serpapi") as stage:
+            titles = _fetch_via_serpapi(code, api_key)
+            _record(stage, titles)
         if titles:
             return (_to_items(titles), "serpapi")
 
-    if client is None:
-        from pytrends.request import TrendReq
+    with span("pytrends") as stage:
+        if client is None:
+            from pytrends.request import TrendReq
 
-        client = TrendReq(hl="en-US", tz=360)
+            client = TrendReq(hl="en-US", tz=360)
 
-    pn = _COUNTRY_TO_PN.get(code, "united_states")
+        pn = _COUNTRY_TO_PN.get(code, "united_states")
 
-    # Try trending_searches first (hottrends/visualize - different endpoint)
-    try:
-        df = client.trending_searches(pn=pn)
-        if not df.empty:
-            titles = _extract_titles(df)
+        # Try trending_searches first (hottrends/visualize - different endpoint)
+        try:
+            titles = _extract_titles(client.trending_searches(pn=pn))
+            _record(stage, titles, endpoint="trending_searches")
             if titles:
                 return (_to_items(titles), "api")
-    except Exception:
-        pass
+        except Exception:
+            pass
 
-    # Fallback: realtime_trending_searches
-    try:
-        df = client.realtime_trending_searches(pn=code)
-        if not df.empty:
-            titles = _extract_titles(df)
+        # Fallback: realtime_trending_searches
+        try:
+            titles = _extract_titles(client.realtime_trending_searches(pn=code))
+            _record(stage, titles, endpoint="realtime_trending_searches")
             if titles:
                 return (_to_items(titles), "api")
-    except Exception:
-        pass
+        except Exception:
+            pass
 
     # Google API unavailable - return sample data so the app works
     return (_to_items(_MOCK_TOPICS.copy()), "fallback")
 
 
+def _record(stage: Span | None, items: list, **attrs: Any) -> None:
+    """Attach the item count of a tier to its tracing span (no-op outside a trace)."""
+    if stage is not None:
+        stage.set(items=len(items), **attrs)
+
+
 def _fetch_via_serpapi(country: str, api_key: str) -> list[str]:
     """Fetch trending searches via SerpApi (https://serpapi.com/google-trends-trending-now)."""
+    import requests
+
+    engine = "google_trends_trending_now"
     try:
-        resp = requests.get(
-            "https://serpapi.com/search",
-            params={
-                "engine": "google_trends_trending_now",
-                "geo": country,
-                "api_key": api_key,
-            },
-            timeout=15,
-        )
-        resp.raise_for_status()
-        data: dict[str, Any] = resp.json()
+        with SERPAPI_REQUEST_DURATION.time(engine=engine):
+            resp = requests.get(
+                "https://serpapi.com/search",
+                params={
+                    "engine": engine,
+                    "geo": country,
+                    "api_key": api_key,
+                },
+                timeout=15,
+            )
+            resp.raise_for_status()
+            data: dict[str, Any] = resp.json()
         items = data.get("trending_searches", [])
         if not isinstance(items, list):
             return []
@@ -163,19 +203,44 @@ def _fetch_via_serpapi(country: str, api_key: str) -> list[str]:
                     topics.append(q)
         return topics
     except Exception:
+        SERPAPI_ERRORS.inc(engine=engine)
         return []
 
 
-def _extract_titles(df: pd.DataFrame) -> list[str]:
-    """Extract topic titles from a trends DataFrame."""
-    if "title" in df.columns:
-        titles = df["title"].astype(str).str.strip()
-    elif "entityNames" in df.columns:
-        col = df["entityNames"]
-        # entityNames can be list or str
-        titles = col.apply(
-            lambda x: ", ".join(x) if isinstance(x, list) else str(x)
-        ).str.strip()
+def _extract_titles(data: pd.DataFrame | Iterable[dict[str, Any] | str]) -> list[str]:
+    """
+    Extract unique, non-empty topic titles from pytrends results.
+
+    Accepts a pandas DataFrame (converted via to_dict, so pandas itself is never
+    imported here) or plain records (dicts or strings). Uses the `title` column,
+    else `entityNames` (list or str), else the last column.
+    """
+    if hasattr(data, "columns") and hasattr(data, "to_dict"):
+        columns = list(data.columns)
+        rows: list[dict[Any, Any]] = data.to_dict("records")
+    else:
+        rows = [r if isinstance(r, dict) else {"title": r} for r in data]
+        columns = list(dict.fromkeys(k for r in rows for k in r))
+    if not columns:
+        return []
+
+    if "title" in columns:
+        values = [r.get("title") for r in rows]
+    elif "entityNames" in columns:
+        values = [
+            ", ".join(str(v) for v in x) if isinstance(x, list) else x
+            for x in (r.get("entityNames") for r in rows)
+        ]
     else:
-        titles = df.iloc[:, -1].astype(str).str.strip()
-    return titles.dropna().replace("", pd.NA).dropna().unique().tolist()
+        values = [r.get(columns[-1]) for r in rows]
+
+    titles: list[str] = []
+    seen: set[str] = set()
+    for value in values:
+        if value is None or value != value:  # None / NaN
+            continue
+        title = str(value).strip()
+        if title and title not in seen:
+            seen.add(title)
+            titles.append(title)
+    return titles
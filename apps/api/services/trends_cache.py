@@ -0,0 +1,255 @@
+"""In-process TTL/LRU cache for trends documents (and pre-serialized responses) served by the API."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, Protocol, TypeVar
+
+
+class Stamped(Protocol):
+    """A cached value carries the updated_at that the trends version document is compared against."""
+
+    @property
+    def updated_at(self) -> datetime | None: ...
+
+
+T = TypeVar("T", bound=Stamped)
+
+Loader = Callable[[str], Awaitable[T | None]]
+ManyLoader = Callable[[list[str]], Awaitable[dict[str, T]]]
+VersionsFetcher = Callable[[], Awaitable[dict[str, Any] | None]]
+
+
+@dataclass
+class _Entry(Generic[T]):
+    doc: T | None
+    expires_at: float
+    updated_at: datetime | None
+
+
+class TrendsCache(Generic[T]):
+    """
+    Bounded cache keyed by country code, of TrendsDocument or TrendsResponse
+    (any value with an `updated_at`).
+
+    - Entries expire after `ttl` seconds and the least recently used entry is
+      evicted once `maxsize` is reached.
+    - Concurrent misses for the same country share a single loader call.
+    - Every `poll_interval` seconds the trends version document (bumped by the
+      worker in save_trends) is read; entries whose stored updated_at no longer
+      matches are dropped, so every replica picks up a refresh without waiting
+      for the TTL.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: float = 300.0,
+        poll_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry[T]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[T | None]] = {}
+        self._version: int | None = None
+        # Per-country updated_at from the last version document read (see _store)
+        self._stamps: dict[str, Any] = {}
+        self._next_poll = 0.0
+        self._poll_lock: asyncio.Lock | None = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> TrendsCache[T]:
+        """Build a cache from TRENDS_CACHE_TTL_S, TRENDS_CACHE_MAX_ENTRIES and TRENDS_CACHE_POLL_S."""
+        return cls(
+            maxsize=int(os.getenv("TRENDS_CACHE_MAX_ENTRIES", "256")),
+            ttl=float(os.getenv("TRENDS_CACHE_TTL_S", "300")),
+            poll_interval=float(os.getenv("TRENDS_CACHE_POLL_S", "5")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    async def get(
+        self,
+        country: str,
+        loader: Loader[T],
+        versions: VersionsFetcher | None = None,
+    ) -> T | None:
+        """
+        Get trends for a country, calling `loader` only on a miss.
+
+        Args:
+            country: Normalized ISO 3166-1 alpha-2 country code.
+            loader: Async function loading the document from MongoDB.
+            versions: Async function returning the trends version document.
+
+        Returns:
+            The cached or freshly loaded document (None if the country has no data).
+        """
+        if not self.enabled:
+            return await loader(country)
+
+        if versions is not None:
+            await self.poll(versions)
+
+        entry = self._entries.get(country)
+        if entry is not None:
+            if entry.expires_at > self._clock():
+                self._entries.move_to_end(country)
+                self.hits += 1
+                return entry.doc
+            del self._entries[country]
+
+        self.misses += 1
+        pending = self._inflight.get(country)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        fut: asyncio.Future[T | None] = asyncio.get_running_loop().create_future()
+        self._inflight[country] = fut
+        version = self._version
+        try:
+            doc = await loader(country)
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            self._inflight.pop(country, None)
+        self._store(country, doc, version)
+        fut.set_result(doc)
+        return doc
+
+    async def get_many(
+        self,
+        countries: list[str],
+        loader: ManyLoader[T],
+        versions: VersionsFetcher | None = None,
+    ) -> dict[str, T | None]:
+        """
+        Get trends for several countries, loading every miss with one `loader` call.
+
+        Args:
+            countries: Normalized country codes.
+            loader: Async function returning {code: document} for the given codes
+                (codes without data are omitted and cached as None).
+            versions: Async function returning the trends version document.
+
+        Returns:
+            Map of every requested country to its document (None if no data).
+        """
+        if not self.enabled:
+            found = await loader(countries)
+            return {c: found.get(c) for c in countries}
+
+        if versions is not None:
+            await self.poll(versions)
+
+        result: dict[str, T | None] = {}
+        missing: list[str] = []
+        now = self._clock()
+        for country in countries:
+            entry = self._entries.get(country)
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end(country)
+                self.hits += 1
+                result[country] = entry.doc
+            else:
+                self.misses += 1
+                missing.append(country)
+
+        if missing:
+            version = self._version
+            found = await loader(missing)
+            for country in missing:
+                doc = found.get(country)
+                self._store(country, doc, version)
+                result[country] = doc
+        return result
+
+    async def poll(self, versions: VersionsFetcher) -> None:
+        """Read the trends version document (at most once per poll_interval) and drop stale entries."""
+        if self._clock() < self._next_poll:
+            return
+        if self._poll_lock is None:
+            self._poll_lock = asyncio.Lock()
+        async with self._poll_lock:
+            if self._clock() < self._next_poll:
+                return
+            self._next_poll = self._clock() + self.poll_interval
+            try:
+                current = await versions()
+            except Exception:
+                return  # DB unreachable: keep serving until entries expire
+            if current is None or current.get("version") == self._version:
+                return
+            self._version = current.get("version")
+            stamps = self._stamps = current.get("countries") or {}
+            for country, entry in list(self._entries.items()):
+                if stamps.get(country) != entry.updated_at:
+                    self.invalidate(country)
+
+    def invalidate(self, country: str | None = None) -> None:
+        """Drop one country (or everything when country is None)."""
+        if country is None:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+        elif self._entries.pop(country, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters and version tracking."""
+        self._entries.clear()
+        self._version = None
+        self._stamps = {}
+        self._next_poll = 0.0
+        self._poll_lock = None
+        self.hits = self.misses = self.invalidations = 0
+
+    def stats(self) -> dict[str, int | float]:
+        """Get cache counters for /status."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.maxsize,
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    def _store(self, country: str, doc: T | None, version: int | None) -> None:
+        """
+        Cache a loaded document, unless a poll during the load saw a newer one.
+
+        `version` is the version document seen when the load started. If a poll
+        moved it while the loader ran, the document may predate that refresh and
+        later polls (same version) would never drop it, so it is only cached when
+        its updated_at matches the stamp that poll read.
+        """
+        updated_at = doc.updated_at if doc is not None else None
+        if version != self._version and self._stamps.get(country) != updated_at:
+            return
+        self._entries[country] = _Entry(
+            doc=doc,
+            expires_at=self._clock() + self.ttl,
+            updated_at=updated_at,
+        )
+        self._entries.move_to_end(country)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
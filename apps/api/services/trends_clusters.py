@@ -0,0 +1,225 @@
+"""Near-duplicate topic titles across countries: MinHash signatures and the LSH index behind /trends/global."""
+
+from __future__ import annotations
+
+import hashlib
+import operator
+import random
+import struct
+import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from services.trends_search import CountryMirror, Posting, tokenize
+
+# Signature length and LSH banding: 16 bands of 4 rows put two titles in a shared
+# bucket with probability 1 - (1 - J**4)**16, i.e. ~50% at Jaccard 0.5 and ~99% at 0.7
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# Candidates from a shared bucket are linked when their estimated Jaccard similarity reaches this
+DEFAULT_THRESHOLD = 0.5
+
+_PRIME = (1 << 61) - 1
+# Fixed seed: signatures are stored by the worker and compared in the API, so every process must agree
+_rng = random.Random(20260417)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_SIGNATURE = struct.Struct(f"<{NUM_PERM}Q")
+# Words shorter than this ("vs", "de", "la") link unrelated titles, so they only count when nothing else is left
+# (numbers always count: "2026", "3-1")
+_MIN_WORD = 3
+
+
+def shingles(title: str) -> set[str]:
+    """Folded words plus their character trigrams, so spelling and inflection variants still overlap."""
+    words = tokenize(title)
+    kept = [w for w in words if len(w) >= _MIN_WORD or w.isdigit()] or words
+    out = set(kept)
+    for word in kept:
+        padded = f" {word} "
+        out.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return out
+
+
+def _hash64(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little")
+
+
+def minhash(title: str) -> bytes:
+    """MinHash signature of a title (NUM_PERM little-endian uint64), stable across processes."""
+    hashes = [_hash64(s) for s in shingles(title)]
+    if not hashes:
+        return _SIGNATURE.pack(*([_PRIME] * NUM_PERM))
+    return _SIGNATURE.pack(*(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS))
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity: share of signature slots that agree."""
+    return sum(map(operator.eq, a, b)) / NUM_PERM
+
+
+class TrendsClusterIndex(CountryMirror):
+    """
+    LSH index over every country's latest topic titles, grouping near-duplicates.
+
+    Each title's MinHash signature (computed by save_trends, so only for the
+    countries a worker run refreshed) is split into BANDS band keys. Titles
+    sharing a bucket are compared once, and linked when their estimated
+    similarity reaches `threshold`. Replacing a country only re-buckets its own
+    titles and re-checks the candidates they land with: there is no all-pairs
+    pass. Clusters are the connected components of the links, recomputed on
+    the next read after a change.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        threshold: float = DEFAULT_THRESHOLD,
+    ) -> None:
+        super().__init__(poll_interval, clock)
+        self.threshold = threshold
+        self._topics: dict[str, list[dict[str, Any]]] = {}
+        self._signatures: dict[Posting, tuple[int, ...]] = {}
+        self._buckets: dict[tuple[int, tuple[int, ...]], set[Posting]] = {}
+        self._links: dict[Posting, set[Posting]] = {}
+        self._clusters: list[dict[str, Any]] | None = None
+
+    def replace_country(
+        self,
+        country: str,
+        titles: list[str],
+        signatures: list[bytes] | None = None,
+        volumes: list[int | None] | None = None,
+        updated_at: datetime | None = None,
+    ) -> None:
+        """Swap one country's titles and links (signatures computed when not stored)."""
+        self.remove_country(country)
+        stored = signatures if signatures and len(signatures) == len(titles) else None
+        topics: list[dict[str, Any]] = []
+        for rank, title in enumerate(titles, 1):
+            topic: dict[str, Any] = {"title": title, "rank": rank}
+            if volumes and rank <= len(volumes) and volumes[rank - 1] is not None:
+                topic["volume"] = volumes[rank - 1]
+            topics.append(topic)
+            node = (country, rank)
+            signature = _SIGNATURE.unpack(stored[rank - 1] if stored else minhash(title))
+            self._signatures[node] = signature
+            checked: set[Posting] = set()
+            for band in range(BANDS):
+                bucket = self._buckets.setdefault((band, signature[band * ROWS:(band + 1) * ROWS]), set())
+                for other in bucket:
+                    if other[0] == country or other in checked:
+                        continue
+                    checked.add(other)
+                    if similarity(signature, self._signatures[other]) >= self.threshold:
+                        self._links.setdefault(node, set()).add(other)
+                        self._links.setdefault(other, set()).add(node)
+                bucket.add(node)
+        self._topics[country] = topics
+        self._updated_at[country] = updated_at
+        self._clusters = None
+
+    def remove_country(self, country: str) -> None:
+        for rank in range(1, len(self._topics.pop(country, [])) + 1):
+            node = (country, rank)
+            signature = self._signatures.pop(node)
+            for band in range(BANDS):
+                key = (band, signature[band * ROWS:(band + 1) * ROWS])
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(node)
+                    if not bucket:
+                        del self._buckets[key]
+            for other in self._links.pop(node, ()):
+                linked = self._links.get(other)
+                if linked is not None:
+                    linked.discard(node)
+                    if not linked:
+                        del self._links[other]
+        self._updated_at.pop(country, None)
+        self._clusters = None
+
+    def _replace_entry(self, country: str, entry: dict[str, Any]) -> None:
+        self.replace_country(
+            country,
+            entry.get("titles", []),
+            entry.get("title_minhash"),
+            entry.get("volumes"),
+            entry.get("updated_at"),
+        )
+
+    def _components(self) -> list[dict[str, Any]]:
+        clusters: list[dict[str, Any]] = []
+        seen: set[Posting] = set()
+        for start in self._links:
+            if start in seen:
+                continue
+            seen.add(start)
+            members, stack = [], [start]
+            while stack:
+                node = stack.pop()
+                members.append(node)
+                for other in self._links.get(node, ()):
+                    if other not in seen:
+                        seen.add(other)
+                        stack.append(other)
+            clusters.append(self._cluster([{"country": c, **self._topics[c][r - 1]} for c, r in members]))
+        return clusters
+
+    @staticmethod
+    def _cluster(topics: list[dict[str, Any]]) -> dict[str, Any]:
+        topics.sort(key=lambda t: (t["rank"], t["country"]))
+        countries = sorted({t["country"] for t in topics})
+        # Headline: the highest-volume title, else the best-ranked one
+        headline = max(topics, key=lambda t: (t.get("volume") or 0, -t["rank"]))
+        return {
+            "title": headline["title"],
+            "countries": countries,
+            "country_count": len(countries),
+            "volume": sum(t.get("volume") or 0 for t in topics),
+            "topics": topics,
+        }
+
+    def clusters(self, min_countries: int = 2, limit: int = 50) -> list[dict[str, Any]]:
+        """
+        Groups of near-duplicate titles, most countries first, then highest combined volume.
+
+        Titles without a near-duplicate elsewhere are single-country clusters,
+        returned only when min_countries is 1.
+        """
+        if self._clusters is None:
+            # Links only join different countries, so every component spans at least two
+            self._clusters = sorted(self._components(), key=self._order)
+        clusters = [c for c in self._clusters if c["country_count"] >= min_countries]
+        if min_countries <= 1 and len(clusters) < limit:
+            singles = [
+                self._cluster([{"country": country, **t}])
+                for country, topics in self._topics.items()
+                for t in topics
+                if (country, t["rank"]) not in self._links
+            ]
+            clusters += sorted(singles, key=self._order)
+        return clusters[:limit]
+
+    @staticmethod
+    def _order(cluster: dict[str, Any]) -> tuple[Any, ...]:
+        return -cluster["country_count"], -cluster["volume"], cluster["topics"][0]["rank"], cluster["title"]
+
+    def clear(self) -> None:
+        super().clear()
+        self._topics.clear()
+        self._signatures.clear()
+        self._buckets.clear()
+        self._links.clear()
+        self._clusters = None
+
+    def stats(self) -> dict[str, int]:
+        """Index size for /status."""
+        return {
+            "countries": len(self._topics),
+            "topics": len(self._signatures),
+            "buckets": len(self._buckets),
+            "links": sum(len(v) for v in self._links.values()) // 2,
+        }
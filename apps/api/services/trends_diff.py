@@ -0,0 +1,65 @@
+"""Rank and volume changes between two consecutive trends refreshes for a country."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+def _key(topic: dict[str, Any]) -> str:
+    """Match topics across refreshes by collapsed, case-folded title."""
+    return " ".join(str(topic.get("title", "")).split()).casefold()
+
+
+def _ranks(topics: list[dict[str, Any]]) -> dict[str, tuple[int, dict[str, Any]]]:
+    """Map topic key -> (1-based rank, topic). The first occurrence of a title wins."""
+    ranks: dict[str, tuple[int, dict[str, Any]]] = {}
+    for rank, topic in enumerate(topics, 1):
+        key = _key(topic)
+        if key and key not in ranks:
+            ranks[key] = (rank, topic)
+    return ranks
+
+
+def diff_topics(previous: list[dict[str, Any]], current: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    """
+    Compute what changed from `previous` to `current` (both ordered by rank).
+
+    Returns:
+        new: topics absent from the previous refresh, {title, rank, search_volume?}.
+        dropped: topics no longer listed, {title, previous_rank, previous_search_volume?}.
+        moved: topics whose rank or search volume changed, {title, rank, previous_rank,
+            rank_change (positive = climbed), search_volume?, previous_search_volume?}.
+    """
+    before = _ranks(previous)
+    after = _ranks(current)
+
+    new: list[dict[str, Any]] = []
+    moved: list[dict[str, Any]] = []
+    for key, (rank, topic) in after.items():
+        entry: dict[str, Any] = {"title": topic["title"], "rank": rank}
+        volume = topic.get("search_volume")
+        if volume:
+            entry["search_volume"] = volume
+        if key not in before:
+            new.append(entry)
+            continue
+        previous_rank, previous_topic = before[key]
+        previous_volume = previous_topic.get("search_volume")
+        if previous_rank == rank and previous_volume == volume:
+            continue
+        entry["previous_rank"] = previous_rank
+        entry["rank_change"] = previous_rank - rank
+        if previous_volume:
+            entry["previous_search_volume"] = previous_volume
+        moved.append(entry)
+
+    dropped: list[dict[str, Any]] = []
+    for key, (previous_rank, topic) in before.items():
+        if key in after:
+            continue
+        entry = {"title": topic["title"], "previous_rank": previous_rank}
+        if topic.get("search_volume"):
+            entry["previous_search_volume"] = topic["search_volume"]
+        dropped.append(entry)
+
+    return {"new": new, "dropped": dropped, "moved": moved}
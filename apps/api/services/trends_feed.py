@@ -0,0 +1,95 @@
+"""Fetch Google Trends trending-now data over plain HTTP (no browser)."""
+
+from __future__ import annotations
+
+import os
+import threading
+import xml.etree.ElementTree as ET
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from services.trends_scraper import LIMIT, TrendItem
+
+# RSS feed behind trends.google.com/trending (same items as the "Trending now" table)
+FEED_URL = "https://trends.google.com/trending/rss"
+FEED_TIMEOUT_S = float(os.getenv("TRENDS_FEED_TIMEOUT_S", "10"))
+FEED_POOL_SIZE = int(os.getenv("TRENDS_FEED_POOL_SIZE", "10"))
+
+_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Get the shared requests session (keep-alive pool reused across countries and threads)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=2,
+                    pool_maxsize=FEED_POOL_SIZE,
+                    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+                )
+                session.mount("https://", adapter)
+                session.headers.update({"User-Agent": _USER_AGENT, "Accept": "application/rss+xml, application/xml"})
+                _session = session
+    return _session
+
+
+def fetch_trending_feed(country: str) -> list[TrendItem]:
+    """
+    Fetch the trending-now feed for a country.
+
+    Args:
+        country: ISO 3166-1 alpha-2 country code (e.g. US, FR).
+
+    Returns:
+        Up to 25 trend items with title, search_volume, started. Empty list on failure.
+    """
+    try:
+        resp = get_session().get(FEED_URL, params={"geo": country.upper()}, timeout=FEED_TIMEOUT_S)
+        resp.raise_for_status()
+        return _parse_trending_feed(resp.content)
+    except Exception:
+        return []
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace: '{https://...}approx_traffic' -> 'approx_traffic'."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_trending_feed(content: bytes | str) -> list[TrendItem]:
+    """Parse trend items from the RSS feed. Maps approx_traffic -> search_volume, pubDate -> started."""
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError:
+        return []
+
+    topics: list[TrendItem] = []
+    seen: set[str] = set()
+    for item in root.iter("item"):
+        fields: dict[str, Any] = {}
+        for child in item:
+            name = _local_name(child.tag)
+            if name in ("title", "approx_traffic", "pubDate") and child.text:
+                fields[name] = child.text.strip()
+        title = fields.get("title", "")
+        if len(title) < 2 or title in seen:
+            continue
+        seen.add(title)
+        trend: TrendItem = {"title": title}
+        if fields.get("approx_traffic"):
+            trend["search_volume"] = fields["approx_traffic"]
+        if fields.get("pubDate"):
+            trend["started"] = fields["pubDate"]
+        topics.append(trend)
+        if len(topics) >= LIMIT:
+            break
+    return topics
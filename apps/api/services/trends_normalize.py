@@ -0,0 +1,212 @@
+"""Parse display strings of trend items ("200K+", "5 hours ago") into sortable numbers and timestamps."""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+# Volume suffixes across the US/GB, FR and DE domains ("200K+", "200 k+", "50 Tsd.+", "2 Mio.+", "1 Md+")
+_VOLUME_MULTIPLIERS = {
+    "": 1,
+    "k": 1_000,
+    "tsd": 1_000,
+    "m": 1_000_000,
+    "mn": 1_000_000,
+    "mio": 1_000_000,
+    "b": 1_000_000_000,
+    "md": 1_000_000_000,
+    "mrd": 1_000_000_000,
+}
+_VOLUME_RE = re.compile(r"^(\d[\d.,\s]*?)\s*([a-z]*)\.?\s*\+?$")
+_SPACES_RE = re.compile(r"\s")  # includes the narrow/no-break spaces of FR/DE
+
+# Relative start times: "5 hours ago", "il y a 5 heures", "vor 5 Stunden"
+_UNIT_SECONDS = {
+    "s": 1, "sec": 1, "second": 1, "seconde": 1, "sekunde": 1,
+    "m": 60, "min": 60, "minute": 60,
+    "h": 3600, "hr": 3600, "hour": 3600, "heure": 3600, "std": 3600, "stunde": 3600,
+    "d": 86400, "j": 86400, "day": 86400, "jour": 86400, "tag": 86400,
+}
+_ONE = {"a", "an", "one", "un", "une", "ein", "eine", "einer", "einem", "einen"}
+_RELATIVE_RE = re.compile(r"^(\d+|[a-z]+)\s*([a-zäöü]+)\.?$")
+_YESTERDAY = {"yesterday", "hier", "gestern"}
+_JUST_NOW = {"just now", "now", "à l'instant", "gerade eben", "jetzt"}
+
+# Trends CSV export: "October 17, 2026 at 8:00:00 AM UTC-7"
+_EXPORT_RE = re.compile(r"^([A-Za-z]+ \d{1,2}, \d{4}) at (\d{1,2}:\d{2}(?::\d{2})? [AP]M) UTC([+-]\d{1,2})?(?::?(\d{2}))?$")
+
+SORT_KEYS = ("rank", "volume", "started")
+
+
+def parse_search_volume(text: str | None) -> int | None:
+    """
+    Approximate searches from a display volume, or None if it can't be read.
+
+    "200K+" -> 200000, "2M+" -> 2000000, "1,000+" -> 1000 (US/GB);
+    "200 k+", "2 M+", "1 Md+" (FR); "200.000+", "50 Tsd.+", "1,5 Mio.+" (DE).
+    """
+    if not text:
+        return None
+    match = _VOLUME_RE.match(text.strip().lower())
+    if match is None:
+        return None
+    number, suffix = _SPACES_RE.sub("", match.group(1)), match.group(2)
+    multiplier = _VOLUME_MULTIPLIERS.get(suffix)
+    if multiplier is None:
+        return None
+    # With a suffix, "1.5M" / "1,5 Mio." carry a decimal part; otherwise separators group thousands
+    if multiplier > 1 and re.fullmatch(r"\d+[.,]\d{1,2}", number):
+        value = float(number.replace(",", "."))
+    else:
+        digits = re.sub(r"[.,]", "", number)
+        if not digits.isdigit():
+            return None
+        value = float(digits)
+    return int(round(value * multiplier))
+
+
+def parse_started(text: str | None, now: datetime) -> datetime | None:
+    """
+    Absolute UTC start time from a display value, or None if it can't be read.
+
+    Relative values ("5 hours ago", "il y a 5 heures", "vor 5 Stunden",
+    "yesterday") are resolved against `now` (the refresh time). Feed pubDates
+    (RFC 2822), ISO 8601 and the CSV export format are parsed as absolute times.
+    """
+    if not text:
+        return None
+    raw = text.strip()
+    lowered = raw.lower()
+    if lowered in _JUST_NOW:
+        return _utc(now)
+    if lowered in _YESTERDAY:
+        return _utc(now) - timedelta(days=1)
+
+    relative = _relative_seconds(lowered)
+    if relative is not None:
+        return _utc(now) - timedelta(seconds=relative)
+    return _parse_absolute(raw)
+
+
+def _relative_seconds(lowered: str) -> int | None:
+    if lowered.endswith(" ago"):
+        rest = lowered[:-4]
+    elif lowered.startswith("il y a "):
+        rest = lowered[7:]
+    elif lowered.startswith("vor "):
+        rest = lowered[4:]
+    else:
+        return None
+    match = _RELATIVE_RE.match(rest.strip())
+    if match is None:
+        return None
+    amount, unit = match.groups()
+    if amount.isdigit():
+        count = int(amount)
+    elif amount in _ONE:
+        count = 1
+    else:
+        return None
+    # Plurals: hours, heures, Stunden, Tage, Tagen
+    candidates = [unit]
+    if unit.endswith(("s", "n", "e")):
+        candidates.append(unit[:-1])
+    if unit.endswith("en"):
+        candidates.append(unit[:-2])
+    for candidate in candidates:
+        if candidate in _UNIT_SECONDS:
+            return count * _UNIT_SECONDS[candidate]
+    return None
+
+
+def _parse_absolute(raw: str) -> datetime | None:
+    try:
+        return _utc(parsedate_to_datetime(raw))
+    except (TypeError, ValueError, IndexError):
+        pass
+    try:
+        return _utc(datetime.fromisoformat(raw.replace("Z", "+00:00")))
+    except ValueError:
+        pass
+    match = _EXPORT_RE.match(raw)
+    if match is not None:
+        date, time, hours, minutes = match.groups()
+        fmt = "%B %d, %Y %I:%M:%S %p" if time.count(":") == 2 else "%B %d, %Y %I:%M %p"
+        try:
+            local = datetime.strptime(f"{date} {time}", fmt)
+        except ValueError:
+            return None
+        sign = -1 if hours and hours.startswith("-") else 1
+        offset = timedelta(hours=abs(int(hours or 0)), minutes=int(minutes or 0)) * sign
+        return _utc(local.replace(tzinfo=timezone(offset)))
+    return None
+
+
+def _utc(dt: datetime) -> datetime:
+    """Aware UTC at second precision (naive values are taken as UTC)."""
+    dt = dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+    return dt.replace(microsecond=0)
+
+
+def _isoformat(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def normalize_topic(topic: dict[str, Any], now: datetime) -> dict[str, Any]:
+    """
+    Copy of a topic with `volume` (int) and `started_at` (ISO 8601 UTC) added when parseable.
+
+    The display strings are kept unchanged for clients that show them.
+    """
+    out = {k: v for k, v in topic.items() if k not in ("volume", "started_at")}
+    volume = parse_search_volume(topic.get("search_volume"))
+    if volume is not None:
+        out["volume"] = volume
+    started = parse_started(topic.get("started"), now)
+    if started is not None:
+        out["started_at"] = _isoformat(started)
+    return out
+
+
+def select_topics(
+    topics: list[dict[str, Any]],
+    fetched_at: datetime,
+    sort: str = "rank",
+    min_volume: int | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+) -> list[dict[str, Any]]:
+    """
+    Filter, sort and page a stored topics list for /trends.
+
+    sort: "rank" (stored order), "volume" (highest first) or "started" (newest
+    first); topics without the value go last, ties keep rank order.
+    min_volume drops topics below it (and those without a volume).
+    Topics saved before normalization are parsed on the fly against fetched_at.
+    """
+    rows = [(t, _volume(t), _started_at(t, fetched_at)) for t in topics]
+    if min_volume is not None:
+        rows = [r for r in rows if r[1] is not None and r[1] >= min_volume]
+    if sort == "volume":
+        rows.sort(key=lambda r: (r[1] is None, -(r[1] or 0)))
+    elif sort == "started":
+        rows.sort(key=lambda r: (r[2] is None, -(r[2].timestamp() if r[2] else 0)))
+    selected = [r[0] for r in rows[offset:]]
+    return selected[:limit] if limit is not None else selected
+
+
+def _volume(topic: dict[str, Any]) -> int | None:
+    volume = topic.get("volume")
+    return volume if isinstance(volume, int) else parse_search_volume(topic.get("search_volume"))
+
+
+def _started_at(topic: dict[str, Any], fetched_at: datetime) -> datetime | None:
+    started_at = topic.get("started_at")
+    if isinstance(started_at, str):
+        try:
+            return datetime.fromisoformat(started_at.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+    return parse_started(topic.get("started"), fetched_at)
@@ -3,10 +3,15 @@
 from __future__ import annotations
 
 import csv
+import os
 import tempfile
+import time
 from pathlib import Path
 from typing import TypedDict
 
+from services.metrics import SCRAPER_DURATION, SCRAPER_OUTCOMES
+from services.tracing import span
+
 LIMIT = 25
 
 # Use locale-specific domain when available (e.g. trends.google.fr for FR)
@@ -21,6 +26,198 @@ class TrendItem(TypedDict, total=False):
     started: str
 
 
+_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Browser context recycling (ScraperSession): after N scrapes or once the page JS heap grows past M MB
+CONTEXT_MAX_USES = int(os.getenv("TRENDS_SCRAPER_CONTEXT_MAX_USES", "10"))
+CONTEXT_MAX_MEMORY_MB = float(os.getenv("TRENDS_SCRAPER_CONTEXT_MAX_MB", "512"))
+
+_JS_HEAP_USED = "() => (performance.memory ? performance.memory.usedJSHeapSize : 0)"
+
+# Fast mode: abort non-essential requests and wait for DOMContentLoaded instead of networkidle
+FAST_MODE = os.getenv("TRENDS_SCRAPER_FAST", "true").lower() in ("1", "true", "yes")
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+_BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+)
+
+# Selectors the page-level waits key on (instead of fixed sleeps)
+_ROW_SELECTOR = "[role='row'] td, table td"
+_ROW_COUNT = "n => document.querySelectorAll(\"[role='row']\").length > n"
+_RENDER_TIMEOUT_MS = 10000
+_MENU_TIMEOUT_MS = 3000
+_SCROLL_TIMEOUT_MS = 1500
+
+
+class _PooledContext:
+    """A browser context plus how many scrapes it has served."""
+
+    def __init__(self, context) -> None:
+        self.context = context
+        self.uses = 0
+
+
+class ScraperSession:
+    """
+    One headless Chromium shared by every country scraped in a worker run.
+
+    Each scrape gets its own page in a pooled browser context. Contexts have
+    their cookies cleared between countries and are closed and replaced after
+    `max_context_uses` scrapes, or once the page's JS heap exceeds
+    `max_context_memory_mb`. The browser is launched lazily on the first
+    scrape, so a session is free when the scraper ends up unused.
+
+    In fast mode (TRENDS_SCRAPER_FAST, default on) images, media, fonts and
+    analytics requests are aborted at the context level.
+
+    Playwright's sync API is bound to the thread that started it: use one
+    session per thread.
+
+    Usage:
+        with ScraperSession() as session:
+            for country in countries:
+                topics = session.scrape(country)
+    """
+
+    def __init__(
+        self,
+        max_context_uses: int = CONTEXT_MAX_USES,
+        max_context_memory_mb: float = CONTEXT_MAX_MEMORY_MB,
+        headless: bool = True,
+        fast: bool = FAST_MODE,
+    ) -> None:
+        self.max_context_uses = max(1, max_context_uses)
+        self.max_context_memory_mb = max_context_memory_mb
+        self.headless = headless
+        self.fast = fast
+        self._playwright = None
+        self._browser = None
+        self._idle: list[_PooledContext] = []
+        self.contexts_created = 0
+        self.contexts_recycled = 0
+
+    def __enter__(self) -> ScraperSession:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Start Playwright and launch Chromium (no-op if already running)."""
+        if self._browser is not None and self._browser.is_connected():
+            return
+        if self._browser is not None:
+            self._shutdown()  # browser crashed: start over
+        from playwright.sync_api import sync_playwright
+
+        with span("browser_launch"):
+            self._playwright = sync_playwright().start()
+            try:
+                self._browser = self._playwright.chromium.launch(headless=self.headless)
+            except Exception:
+                self._shutdown()
+                raise
+
+    def close(self) -> None:
+        """Close every pooled context, the browser and Playwright."""
+        self._shutdown()
+
+    def scrape(self, country: str) -> list[TrendItem]:
+        """
+        Scrape the first 25 trending topics for a country in an isolated context.
+
+        Returns an empty list if Playwright is not installed or the page fails.
+        """
+        try:
+            self.start()
+        except ImportError:
+            return []
+
+        pooled = self._acquire()
+        healthy = True
+        page = None
+        start = time.perf_counter()
+        try:
+            with span("new_page"):
+                page = pooled.context.new_page()
+            topics = _scrape_page(page, country, fast=self.fast)
+            healthy = self._within_memory_limit(page)
+            return topics
+        except Exception:
+            healthy = False
+            _record_outcome("failure", start)
+            return []
+        finally:
+            if page is not None:
+                try:
+                    page.close()
+                except Exception:
+                    healthy = False
+            self._release(pooled, healthy)
+
+    def stats(self) -> dict[str, int]:
+        """Context pool counters."""
+        return {
+            "contexts_created": self.contexts_created,
+            "contexts_recycled": self.contexts_recycled,
+            "contexts_idle": len(self._idle),
+        }
+
+    def _acquire(self) -> _PooledContext:
+        if self._idle:
+            return self._idle.pop()
+        context = self._browser.new_context(accept_downloads=True, user_agent=_USER_AGENT)
+        if self.fast:
+            context.route("**/*", _block_non_essential)
+        self.contexts_created += 1
+        return _PooledContext(context)
+
+    def _release(self, pooled: _PooledContext, healthy: bool) -> None:
+        pooled.uses += 1
+        if healthy and pooled.uses < self.max_context_uses:
+            try:
+                pooled.context.clear_cookies()
+                self._idle.append(pooled)
+                return
+            except Exception:
+                pass
+        self.contexts_recycled += 1
+        _close_quietly(pooled.context)
+
+    def _within_memory_limit(self, page) -> bool:
+        if self.max_context_memory_mb <= 0:
+            return True
+        try:
+            used = page.evaluate(_JS_HEAP_USED) or 0
+        except Exception:
+            return True
+        return used / (1024 * 1024) < self.max_context_memory_mb
+
+    def _shutdown(self) -> None:
+        while self._idle:
+            _close_quietly(self._idle.pop().context)
+        if self._browser is not None:
+            _close_quietly(self._browser)
+            self._browser = None
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+
+def _close_quietly(obj) -> None:
+    try:
+        obj.close()
+    except Exception:
+        pass
+
+
 def scrape_trending_topics(country: str) -> list[TrendItem]:
     """
     Scrape the first 25 trending topics from Google Trends for a country.
@@ -29,75 +226,99 @@ def scrape_trending_topics(country: str) -> list[TrendItem]:
     - Clicks the CSV download button and parses the file, or
     - Extracts trend titles from the DOM.
 
+    Thin wrapper over a one-off ScraperSession; the worker keeps one session
+    per run instead to avoid a browser launch per country.
+
     Args:
         country: ISO 3166-1 alpha-2 country code (e.g. US, FR).
 
     Returns:
         List of up to 25 trend items with title, search_volume, started.
     """
-    try:
-        from playwright.sync_api import sync_playwright
-    except ImportError:
-        return []
+    with ScraperSession() as session:
+        return session.scrape(country)
+
 
+def _block_non_essential(route) -> None:
+    """Route handler: abort images, media, fonts and analytics; let everything else through."""
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCE_TYPES or any(h in request.url for h in _BLOCKED_HOSTS):
+        route.abort()
+    else:
+        route.continue_()
+
+
+def _scrape_page(page, country: str, fast: bool = FAST_MODE) -> list[TrendItem]:
+    """
+    Load the trending page for a country in `page` and extract up to 25 items.
+
+    Every wait is tied to a page event (table rows rendered, export menu shown,
+    download started, new rows after scrolling) rather than a fixed sleep.
+    """
     domain = _COUNTRY_DOMAIN.get(country, "trends.google.com")
     url = f"https://{domain}/trending?geo={country}"
     topics: list[TrendItem] = []
+    start = time.perf_counter()
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            accept_downloads=True,
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        )
-        page = context.new_page()
-
+    with span("goto"):
+        page.goto(url, wait_until="domcontentloaded" if fast else "networkidle", timeout=30000)
+    with span("render_wait"):
         try:
-            page.goto(url, wait_until="networkidle", timeout=30000)
-            page.wait_for_timeout(4000)  # Allow dynamic content to render
-
-            # Try CSV download first (Export -> Download CSV / Télécharger au format CSV)
-            export_btn = page.locator('button:has-text("Export"), button:has-text("Exporter")').first
-            if export_btn.is_visible(timeout=2000):
-                try:
-                    with tempfile.TemporaryDirectory() as tmpdir:
-                        download_path = Path(tmpdir) / "trends.csv"
-                        with page.expect_download(timeout=15000) as download_info:
-                            export_btn.click()
-                            page.wait_for_timeout(1200)
-                            csv_btn = page.get_by_role("menuitem").filter(has_text="CSV").first
-                            if not csv_btn.is_visible(timeout=2000):
-                                csv_btn = page.locator('a:has-text("CSV"), [role="menuitem"]:has-text("CSV")').first
-                            if csv_btn.is_visible(timeout=2000):
-                                csv_btn.click()
-                        download = download_info.value
-                        download.save_as(download_path)
-                        topics = _parse_trends_csv(download_path)
-                except Exception:
-                    pass
-
-            # Fallback: extract from DOM
-            if not topics:
-                # Scroll to load lazy-rendered rows (table often virtualizes)
-                try:
-                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    page.wait_for_timeout(1500)
-                    page.evaluate("window.scrollTo(0, 0)")
-                    page.wait_for_timeout(500)
-                except Exception:
-                    pass
-                topics = _extract_from_dom(page)
+            page.wait_for_selector(_ROW_SELECTOR, state="visible", timeout=_RENDER_TIMEOUT_MS)
+        except Exception:
+            pass  # No table rendered: the DOM fallback below still tries other selectors
 
-            browser.close()
+    # Try CSV download first (Export -> Download CSV / Télécharger au format CSV)
+    export_btn = page.locator('button:has-text("Export"), button:has-text("Exporter")').first
+    if export_btn.is_visible():
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                download_path = Path(tmpdir) / "trends.csv"
+                with page.expect_download(timeout=15000) as download_info:
+                    with span("export_click"):
+                        export_btn.click()
+                        csv_btn = page.get_by_role("menuitem").filter(has_text="CSV").first
+                        try:
+                            csv_btn.wait_for(state="visible", timeout=_MENU_TIMEOUT_MS)
+                        except Exception:
+                            csv_btn = page.locator('a:has-text("CSV"), [role="menuitem"]:has-text("CSV")').first
+                            csv_btn.wait_for(state="visible", timeout=_MENU_TIMEOUT_MS)
+                        csv_btn.click()
+                with span("csv_download") as stage:
+                    download = download_info.value
+                    download.save_as(download_path)
+                    topics = _parse_trends_csv(download_path)
+                    if stage is not None:
+                        stage.set(items=len(topics))
         except Exception:
+            pass
+    if topics:
+        _record_outcome("csv", start)
+
+    # Fallback: extract from DOM
+    if not topics:
+        with span("dom_extract") as stage:
+            # Scroll to load lazy-rendered rows (table often virtualizes); stop waiting as soon as new rows appear
             try:
-                browser.close()
+                row_count = page.locator("[role='row']").count()
+                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                page.wait_for_function(_ROW_COUNT, arg=row_count, timeout=_SCROLL_TIMEOUT_MS)
             except Exception:
                 pass
+            topics = _extract_from_dom(page)
+            if stage is not None:
+                stage.set(items=len(topics))
+        _record_outcome("dom" if topics else "failure", start)
 
     return topics[:LIMIT]
 
 
+def _record_outcome(path: str, start: float) -> None:
+    """Count a scrape by extraction path (csv, dom, failure) and observe its duration."""
+    SCRAPER_OUTCOMES.inc(path=path)
+    SCRAPER_DURATION.observe(time.perf_counter() - start, path=path)
+
+
 # Header-like values to skip (exact or start of first column)
 _CSV_SKIP = (
     "trend", "tendances", "topic", "query", "search", "recherche",
@@ -136,18 +357,60 @@ def _parse_trends_csv(path: Path) -> list[TrendItem]:
     return topics
 
 
+# Header-like titles the DOM extraction ignores
+_DOM_SKIP = {
+    "trends", "tendances", "export", "exporter", "search", "recherche",
+    "trend", "volume", "started", "démarrée", "tendances de recherche",
+    "search trends", "composition", "état",
+}
+
+# Title-only selectors tried when the rows yield fewer than 5 items
+_DOM_FALLBACK_SELECTORS = (
+    "tr[role='row'] td:first-child",
+    "[role='row'] td:first-child",
+    "table td:first-child",
+    "a[href*='/trends/explore']",
+)
+
+# Runs in the page: the first three cells of every row plus the fallback columns, in one round trip.
+# Cell text keeps only its first line (title/volume/started, not the sub-labels under it).
+_EXTRACT_ROWS = """
+([selectors, limit]) => {
+  const text = (el) => ((el && el.innerText) || "").trim().split("\\n")[0].trim();
+  const rows = [];
+  for (const row of Array.from(document.querySelectorAll("[role='row'], tr")).slice(1)) {
+    const cells = row.querySelectorAll("td");
+    if (cells.length) rows.push(Array.from(cells).slice(0, 3).map(text));
+  }
+  const fallback = selectors.map(
+    (sel) => Array.from(document.querySelectorAll(sel)).slice(0, limit * 2).map(text)
+  );
+  return {rows, fallback};
+}
+"""
+
+
 def _extract_from_dom(page) -> list[TrendItem]:
-    """Extract trend items from page DOM. Table columns: title, search_volume, started."""
-    skip = {
-        "trends", "tendances", "export", "exporter", "search", "recherche",
-        "trend", "volume", "started", "démarrée", "tendances de recherche",
-        "search trends", "composition", "état",
-    }
+    """
+    Extract trend items from page DOM. Table columns: title, search_volume, started.
+
+    All rows and fallback columns are read with a single page.evaluate instead
+    of one inner_text round trip per cell.
+    """
+    try:
+        data = page.evaluate(_EXTRACT_ROWS, [list(_DOM_FALLBACK_SELECTORS), LIMIT])
+    except Exception:
+        return []
+    return _items_from_rows(data.get("rows") or [], data.get("fallback") or [])
+
+
+def _items_from_rows(rows: list[list[str]], fallback: list[list[str]]) -> list[TrendItem]:
+    """Apply the skip list and dedup rules to extracted cell text (rows first, then fallback columns)."""
     best: list[TrendItem] = []
     seen: set[str] = set()
 
     def _add(title: str, volume: str = "", started: str = "") -> None:
-        if not title or title.lower() in skip or title in seen or not (2 < len(title) < 200):
+        if not title or title.lower() in _DOM_SKIP or title in seen or not (2 < len(title) < 200):
             return
         seen.add(title)
         item: TrendItem = {"title": title}
@@ -157,43 +420,19 @@ def _extract_from_dom(page) -> list[TrendItem]:
             item["started"] = started
         best.append(item)
 
-    try:
-        # 1. Rows via get_by_role - extract all columns
-        rows = page.get_by_role("row").all()
-        for row in rows[1:]:  # Skip header row
-            try:
-                cells = row.locator("td").all()
-                if len(cells) >= 1:
-                    title = cells[0].inner_text().strip().split("\n")[0].strip()
-                    volume = cells[1].inner_text().strip().split("\n")[0].strip() if len(cells) > 1 else ""
-                    started = cells[2].inner_text().strip().split("\n")[0].strip() if len(cells) > 2 else ""
-                    _add(title, volume, started)
-            except Exception:
-                pass
+    # 1. Rows: all columns
+    for cells in rows:
+        if cells:
+            _add(cells[0], cells[1] if len(cells) > 1 else "", cells[2] if len(cells) > 2 else "")
+        if len(best) >= LIMIT:
+            break
+
+    # 2. Fallback: first column only (no volume/started)
+    if len(best) < 5:
+        for titles in fallback:
+            for title in titles[:LIMIT * 2]:
+                _add(title)
             if len(best) >= LIMIT:
                 break
 
-        # 2. Fallback: first column only (no volume/started)
-        if len(best) < 5:
-            for sel in [
-                "tr[role='row'] td:first-child",
-                "[role='row'] td:first-child",
-                "table td:first-child",
-                "a[href*='/trends/explore']",
-            ]:
-                try:
-                    for el in page.locator(sel).all()[:LIMIT * 2]:
-                        try:
-                            raw = el.inner_text().strip()
-                            title = raw.split("\n")[0].strip() if raw else ""
-                            _add(title)
-                        except Exception:
-                            continue
-                    if len(best) >= LIMIT:
-                        break
-                except Exception:
-                    continue
-    except Exception:
-        pass
-
     return best[:LIMIT]
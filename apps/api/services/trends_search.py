@@ -0,0 +1,203 @@
+"""Cross-country topic title search: tokenizer and the in-memory inverted index used by /trends/search."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import re
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from typing import Any
+
+# {country: {"titles": [...], "volumes": [...], "updated_at": datetime, "title_tokens" or "title_minhash": [...]}}
+EntriesLoader = Callable[[list[str] | None], Awaitable[dict[str, dict[str, Any]]]]
+VersionsFetcher = Callable[[], Awaitable[dict[str, Any] | None]]
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """Case- and accent-insensitive form: 'Café Müller' -> 'cafe muller'."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    """Folded word tokens of a title or query, in order, without duplicates."""
+    return list(dict.fromkeys(_TOKEN_RE.findall(fold(text))))
+
+
+# (country, rank) of one topic
+Posting = tuple[str, int]
+
+
+class CountryMirror(ABC):
+    """
+    Base for in-memory indexes mirrored per country from the trends collection.
+
+    Loads every country once, then polls the trends version document (like
+    TrendsCache) at most once per poll_interval and reloads only the countries
+    whose updated_at moved. Subclasses implement _replace_entry, which must
+    record the entry's updated_at in self._updated_at.
+    """
+
+    def __init__(self, poll_interval: float = 5.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._updated_at: dict[str, datetime | None] = {}
+        self._loaded = False
+        self._version: int | None = None
+        self._next_poll = 0.0
+        self._lock: asyncio.Lock | None = None
+
+    @abstractmethod
+    def _replace_entry(self, country: str, entry: dict[str, Any]) -> None:
+        """Swap one country's indexed data for a loader entry and record its updated_at."""
+
+    async def sync(self, loader: EntriesLoader, versions: VersionsFetcher) -> None:
+        """Load every country on first use, then (at most once per poll_interval) reload changed countries."""
+        if self._loaded and self._clock() < self._next_poll:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._loaded:
+                for country, entry in (await loader(None)).items():
+                    self._replace_entry(country, entry)
+                self._loaded = True
+                self._next_poll = self._clock() + self.poll_interval
+                return
+            if self._clock() < self._next_poll:
+                return
+            self._next_poll = self._clock() + self.poll_interval
+            try:
+                current = await versions()
+            except Exception:
+                return  # DB unreachable: keep serving the mirror as it is
+            if current is None or current.get("version") == self._version:
+                return
+            self._version = current.get("version")
+            stamps = current.get("countries") or {}
+            changed = [c for c, stamp in stamps.items() if self._updated_at.get(c) != stamp]
+            if changed:
+                for country, entry in (await loader(changed)).items():
+                    self._replace_entry(country, entry)
+
+    def clear(self) -> None:
+        """Drop the mirror (the next sync reloads every country)."""
+        self._updated_at.clear()
+        self._loaded = False
+        self._version = None
+        self._next_poll = 0.0
+        self._lock = None
+
+
+class TrendsSearchIndex(CountryMirror):
+    """
+    Inverted index from title tokens to (country, rank), mirrored from MongoDB.
+
+    save_trends stores each country's per-title tokens with its topics; the
+    mirror reloads only the countries that changed (see CountryMirror). Query
+    tokens match index tokens by prefix over a sorted vocabulary, and a topic
+    matches when every query token does.
+    """
+
+    def __init__(self, poll_interval: float = 5.0, clock: Callable[[], float] = time.monotonic) -> None:
+        super().__init__(poll_interval, clock)
+        self._postings: dict[str, set[Posting]] = {}
+        self._vocab: list[str] = []
+        self._topics: dict[str, list[dict[str, Any]]] = {}
+        self._tokens: dict[str, list[list[str]]] = {}
+
+    def replace_country(
+        self,
+        country: str,
+        titles: list[str],
+        title_tokens: list[list[str]] | None = None,
+        volumes: list[int | None] | None = None,
+        updated_at: datetime | None = None,
+    ) -> None:
+        """Swap one country's postings for its latest topics (tokens computed when not stored)."""
+        self.remove_country(country)
+        tokens_per_title = title_tokens if title_tokens and len(title_tokens) == len(titles) else None
+        topics: list[dict[str, Any]] = []
+        tokens: list[list[str]] = []
+        for rank, title in enumerate(titles, 1):
+            topic: dict[str, Any] = {"title": title, "rank": rank}
+            if volumes and rank <= len(volumes) and volumes[rank - 1] is not None:
+                topic["volume"] = volumes[rank - 1]
+            topics.append(topic)
+            tokens.append(tokens_per_title[rank - 1] if tokens_per_title else tokenize(title))
+            for token in tokens[-1]:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = set()
+                    bisect.insort(self._vocab, token)
+                postings.add((country, rank))
+        self._topics[country] = topics
+        self._tokens[country] = tokens
+        self._updated_at[country] = updated_at
+
+    def remove_country(self, country: str) -> None:
+        self._topics.pop(country, None)
+        for rank, tokens in enumerate(self._tokens.pop(country, []), 1):
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                postings.discard((country, rank))
+                if not postings:
+                    del self._postings[token]
+                    i = bisect.bisect_left(self._vocab, token)
+                    if i < len(self._vocab) and self._vocab[i] == token:
+                        del self._vocab[i]
+        self._updated_at.pop(country, None)
+
+    def _prefix_postings(self, prefix: str) -> set[Posting]:
+        out: set[Posting] = set()
+        i = bisect.bisect_left(self._vocab, prefix)
+        while i < len(self._vocab) and self._vocab[i].startswith(prefix):
+            out |= self._postings[self._vocab[i]]
+            i += 1
+        return out
+
+    def search(self, query: str, limit: int = 50) -> list[dict[str, Any]]:
+        """Topics whose title has a token starting with each query token, by rank then country."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Most selective token first so the intersection shrinks fast
+        matches: set[Posting] | None = None
+        for postings in sorted((self._prefix_postings(t) for t in tokens), key=len):
+            matches = postings if matches is None else matches & postings
+            if not matches:
+                return []
+        ordered = sorted(matches or (), key=lambda p: (p[1], p[0]))[:limit]
+        return [{"country": country, **self._topics[country][rank - 1]} for country, rank in ordered]
+
+    def _replace_entry(self, country: str, entry: dict[str, Any]) -> None:
+        self.replace_country(
+            country,
+            entry.get("titles", []),
+            entry.get("title_tokens"),
+            entry.get("volumes"),
+            entry.get("updated_at"),
+        )
+
+    def clear(self) -> None:
+        super().clear()
+        self._postings.clear()
+        self._vocab.clear()
+        self._topics.clear()
+        self._tokens.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Index size for /status."""
+        return {
+            "countries": len(self._topics),
+            "topics": sum(len(t) for t in self._topics.values()),
+            "tokens": len(self._vocab),
+        }
@@ -2,40 +2,69 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import gzip
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any
 
-from db import get_trends_collection
-from models import TrendsDocument
+from pymongo import ReturnDocument
 
+from db import (
+    get_trends_changes_collection,
+    get_trends_collection,
+    get_trends_meta_collection,
+    get_trends_snapshots_collection,
+)
+from models import TrendsDocument, TrendsResponse
+from services.metrics import DB_OPERATION_DURATION, timed
+from services.trends_diff import diff_topics
+from services.trends_clusters import minhash
+from services.trends_normalize import normalize_topic
+from services.trends_search import tokenize
 
-def save_trends(country: str, topics: list[dict] | list[str], source: str = "api") -> None:
+try:
+    import brotli
+except ImportError:  # optional: without it /trends is served as gzip or identity only
+    brotli = None
+
+# _id of the document in trends_meta that API replicas poll to invalidate their caches
+TRENDS_VERSION_ID = "trends_version"
+
+
+@timed(DB_OPERATION_DURATION, operation="save_trends")
+def save_trends(country: str, topics: list[dict] | list[str], source: str = "api") -> dict[str, Any] | None:
     """
     Save or update trends for a country in MongoDB.
 
-    Uses upsert: replaces existing document for the country.
+    Uses upsert: replaces existing document for the country (including the
+    pre-serialized /trends response), appends a snapshot to the trends history,
+    stores the delta against the replaced topics in trends_changes, then bumps
+    the trends version document so API caches drop their copy of this country.
     topics: list of dicts {title, search_volume?, started?} or list of strings (legacy).
+        Parseable values gain `volume` (int) and `started_at` (ISO 8601 UTC).
+
+    Returns:
+        The stored changes document, or None on the country's first save.
     """
-    now = datetime.now(timezone.utc)
-    # Normalize: convert list[str] to list[dict]
-    normalized = [
-        t if isinstance(t, dict) else {"title": str(t)}
-        for t in topics
-    ]
-    doc = {
-        "country": country.upper(),
-        "topics": normalized,
-        "source": source,
-        "fetched_at": now,
-        "updated_at": now,
-    }
+    doc = _build_trends_doc(country, topics, source)
     coll = get_trends_collection()
-    coll.update_one(
-        {"country": country.upper()},
+    previous = coll.find_one_and_update(
+        {"country": doc["country"]},
         {"$set": doc},
+        projection=_PREVIOUS_PROJECTION,
         upsert=True,
+        return_document=ReturnDocument.BEFORE,
     )
+    get_trends_snapshots_collection().insert_one(_snapshot_doc(doc))
+    changes = _changes_doc(doc, previous)
+    if changes is not None:
+        get_trends_changes_collection().update_one({"country": doc["country"]}, {"$set": changes}, upsert=True)
+    get_trends_meta_collection().update_one(*_version_bump(doc), upsert=True)
+    return changes
 
 
+@timed(DB_OPERATION_DURATION, operation="get_trends_from_db")
 def get_trends_from_db(country: str) -> TrendsDocument | None:
     """
     Get the latest trends for a country from MongoDB.
@@ -43,21 +72,186 @@ def get_trends_from_db(country: str) -> TrendsDocument | None:
     Returns None if no document exists for the country.
     """
     coll = get_trends_collection()
-    doc = coll.find_one({"country": country.upper()})
+    doc = coll.find_one({"country": country.upper()}, _TRENDS_PROJECTION)
     if doc is None:
         return None
-    raw_topics = doc.get("topics", [])
-    # Normalize: legacy list[str] -> list[dict]
-    topics = [
+    return _to_trends_document(doc)
+
+
+def topics_hash(topics: list[dict[str, Any]]) -> str:
+    """Stable content hash of a topics list, used as the /trends ETag."""
+    payload = json.dumps(topics, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def trends_etag(topics_hash: str, fetched_at: datetime) -> str:
+    """
+    Strong /trends ETag: the topics hash plus fetched_at, which the body also carries.
+
+    fetched_at counts at MongoDB's millisecond precision (naive values are UTC),
+    so the ETag built at write time matches the one built from the read-back
+    document, and a refresh with unchanged topics still gets a new validator.
+    """
+    aware = fetched_at.replace(tzinfo=timezone.utc) if fetched_at.tzinfo is None else fetched_at
+    millis = (aware - _EPOCH) // timedelta(milliseconds=1)
+    return f"{topics_hash}.{millis:x}"
+
+
+def _normalize_topics(topics: list[Any]) -> list[dict[str, Any]]:
+    """Normalize: legacy list[str] -> list[dict]."""
+    return [
         t if isinstance(t, dict) else {"title": str(t)}
-        for t in raw_topics
+        for t in topics
     ]
+
+
+def _build_trends_doc(country: str, topics: list[dict] | list[str], source: str) -> dict[str, Any]:
+    """Build the MongoDB document written by save_trends (shared with the async store)."""
+    now = datetime.now(timezone.utc)
+    normalized = _normalize_topics(topics)
+    # Display strings parsed once here: numeric volume and absolute started_at for sort/filter
+    stored = [normalize_topic(t, now) for t in normalized]
+    doc = {
+        "country": country.upper(),
+        "topics": stored,
+        # Hash of the topics as stored (and served): a moved started_at is a different body, so a new ETag
+        "topics_hash": topics_hash(stored),
+        "source": source,
+        "fetched_at": now,
+        "updated_at": now,
+    }
+    # Per-title search tokens and MinHash signatures, mirrored into the API's
+    # /trends/search and /trends/global indexes (computed only for the refreshed country)
+    doc["title_tokens"] = [tokenize(t.get("title", "")) for t in normalized]
+    doc["title_minhash"] = [minhash(t.get("title", "")) for t in normalized]
+    doc["response"] = _response_doc(doc)
+    return doc
+
+
+# Fields needed to build TrendsDocument (skips _id and the pre-serialized response bytes)
+_TRENDS_PROJECTION = {
+    "_id": 0,
+    "country": 1,
+    "topics": 1,
+    "topics_hash": 1,
+    "source": 1,
+    "fetched_at": 1,
+    "updated_at": 1,
+}
+
+# Fields needed to serve /trends from the pre-serialized response
+_RESPONSE_PROJECTION = {"_id": 0, "response": 1, "fetched_at": 1, "updated_at": 1}
+
+
+# Fields needed to mirror a country into the /trends/search and /trends/global indexes
+_SEARCH_PROJECTION = {"_id": 0, "country": 1, "topics": 1, "title_tokens": 1, "updated_at": 1}
+_CLUSTER_PROJECTION = {"_id": 0, "country": 1, "topics": 1, "title_minhash": 1, "updated_at": 1}
+
+
+def _to_index_entry(doc: dict[str, Any]) -> dict[str, Any]:
+    """
+    In-memory index entry from a trends document: titles, volumes, updated_at,
+    plus the stored per-title tokens or MinHash signatures that were projected.
+    """
+    topics = _normalize_topics(doc.get("topics", []))
+    entry = {
+        "titles": [t.get("title", "") for t in topics],
+        "volumes": [t.get("volume") for t in topics],
+        "updated_at": doc.get("updated_at"),
+    }
+    for field in ("title_tokens", "title_minhash"):
+        if field in doc:
+            entry[field] = doc[field]
+    return entry
+
+
+def _response_doc(doc: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    The /trends body for `doc` encoded once at write time: JSON plus gzip and brotli variants.
+
+    Byte-for-byte what the API would render from the stored document (fetched_at
+    at MongoDB's millisecond precision, naive UTC as read back). None without
+    topics: /trends then serves its empty fallback.
+    """
+    if not doc["topics"]:
+        return None
+    fetched_at = doc["fetched_at"].astimezone(timezone.utc).replace(tzinfo=None)
+    fetched_at = fetched_at.replace(microsecond=fetched_at.microsecond // 1000 * 1000)
+    body = json.dumps(
+        {"country": doc["country"], "topics": doc["topics"], "source": "db", "fetched_at": fetched_at.isoformat()},
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    encodings = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encodings["br"] = brotli.compress(body, quality=11)
+    return {"etag": trends_etag(doc["topics_hash"], doc["fetched_at"]), "encodings": encodings}
+
+
+def _to_trends_response(doc: dict[str, Any]) -> TrendsResponse | None:
+    """TrendsResponse from a document read with _RESPONSE_PROJECTION (None if it has no stored response)."""
+    response = doc.get("response")
+    if not response:
+        return None
+    fetched = doc.get("fetched_at") or doc.get("updated_at")
+    return TrendsResponse(
+        etag=response["etag"],
+        fetched_at=fetched,
+        updated_at=doc.get("updated_at") or fetched,
+        bodies=response["encodings"],
+    )
+
+
+# Fields of the replaced document needed to diff against it
+_PREVIOUS_PROJECTION = {"_id": 0, "topics": 1, "fetched_at": 1}
+
+
+def _changes_doc(doc: dict[str, Any], previous: dict[str, Any] | None) -> dict[str, Any] | None:
+    """Delta between the replaced and the new topics (None when there was nothing to replace)."""
+    if previous is None:
+        return None
+    return {
+        "country": doc["country"],
+        "fetched_at": doc["fetched_at"],
+        "previous_fetched_at": previous.get("fetched_at"),
+        **diff_topics(_normalize_topics(previous.get("topics", [])), doc["topics"]),
+    }
+
+
+def _snapshot_doc(doc: dict[str, Any]) -> dict[str, Any]:
+    """History entry for a saved trends document (a copy: insert_one adds _id)."""
+    return {
+        "country": doc["country"],
+        "topics": doc["topics"],
+        "topics_hash": doc["topics_hash"],
+        "source": doc["source"],
+        "fetched_at": doc["fetched_at"],
+    }
+
+
+def _version_bump(doc: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Filter and update that bump the trends version and record the country's updated_at."""
+    return (
+        {"_id": TRENDS_VERSION_ID},
+        {"$inc": {"version": 1}, "$set": {f"countries.{doc['country']}": doc["updated_at"]}},
+    )
+
+
+def _to_trends_document(doc: dict[str, Any]) -> TrendsDocument:
+    """Convert a raw MongoDB document into a TrendsDocument (shared with the async store)."""
     fetched = doc.get("fetched_at") or doc.get("updated_at")
     updated = doc.get("updated_at") or doc.get("fetched_at")
+    topics = _normalize_topics(doc.get("topics", []))
     return TrendsDocument(
         country=doc["country"],
         topics=topics,
         source=doc.get("source", "fallback"),
         fetched_at=fetched,
         updated_at=updated,
+        # Documents written before topics_hash existed get it computed on read
+        topics_hash=doc.get("topics_hash") or topics_hash(topics),
     )
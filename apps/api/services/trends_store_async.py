@@ -0,0 +1,178 @@
+"""Async trends storage and retrieval from MongoDB (used by the API event loop)."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+
+from pymongo import ReturnDocument
+
+from db import (
+    get_async_trends_changes_collection,
+    get_async_trends_collection,
+    get_async_trends_meta_collection,
+    get_async_trends_snapshots_collection,
+)
+from models import TrendsDocument, TrendsResponse
+from services.metrics import DB_OPERATION_DURATION, timed
+from services.trends_store import (
+    _PREVIOUS_PROJECTION,
+    _CLUSTER_PROJECTION,
+    _RESPONSE_PROJECTION,
+    _SEARCH_PROJECTION,
+    _TRENDS_PROJECTION,
+    TRENDS_VERSION_ID,
+    _build_trends_doc,
+    _changes_doc,
+    _snapshot_doc,
+    _to_trends_document,
+    _to_index_entry,
+    _to_trends_response,
+    _version_bump,
+)
+
+# Snapshots fetched per cursor round trip when streaming /trends/history
+HISTORY_BATCH_SIZE = 50
+
+
+@timed(DB_OPERATION_DURATION, operation="save_trends")
+async def save_trends(country: str, topics: list[dict] | list[str], source: str = "api") -> dict[str, Any] | None:
+    """
+    Save or update trends for a country in MongoDB without blocking the event loop.
+
+    Same document shape, upsert semantics and return value as services.trends_store.save_trends.
+    """
+    doc = _build_trends_doc(country, topics, source)
+    coll = get_async_trends_collection()
+    previous = await coll.find_one_and_update(
+        {"country": doc["country"]},
+        {"$set": doc},
+        projection=_PREVIOUS_PROJECTION,
+        upsert=True,
+        return_document=ReturnDocument.BEFORE,
+    )
+    await get_async_trends_snapshots_collection().insert_one(_snapshot_doc(doc))
+    changes = _changes_doc(doc, previous)
+    if changes is not None:
+        await get_async_trends_changes_collection().update_one({"country": doc["country"]}, {"$set": changes}, upsert=True)
+    await get_async_trends_meta_collection().update_one(*_version_bump(doc), upsert=True)
+    return changes
+
+
+@timed(DB_OPERATION_DURATION, operation="get_trends_from_db")
+async def get_trends_from_db(country: str) -> TrendsDocument | None:
+    """
+    Get the latest trends for a country from MongoDB without blocking the event loop.
+
+    Returns None if no document exists for the country.
+    """
+    coll = get_async_trends_collection()
+    doc = await coll.find_one({"country": country.upper()}, _TRENDS_PROJECTION)
+    if doc is None:
+        return None
+    return _to_trends_document(doc)
+
+
+@timed(DB_OPERATION_DURATION, operation="get_trends_response")
+async def get_trends_response(country: str) -> TrendsResponse | None:
+    """
+    Get the pre-serialized /trends response for a country (JSON bytes and compressed variants).
+
+    Returns None if the country has no document, no topics, or was saved before
+    responses were stored (callers then build the payload from get_trends_from_db).
+    """
+    coll = get_async_trends_collection()
+    doc = await coll.find_one({"country": country.upper()}, _RESPONSE_PROJECTION)
+    if doc is None:
+        return None
+    return _to_trends_response(doc)
+
+
+@timed(DB_OPERATION_DURATION, operation="get_trends_for_countries")
+async def get_trends_for_countries(countries: list[str]) -> dict[str, TrendsDocument]:
+    """
+    Get the latest trends for several countries with a single $in query.
+
+    Returns a map of country code to document; countries without data are absent.
+    """
+    codes = [c.upper() for c in countries]
+    coll = get_async_trends_collection()
+    cursor = coll.find({"country": {"$in": codes}}, _TRENDS_PROJECTION)
+    found: dict[str, TrendsDocument] = {}
+    async for doc in cursor:
+        found[doc["country"]] = _to_trends_document(doc)
+    return found
+
+
+@timed(DB_OPERATION_DURATION, operation="get_trends_search_entries")
+async def get_trends_search_entries(countries: list[str] | None = None) -> dict[str, dict[str, Any]]:
+    """
+    Get the titles and stored search tokens of every country (or of `countries`) for /trends/search.
+
+    Returns a map of country code to TrendsSearchIndex entry; countries without data are absent.
+    """
+    query = {} if countries is None else {"country": {"$in": [c.upper() for c in countries]}}
+    cursor = get_async_trends_collection().find(query, _SEARCH_PROJECTION)
+    return {doc["country"]: _to_index_entry(doc) async for doc in cursor}
+
+
+@timed(DB_OPERATION_DURATION, operation="get_trends_cluster_entries")
+async def get_trends_cluster_entries(countries: list[str] | None = None) -> dict[str, dict[str, Any]]:
+    """
+    Get the titles and stored MinHash signatures of every country (or of `countries`) for /trends/global.
+
+    Returns a map of country code to TrendsClusterIndex entry; countries without data are absent.
+    """
+    query = {} if countries is None else {"country": {"$in": [c.upper() for c in countries]}}
+    cursor = get_async_trends_collection().find(query, _CLUSTER_PROJECTION)
+    return {doc["country"]: _to_index_entry(doc) async for doc in cursor}
+
+
+async def get_trends_versions() -> dict[str, Any] | None:
+    """
+    Get the trends version document bumped by save_trends.
+
+    Returns {"version": int, "countries": {code: updated_at}} or None if never written.
+    """
+    coll = get_async_trends_meta_collection()
+    doc = await coll.find_one({"_id": TRENDS_VERSION_ID})
+    if doc is None:
+        return None
+    return {"version": doc.get("version", 0), "countries": doc.get("countries") or {}}
+
+
+async def get_trends_changes(country: str) -> dict[str, Any] | None:
+    """Get the latest refresh-over-refresh delta for a country, or None if there is none yet."""
+    return await get_async_trends_changes_collection().find_one({"country": country.upper()}, {"_id": 0})
+
+
+async def iter_trends_history(
+    country: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = 100,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Yield trends snapshots for a country, newest first.
+
+    Uses the (country, fetched_at) index and a projected cursor read in batches
+    of HISTORY_BATCH_SIZE, so the range is never loaded into memory at once.
+    """
+    query: dict[str, Any] = {"country": country.upper()}
+    if start is not None or end is not None:
+        query["fetched_at"] = {}
+        if start is not None:
+            query["fetched_at"]["$gte"] = start
+        if end is not None:
+            query["fetched_at"]["$lte"] = end
+    coll = get_async_trends_snapshots_collection()
+    cursor = coll.find(
+        query,
+        {"_id": 0, "country": 1, "topics": 1, "source": 1, "fetched_at": 1},
+        sort=[("fetched_at", -1)],
+        limit=limit,
+        batch_size=HISTORY_BATCH_SIZE,
+    )
+    async for doc in cursor:
+        yield doc
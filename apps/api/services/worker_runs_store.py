@@ -0,0 +1,12 @@
+"""Worker run report storage in MongoDB."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from db import get_worker_runs_collection
+
+
+def save_worker_run(report: dict[str, Any]) -> None:
+    """Insert a worker run report (see worker.RunReport.to_dict). Expired by a TTL index on started_at."""
+    get_worker_runs_collection().insert_one(dict(report))
@@ -0,0 +1,13 @@
+"""Async reads of worker run reports (used by the API event loop)."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from db import get_async_worker_runs_collection
+
+
+async def get_worker_runs(limit: int = 20) -> list[dict[str, Any]]:
+    """Get the most recent worker run reports, newest first."""
+    cursor = get_async_worker_runs_collection().find({}, {"_id": 0}, sort=[("started_at", -1)], limit=limit)
+    return [doc async for doc in cursor]
@@ -1,12 +1,19 @@
 """Pytest fixtures for Hanfani API tests."""
 
 from datetime import datetime, timezone
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
-from main import app
+from main import (
+    app,
+    mentions_cache,
+    trends_cache,
+    trends_cluster_index,
+    trends_response_cache,
+    trends_search_index,
+)
 from models import TrendsDocument
 
 
@@ -19,5 +26,34 @@ def client() -> TestClient:
 @pytest.fixture(autouse=True)
 def mock_db_empty():
     """Mock get_trends_from_db to return None (no DB data) so tests use live fetch path."""
-    with patch("main.get_trends_from_db", return_value=None):
+    with patch("main.get_trends_from_db", return_value=None), patch("main.get_trends_response", return_value=None):
         yield
+
+
+@pytest.fixture(autouse=True)
+def disable_trends_feed(monkeypatch: pytest.MonkeyPatch):
+    """Keep get_trending_topics off the network: feed tests enable it explicitly."""
+    monkeypatch.setenv("TRENDS_USE_FEED", "false")
+
+
+@pytest.fixture(autouse=True)
+def reset_trends_cache():
+    """Start each test with an empty trends cache and no version document to poll."""
+    trends_cache.clear()
+    trends_response_cache.clear()
+    trends_search_index.clear()
+    trends_cluster_index.clear()
+    with patch("main.get_trends_versions", AsyncMock(return_value=None)):
+        yield
+    trends_cache.clear()
+    trends_response_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_mentions_cache(monkeypatch: pytest.MonkeyPatch):
+    """Start each test with an empty, memory-only mentions cache and no prefetched mentions."""
+    mentions_cache.clear()
+    monkeypatch.setattr(mentions_cache, "persist", False)
+    with patch("main.get_mentions_from_db", AsyncMock(return_value=None)):
+        yield
+    mentions_cache.clear()
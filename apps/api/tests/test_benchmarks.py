@@ -0,0 +1,60 @@
+"""Smoke tests for the benchmark suites (tiny iteration counts; numbers are not asserted)."""
+
+import json
+
+import pytest
+
+from benchmarks import bench_api, bench_parsers, bench_scraper, bench_worker
+from benchmarks.__main__ import main as bench_main
+from benchmarks.memory_mongo import MemoryDatabase
+
+_KEYS = {"name", "group", "iterations", "ops_per_s", "mean_ms", "p50_ms", "p99_ms", "alloc_kb_per_op", "retained_kb_per_op"}
+
+
+@pytest.mark.parametrize("suite", [bench_api, bench_parsers, bench_worker])
+def test_suite_reports_results(suite) -> None:
+    """Each suite returns one result per benchmark with timing and allocation fields."""
+    results = suite.run(2)
+
+    assert results
+    for r in results:
+        assert set(r) == _KEYS
+        assert r["iterations"] == 2
+        assert r["p50_ms"] <= r["p99_ms"]
+
+
+def test_scraper_suite_counts_round_trips_and_times_only_in_chromium(capsys) -> None:
+    """Offline the scraper suite prints round-trip counts; timed results come only from a real browser."""
+    html = bench_scraper.FIXTURE.read_text(encoding="utf-8")
+    counts = bench_scraper.roundtrips(html)
+    assert counts["_extract_from_dom"] == 1
+    assert counts["per-cell extraction"] > 50
+
+    results = bench_scraper.run(2)
+    assert "round trips" in capsys.readouterr().out
+    # Names carry no counts, so --compare keeps matching when the fixture changes
+    assert {r["name"] for r in results} <= {"scraper._extract_from_dom", "scraper.per-cell extraction"}
+    for r in results:
+        assert set(r) == _KEYS
+
+
+def test_cli_writes_json_and_compares(tmp_path, capsys) -> None:
+    """The CLI writes a JSON report that a later run can compare against."""
+    out = tmp_path / "bench.json"
+    bench_main(["--suite", "parsers", "--iterations", "2", "--output", str(out)])
+    report = json.loads(out.read_text())
+    assert {"commit", "python", "timestamp"} <= set(report["meta"])
+
+    bench_main(["--suite", "parsers", "--iterations", "2", "--compare", str(out)])
+    assert "p50" in capsys.readouterr().out
+
+
+def test_memory_mongo_upsert_and_query() -> None:
+    """The in-memory stand-in applies $set/$inc upserts and $in/$gte queries with projections."""
+    coll = MemoryDatabase()["trends"]
+    assert coll.find_one_and_update({"country": "US"}, {"$set": {"n": 1}}, upsert=True) is None
+    coll.update_one({"_id": "v"}, {"$inc": {"version": 1}, "$set": {"countries.US": 5}}, upsert=True)
+    coll.update_one({"_id": "v"}, {"$inc": {"version": 1}}, upsert=True)
+
+    assert coll.find_one({"_id": "v"}, {"_id": 0}) == {"version": 2, "countries": {"US": 5}}
+    assert [d["n"] for d in coll.find({"country": {"$in": ["US", "FR"]}, "n": {"$gte": 1}})] == [1]
@@ -0,0 +1,74 @@
+"""Tests for the shared MongoDB client and pool stats."""
+
+from unittest.mock import MagicMock, patch
+
+import db
+
+
+def test_get_client_is_shared() -> None:
+    """get_client returns the same client until close_client is called."""
+    with patch("db.MongoClient") as mock_client_cls:
+        mock_client_cls.side_effect = lambda *a, **kw: MagicMock()
+        db.close_client()
+        first = db.get_client()
+        second = db.get_client()
+        assert first is second
+        assert mock_client_cls.call_count == 1
+
+        db.close_client()
+        first.close.assert_called_once()
+        third = db.get_client()
+        assert third is not first
+        db.close_client()
+
+
+def test_get_client_passes_pool_options() -> None:
+    """get_client configures pool size, idle timeout and the stats listener."""
+    with patch("db.MongoClient") as mock_client_cls:
+        db.close_client()
+        db.get_client()
+        kwargs = mock_client_cls.call_args[1]
+        assert kwargs["maxPoolSize"] == db.MONGODB_MAX_POOL_SIZE
+        assert kwargs["maxIdleTimeMS"] == db.MONGODB_MAX_IDLE_TIME_MS
+        assert db.pool_stats in kwargs["event_listeners"]
+        db.close_client()
+
+
+def test_pool_stats_counts_checkouts() -> None:
+    """PoolStats tracks open, checked out and waiting connections."""
+    stats = db.PoolStats()
+    event = MagicMock(duration=0.002)
+    stats.connection_created(event)
+    stats.connection_check_out_started(event)
+    assert stats.snapshot()["waiting"] == 1
+    stats.connection_checked_out(event)
+    snap = stats.snapshot()
+    assert snap["open"] == 1
+    assert snap["checked_out"] == 1
+    assert snap["waiting"] == 0
+    assert snap["checkouts"] == 1
+    assert snap["wait_time_ms"] == 2.0
+
+    stats.connection_checked_in(event)
+    stats.connection_check_out_started(event)
+    stats.connection_check_out_failed(event)
+    snap = stats.snapshot()
+    assert snap["checked_out"] == 0
+    assert snap["checkout_failures"] == 1
+
+
+def test_ensure_ttl_index_updates_changed_retention() -> None:
+    """An existing TTL index with another expireAfterSeconds is updated with collMod."""
+    from pymongo.errors import OperationFailure
+
+    coll = MagicMock()
+    coll.name = "trends_snapshots"
+    coll.create_index.side_effect = OperationFailure("IndexOptionsConflict", code=85)
+
+    db._ensure_ttl_index(coll, "fetched_at", 3600)
+
+    coll.database.command.assert_called_once_with(
+        "collMod",
+        "trends_snapshots",
+        index={"keyPattern": {"fetched_at": 1}, "expireAfterSeconds": 3600},
+    )
@@ -0,0 +1,215 @@
+"""Tests for MongoDB country leases and the distributed worker mode."""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import worker
+from benchmarks.memory_mongo import memory_mongo
+from services.leases import LeaseManager
+
+
+def test_claim_is_exclusive_until_released_and_skips_fresh_countries() -> None:
+    """Only one worker holds a country; once released it is not claimed again within the fresh window."""
+    with memory_mongo():
+        a, b = LeaseManager("a", ttl_s=60, fresh_s=3600), LeaseManager("b", ttl_s=60, fresh_s=3600)
+
+        assert a.claim("US") is True
+        assert b.claim("US") is False
+        assert b.claim_next(["US", "GB"]) == "GB"
+        assert a.pending(["US", "GB", "FR"], include_leased=False) == ["FR"]
+
+        a.release("US", ok=True)
+        assert b.claim("US") is False
+        assert a.pending(["US", "GB", "FR"]) == ["GB", "FR"]
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_loses_heartbeat() -> None:
+    """A lease that stops heartbeating expires; another worker takes it and the old owner is told."""
+    with memory_mongo():
+        dead, alive = LeaseManager("dead", ttl_s=0.05, fresh_s=3600), LeaseManager("alive", ttl_s=60, fresh_s=3600)
+        assert dead.claim("US") is True
+        assert alive.claim("US") is False
+
+        time.sleep(0.1)
+
+        assert alive.claim("US") is True
+        assert dead.heartbeat("US") is False
+        assert alive.heartbeat("US") is True
+        dead.release("US", ok=True)  # no-op: not the owner
+        assert alive.pending(["US"]) == ["US"]
+
+
+def test_keep_alive_extends_the_lease() -> None:
+    """keep_alive heartbeats in the background so a long scrape outlives the TTL."""
+    with memory_mongo():
+        owner, other = LeaseManager("a", ttl_s=0.15, fresh_s=3600), LeaseManager("b", ttl_s=60, fresh_s=3600)
+        assert owner.claim("US")
+        with owner.keep_alive("US"):
+            time.sleep(0.4)
+            assert other.claim("US") is False
+
+
+def test_failed_country_is_claimable_again_after_backoff() -> None:
+    """A failed attempt backs off from retry_s, doubling per failure; a success clears the failure count."""
+    with memory_mongo() as database:
+        a = LeaseManager("a", ttl_s=60, fresh_s=3600, retry_s=0.05)
+        assert a.claim("US")
+        a.release("US", ok=False)
+        assert a.claim("US") is False
+        assert a.pending(["US"]) == []
+
+        time.sleep(0.06)
+        assert a.pending(["US"]) == ["US"]
+        assert a.claim("US")
+        a.release("US", ok=False)
+        assert database["worker_leases"].find_one({"_id": "US"})["failures"] == 2
+        assert a.retry_delay(2) == 0.1 and a.retry_delay(40) == 3600
+
+        time.sleep(0.11)
+        assert a.claim("US")
+        a.release("US", ok=True)
+        doc = database["worker_leases"].find_one({"_id": "US"})
+        assert "failures" not in doc and "retry_at" not in doc
+        assert a.claim("US") is False
+
+
+def test_lost_lease_skips_save() -> None:
+    """When a heartbeat finds the lease taken over, the lane does not save the country."""
+    def slow_fetch(country: str, scraper=None):
+        time.sleep(0.15)
+        return [{"title": country}], "feed"
+
+    leases = LeaseManager("a", ttl_s=0.09, fresh_s=3600)
+    env = {"TRENDS_COUNTRIES": "US", "TRENDS_PREFETCH_MENTIONS": "0"}
+    with memory_mongo(), patch.dict(os.environ, env), patch("worker.ScraperSession"), \
+            patch("worker.get_trending_topics", side_effect=slow_fetch), \
+            patch("worker.save_trends") as mock_save, patch.object(leases, "heartbeat", return_value=False):
+        report = worker.run_distributed(concurrency=1, leases=leases)
+
+    mock_save.assert_not_called()
+    assert report["failed"] == 1
+    assert "LeaseLost" in report["countries"][0]["error"]
+
+
+def test_lease_reclaimed_between_scrape_and_save_skips_save() -> None:
+    """A lease that expires and is re-claimed before the next background heartbeat still blocks the save."""
+    leases = LeaseManager("a", ttl_s=60, fresh_s=3600)
+    other = LeaseManager("b", ttl_s=60, fresh_s=3600)
+
+    with memory_mongo() as database:
+        def fetch_then_lose_lease(country: str, scraper=None):
+            # The lease runs out (a long GC pause, a stalled scrape) and another worker takes the country
+            database["worker_leases"].update_one({"_id": country}, {"$set": {"expires_at": datetime.now(timezone.utc)}})
+            assert other.claim(country)
+            return [{"title": country}], "feed"
+
+        env = {"TRENDS_COUNTRIES": "US", "TRENDS_PREFETCH_MENTIONS": "0"}
+        with patch.dict(os.environ, env), patch("worker.ScraperSession"), \
+                patch("worker.get_trending_topics", side_effect=fetch_then_lose_lease), \
+                patch("worker.save_trends") as mock_save:
+            report = worker.run_distributed(concurrency=1, leases=leases)
+
+        assert database["worker_leases"].find_one({"_id": "US"})["owner"] == "b"
+
+    mock_save.assert_not_called()
+    assert report["failed"] == 1
+    assert "LeaseLost" in report["countries"][0]["error"]
+
+
+def test_heartbeat_fails_once_the_lease_expired_even_if_unclaimed() -> None:
+    """The heartbeat is fenced on expiry: an expired lease is not silently revived."""
+    with memory_mongo():
+        owner = LeaseManager("a", ttl_s=0.05, fresh_s=3600)
+        assert owner.claim("US")
+        assert owner.heartbeat("US") is True
+        time.sleep(0.1)
+        assert owner.heartbeat("US") is False
+
+
+def test_run_distributed_shares_countries_without_double_scraping() -> None:
+    """Several workers on one store refresh every country exactly once, including one a dead worker held."""
+    countries = ["US", "GB", "FR", "DE", "JP", "IN", "BR", "CA"]
+    scraped: Counter[str] = Counter()
+    lock = threading.Lock()
+
+    def fake_fetch(country: str, scraper=None):
+        with lock:
+            scraped[country] += 1
+        time.sleep(0.01)
+        return [{"title": country}], "feed"
+
+    env = {"TRENDS_COUNTRIES": ",".join(countries), "TRENDS_PREFETCH_MENTIONS": "0"}
+    with memory_mongo(), patch.dict(os.environ, env), \
+            patch("worker.get_trending_topics", side_effect=fake_fetch), patch("worker.save_trends", return_value=None):
+        # A worker that claimed JP and died without releasing it
+        assert LeaseManager("crashed", ttl_s=0.2, fresh_s=3600).claim("JP")
+
+        reports: list[dict] = []
+        threads = [
+            threading.Thread(target=lambda i=i: reports.append(
+                worker.run_distributed(concurrency=2, leases=LeaseManager(f"w{i}", ttl_s=0.2, fresh_s=3600)),
+            ))
+            for i in range(3)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+
+    assert scraped == Counter({c: 1 for c in countries})
+    assert sorted(c["country"] for r in reports for c in r["countries"]) == sorted(countries)
+    assert {r["owner"] for r in reports} == {"w0", "w1", "w2"}
+
+
+def test_main_distributed_flag_runs_leased_pass() -> None:
+    """--distributed runs run_distributed instead of run and stores its report."""
+    report = {"ok": 1, "failed": 0, "duration_ms": 1.0, "countries": [], "owner": "w"}
+    with patch("worker.open_client"), patch("worker.ensure_indexes"), patch("worker.close_client"), \
+            patch("worker.run") as mock_run, patch("worker.run_distributed", return_value=report) as mock_dist, \
+            patch("worker.save_worker_run") as mock_save:
+        worker.main(["--distributed", "--concurrency", "2"])
+
+    mock_run.assert_not_called()
+    mock_dist.assert_called_once_with(concurrency=2)
+    mock_save.assert_called_once_with(report)
+
+
+@pytest.mark.skipif(not os.getenv("MONGODB_TEST_URI"), reason="set MONGODB_TEST_URI to run against a real MongoDB")
+def test_distributed_workers_as_processes_against_real_mongo() -> None:
+    """Three `python -m worker --distributed` processes on one MongoDB save each country exactly once."""
+    from pymongo import MongoClient
+
+    countries = ["US", "GB", "FR", "DE", "JP", "IN"]
+    db_name = f"hanfani_leases_test_{os.getpid()}"
+    env = {
+        **os.environ,
+        "MONGODB_URI": os.environ["MONGODB_TEST_URI"],
+        "MONGODB_DB": db_name,
+        "TRENDS_COUNTRIES": ",".join(countries),
+        "TRENDS_USE_MOCK": "true",
+        "TRENDS_LEASE_TTL_S": "5",
+    }
+    client = MongoClient(os.environ["MONGODB_TEST_URI"])
+    try:
+        procs = [
+            subprocess.Popen([sys.executable, "-m", "worker", "--distributed"], cwd=Path(__file__).parent.parent, env=env)
+            for _ in range(3)
+        ]
+        assert [p.wait(timeout=120) for p in procs] == [0, 0, 0]
+
+        db = client[db_name]
+        snapshots = Counter(d["country"] for d in db["trends_snapshots"].find({}, {"country": 1}))
+        assert snapshots == Counter({c: 1 for c in countries})
+        assert db["worker_leases"].count_documents({"ok": True}) == len(countries)
+    finally:
+        client.drop_database(db_name)
+        client.close()
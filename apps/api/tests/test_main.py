@@ -19,3 +19,4 @@ def test_status(client: TestClient) -> None:
     assert data["service"] == "hanfani-api"
     assert "version" in data
     assert "timestamp" in data
+    assert "checked_out" in data["db_pool"]
@@ -0,0 +1,129 @@
+"""Tests for the two-tier topic mentions cache."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from services.mentions_cache import MentionsCache, cache_key, normalize_topic
+
+_MENTIONS = [{"title": "Article", "source": "Src", "link": "https://example.com/1"}]
+
+
+def test_normalize_topic() -> None:
+    """normalize_topic collapses whitespace and case."""
+    assert normalize_topic("  Champions   League ") == "champions league"
+    assert cache_key("AI  News", "us", 25) == cache_key("ai news", "US", 25)
+    assert cache_key("AI", "US", 25) != cache_key("AI", "US", 10)
+
+
+async def test_memory_hit_skips_fetch() -> None:
+    """A repeat request is served from memory."""
+    cache = MentionsCache(persist=False)
+    fetch = AsyncMock(return_value=_MENTIONS)
+
+    assert await cache.get_or_fetch("AI", "US", 25, fetch) == _MENTIONS
+    assert await cache.get_or_fetch("ai", "US", 25, fetch) == _MENTIONS
+
+    fetch.assert_awaited_once_with("AI", "US", limit=25)
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+async def test_empty_results_not_cached() -> None:
+    """Empty results (no key / SerpApi error) are refetched next time."""
+    cache = MentionsCache(persist=False)
+    fetch = AsyncMock(return_value=[])
+
+    await cache.get_or_fetch("AI", "US", 25, fetch)
+    await cache.get_or_fetch("AI", "US", 25, fetch)
+
+    assert fetch.await_count == 2
+
+
+async def test_bypass_refreshes() -> None:
+    """bypass=True always fetches and replaces the cached value."""
+    cache = MentionsCache(persist=False)
+    newer = [{"title": "Newer", "source": "Src", "link": "https://example.com/2"}]
+    await cache.get_or_fetch("AI", "US", 25, AsyncMock(return_value=_MENTIONS))
+
+    result = await cache.get_or_fetch("AI", "US", 25, AsyncMock(return_value=newer), bypass=True)
+
+    assert result == newer
+    assert await cache.get_or_fetch("AI", "US", 25, AsyncMock()) == newer
+    assert cache.stats()["bypasses"] == 1
+
+
+async def test_concurrent_identical_requests_coalesce() -> None:
+    """Identical concurrent requests make a single upstream call."""
+    cache = MentionsCache(persist=False)
+    calls = 0
+
+    async def fetch(topic: str, country: str, limit: int = 20):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return _MENTIONS
+
+    results = await asyncio.gather(*(cache.get_or_fetch("AI", "US", 25, fetch) for _ in range(10)))
+
+    assert calls == 1
+    assert all(r == _MENTIONS for r in results)
+
+
+async def test_lru_eviction() -> None:
+    """Memory tier evicts the least recently used key."""
+    cache = MentionsCache(maxsize=2, persist=False)
+    fetch = AsyncMock(return_value=_MENTIONS)
+    for topic in ("a", "b", "c"):
+        await cache.get_or_fetch(topic, "US", 25, fetch)
+
+    assert cache.stats()["entries"] == 2
+    assert await cache.get(cache_key("a", "US", 25)) is None
+
+
+async def test_db_tier_hit_and_write() -> None:
+    """A memory miss reads MongoDB, and fetched results are upserted with expires_at."""
+    cache = MentionsCache(ttl=60)
+    expires = datetime.now(timezone.utc) + timedelta(seconds=30)
+    with patch("services.mentions_cache.get_async_mentions_cache_collection") as mock_get:
+        coll = mock_get.return_value
+        coll.find_one = AsyncMock(return_value={"mentions": _MENTIONS, "expires_at": expires.replace(tzinfo=None)})
+        coll.replace_one = AsyncMock()
+        fetch = AsyncMock()
+
+        assert await cache.get_or_fetch("AI", "US", 25, fetch) == _MENTIONS
+        fetch.assert_not_awaited()
+        assert cache.stats()["db_hits"] == 1
+        query = coll.find_one.call_args[0][0]
+        assert query["_id"] == cache_key("AI", "US", 25)
+        assert "$gt" in query["expires_at"]
+
+        coll.find_one.return_value = None
+        await cache.get_or_fetch("Other", "FR", 25, AsyncMock(return_value=_MENTIONS))
+        filt, doc = coll.replace_one.call_args[0]
+        assert filt == {"_id": cache_key("Other", "FR", 25)}
+        assert doc["topic"] == "other"
+        assert doc["country"] == "FR"
+        assert doc["expires_at"] > doc["cached_at"]
+        assert coll.replace_one.call_args[1]["upsert"] is True
+
+
+async def test_db_errors_fall_back_to_fetch() -> None:
+    """An unreachable MongoDB behaves like a cache miss."""
+    cache = MentionsCache()
+    with patch("services.mentions_cache.get_async_mentions_cache_collection", side_effect=Exception("down")):
+        result = await cache.get_or_fetch("AI", "US", 25, AsyncMock(return_value=_MENTIONS))
+
+    assert result == _MENTIONS
+
+
+def test_mentions_endpoint_refresh_bypasses_cache(client: TestClient) -> None:
+    """GET /trends/mentions is cached; refresh=true forces a live fetch."""
+    with patch("main.fetch_topic_mentions_async", return_value=_MENTIONS) as mock_fetch:
+        client.get("/trends/mentions?topic=AI&country=US")
+        client.get("/trends/mentions?topic=AI&country=US")
+        client.get("/trends/mentions?topic=AI&country=US&refresh=true")
+
+    assert mock_fetch.call_count == 2
@@ -0,0 +1,60 @@
+"""Tests for prefetched mentions storage and the /trends/mentions precomputed path."""
+
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+
+_MENTIONS = [{"title": "Article", "source": "Src", "link": "https://example.com/1"}]
+
+
+def test_save_mentions_upserts_by_country_and_topic() -> None:
+    """save_mentions upserts on (country, normalized topic)."""
+    from services.mentions_store import save_mentions
+
+    with patch("services.mentions_store.get_mentions_collection") as mock_get:
+        save_mentions("us", "  Champions League ", _MENTIONS)
+
+    filt, update = mock_get.return_value.update_one.call_args[0]
+    assert filt == {"country": "US", "topic": "champions league"}
+    assert update["$set"]["mentions"] == _MENTIONS
+    assert update["$set"]["title"] == "  Champions League "
+    assert mock_get.return_value.update_one.call_args[1]["upsert"] is True
+
+
+async def test_get_mentions_from_db() -> None:
+    """get_mentions_from_db returns stored mentions or None."""
+    from services.mentions_store_async import get_mentions_from_db
+
+    with patch("services.mentions_store_async.get_async_mentions_collection") as mock_get:
+        mock_get.return_value.find_one = AsyncMock(return_value={"mentions": _MENTIONS})
+        assert await get_mentions_from_db("us", "AI") == _MENTIONS
+        assert mock_get.return_value.find_one.call_args[0][0] == {"country": "US", "topic": "ai"}
+
+        mock_get.return_value.find_one = AsyncMock(return_value=None)
+        assert await get_mentions_from_db("US", "AI") is None
+
+
+def test_mentions_endpoint_serves_precomputed_first(client: TestClient) -> None:
+    """GET /trends/mentions returns prefetched mentions without calling SerpApi."""
+    with patch("main.get_mentions_from_db", AsyncMock(return_value=_MENTIONS)), \
+            patch("main.fetch_topic_mentions_async") as mock_fetch:
+        response = client.get("/trends/mentions?topic=AI&country=US")
+
+    assert response.json()["mentions"] == _MENTIONS
+    assert response.json()["source"] == "precomputed"
+    mock_fetch.assert_not_called()
+
+
+def test_mentions_endpoint_live_on_miss_or_refresh(client: TestClient) -> None:
+    """GET /trends/mentions calls SerpApi on a miss, and refresh skips the precomputed copy."""
+    with patch("main.fetch_topic_mentions_async", return_value=_MENTIONS) as mock_fetch:
+        response = client.get("/trends/mentions?topic=AI&country=US")
+    assert response.json()["source"] == "live"
+    mock_fetch.assert_called_once()
+
+    lookup = AsyncMock(return_value=_MENTIONS)
+    with patch("main.get_mentions_from_db", lookup), \
+            patch("main.fetch_topic_mentions_async", return_value=_MENTIONS):
+        response = client.get("/trends/mentions?topic=AI&country=US&refresh=true")
+    assert response.json()["source"] == "live"
+    lookup.assert_not_called()
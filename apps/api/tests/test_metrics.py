@@ -0,0 +1,114 @@
+"""Tests for in-process Prometheus metrics and /metrics."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from services import metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    """Histogram output has cumulative le buckets, +Inf, _sum and _count."""
+    hist = metrics.Histogram("test_latency_seconds", "Test.", ("op",), buckets=(0.1, 1.0))
+    try:
+        hist.observe(0.05, op="a")
+        hist.observe(0.5, op="a")
+        hist.observe(5, op="a")
+        text = hist.render()
+    finally:
+        metrics.REGISTRY.remove(hist)
+
+    assert "# TYPE test_latency_seconds histogram" in text
+    assert 'test_latency_seconds_bucket{op="a",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{op="a",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{op="a",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_sum{op="a"} 5.55' in text
+    assert 'test_latency_seconds_count{op="a"} 3' in text
+
+
+def test_labels_must_match_family() -> None:
+    """Missing or unknown labels are rejected."""
+    with pytest.raises(ValueError):
+        metrics.SERPAPI_ERRORS.inc(path="csv")
+
+
+def test_metric_family_without_collect_cannot_be_created() -> None:
+    """_Metric is abstract: a family missing collect() fails when created, not when /metrics renders it."""
+
+    class Incomplete(metrics._Metric):
+        kind = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("hanfani_incomplete", "no collect")
+    assert all(m.name != "hanfani_incomplete" for m in metrics.REGISTRY)
+
+
+def test_metrics_endpoint_reports_route_latency(client: TestClient) -> None:
+    """Requests are labelled by route template; in-flight returns to zero."""
+    client.get("/trends?country=US")
+    client.get("/trends/history?country=FR&limit=0")
+    client.get("/no-such-route")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'hanfani_http_requests_total{method="GET",route="/trends",status="200"} 1' in body
+    assert 'hanfani_http_requests_total{method="GET",route="/trends/history",status="422"} 1' in body
+    assert 'route="unmatched",status="404"' in body
+    assert 'hanfani_http_request_duration_seconds_count{method="GET",route="/trends"} 1' in body
+    assert metrics.HTTP_IN_FLIGHT.value(method="GET", route="/trends") == 0
+    for family in ("hanfani_db_operation_duration_seconds", "hanfani_serpapi_errors_total", "hanfani_scraper_outcomes_total"):
+        assert f"# TYPE {family}" in body
+
+
+def test_save_trends_is_timed() -> None:
+    """save_trends observes its duration under operation=save_trends."""
+    from services.trends_store import save_trends
+
+    with patch("services.trends_store.get_trends_collection"), \
+            patch("services.trends_store.get_trends_meta_collection"), \
+            patch("services.trends_store.get_trends_snapshots_collection"), \
+            patch("services.trends_store.get_trends_changes_collection"):
+        save_trends("US", ["A"])
+
+    assert metrics.DB_OPERATION_DURATION.count(operation="save_trends") == 1
+
+
+def test_serpapi_errors_counted_by_engine(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A failing SerpApi call is timed and counted as an error for its engine."""
+    from services.topic_mentions import fetch_topic_mentions
+
+    monkeypatch.setenv("SERPAPI_KEY", "key")
+    with patch("requests.get", side_effect=Exception("timeout")):
+        assert fetch_topic_mentions("AI", "US") == []
+
+    assert metrics.SERPAPI_ERRORS.value(engine="google_news") == 1
+    assert metrics.SERPAPI_REQUEST_DURATION.count(engine="google_news") == 1
+
+
+@pytest.mark.parametrize(
+    ("csv_topics", "dom_topics", "path"),
+    [([{"title": "A"}], [], "csv"), ([], [{"title": "B"}], "dom"), ([], [], "failure")],
+)
+def test_scraper_outcome_by_path(csv_topics: list, dom_topics: list, path: str) -> None:
+    """_scrape_page counts whether the CSV export, the DOM fallback or nothing produced topics."""
+    from services.trends_scraper import _scrape_page
+
+    page = MagicMock()
+    page.locator.return_value.count.return_value = 0
+    with patch("services.trends_scraper._parse_trends_csv", return_value=csv_topics), \
+            patch("services.trends_scraper._extract_from_dom", return_value=dom_topics):
+        _scrape_page(page, "US", fast=True)
+
+    assert metrics.SCRAPER_OUTCOMES.value(path=path) == 1
+    assert metrics.SCRAPER_DURATION.count(path=path) == 1
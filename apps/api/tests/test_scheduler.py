@@ -0,0 +1,80 @@
+"""Tests for the adaptive refresh scheduler."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from services.scheduler import RefreshScheduler, change_ratio
+
+
+def _scheduler(countries=("US", "GB", "FR"), now: float = 0.0) -> RefreshScheduler:
+    return RefreshScheduler(list(countries), now, min_interval_s=60, max_interval_s=3600, retry_base_s=10)
+
+
+def test_change_ratio() -> None:
+    """Turnover over the union of old and new topics; first saves count as fully changed."""
+    assert change_ratio(None, 10) == 1.0
+    assert change_ratio({"new": 0, "dropped": 0, "moved": 3}, 10) == 0.0
+    assert change_ratio({"new": 10, "dropped": 10, "moved": 0}, 10) == 1.0
+    assert change_ratio({"new": 2, "dropped": 2, "moved": 0}, 10) == pytest.approx(4 / 12)
+    assert change_ratio({"new": 0, "dropped": 0}, 0) == 0.0
+
+
+def test_all_countries_start_due_in_order() -> None:
+    """Every country is due at start; pop_due drains them earliest first, once each."""
+    scheduler = _scheduler(("US", "GB", "US", "FR"))
+    assert scheduler.pop_due(0.0) == ["US", "GB", "FR"]
+    assert scheduler.pop_due(0.0) == []
+    assert scheduler.next_due() is None
+
+
+def test_interval_follows_change_ratio_within_bounds() -> None:
+    """Volatile countries come back at the min interval, quiet ones at the max, others in between."""
+    scheduler = _scheduler()
+    scheduler.pop_due(0.0)
+
+    assert scheduler.record_success("US", 1.0, now=0.0) == pytest.approx(60)
+    assert scheduler.record_success("GB", 0.0, now=0.0) == pytest.approx(3600)
+    assert 60 < scheduler.record_success("FR", 0.5, now=0.0) < 3600
+
+    assert scheduler.pop_due(59.0) == []
+    assert scheduler.pop_due(60.0) == ["US"]
+    assert scheduler.next_due() == pytest.approx(scheduler.state("FR").due_at)
+
+
+def test_change_ratio_is_smoothed_across_refreshes() -> None:
+    """One quiet refresh after volatile ones does not jump straight to the max interval."""
+    scheduler = _scheduler(("US",))
+    scheduler.pop_due(0.0)
+    scheduler.record_success("US", 1.0, now=0.0)
+    scheduler.pop_due(60.0)
+
+    interval = scheduler.record_success("US", 0.0, now=60.0)
+
+    assert scheduler.state("US").change_ratio == pytest.approx(0.5)
+    assert 60 < interval < 3600
+
+
+def test_failures_back_off_exponentially_and_reset_on_success() -> None:
+    """Retries wait base, 2x, 4x... capped at the max interval; a success clears the count."""
+    scheduler = _scheduler(("US",))
+    scheduler.pop_due(0.0)
+
+    delays = [scheduler.record_failure("US", now=0.0) for _ in range(10)]
+    assert delays[:4] == [10, 20, 40, 80]
+    assert delays[-1] == 3600
+    assert scheduler.state("US").failures == 10
+
+    scheduler.record_success("US", 0.0, now=0.0)
+    assert scheduler.state("US").failures == 0
+    assert scheduler.record_failure("US", now=0.0) == 10
+
+
+def test_from_env_reads_minutes() -> None:
+    """Bounds come from TRENDS_REFRESH_*_MINUTES; invalid values fall back to the defaults."""
+    env = {"TRENDS_REFRESH_MIN_MINUTES": "15", "TRENDS_REFRESH_MAX_MINUTES": "360", "TRENDS_REFRESH_RETRY_MINUTES": "x"}
+    with patch.dict(os.environ, env):
+        scheduler = RefreshScheduler.from_env(["US"], now=0.0)
+
+    assert (scheduler.min_interval_s, scheduler.max_interval_s, scheduler.retry_base_s) == (900, 21600, 300)
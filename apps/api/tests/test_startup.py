@@ -0,0 +1,14 @@
+"""Guard the cold-start import path of the API and worker."""
+
+import pytest
+
+from benchmarks.startup import HEAVY_MODULES, measure
+
+
+@pytest.mark.parametrize("module", ["main", "worker"])
+def test_import_does_not_load_heavy_dependencies(module: str) -> None:
+    """pandas, pytrends, requests and playwright are imported lazily, only when a tier needs them."""
+    sample = measure(module)
+
+    assert sample["heavy"] == [], f"{module} imports {sample['heavy']} (lazy: {HEAVY_MODULES})"
+    assert sample["import_s"] > 0
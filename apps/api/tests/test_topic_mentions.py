@@ -12,7 +12,7 @@ from fastapi.testclient import TestClient
 
 def test_mentions_returns_articles(client: TestClient) -> None:
     """GET /trends/mentions returns topic, country, and mentions list."""
-    with patch("main.fetch_topic_mentions") as mock_fetch:
+    with patch("main.fetch_topic_mentions_async") as mock_fetch:
         mock_fetch.return_value = [
             {
                 "title": "Article about AI",
@@ -155,7 +155,7 @@ def test_fetch_topic_mentions_success() -> None:
     mock_resp.json.return_value = mock_response
 
     with patch.dict(os.environ, {"SERPAPI_KEY": "test-key"}, clear=False):
-        with patch("services.topic_mentions.requests.get") as mock_get:
+        with patch("requests.get") as mock_get:
             mock_get.return_value = mock_resp
 
             result = fetch_topic_mentions("AI", "US", limit=5)
@@ -170,9 +170,62 @@ def test_fetch_topic_mentions_api_error_returns_empty() -> None:
     from services.topic_mentions import fetch_topic_mentions
 
     with patch.dict(os.environ, {"SERPAPI_KEY": "test-key"}, clear=False):
-        with patch("services.topic_mentions.requests.get") as mock_get:
+        with patch("requests.get") as mock_get:
             mock_get.side_effect = Exception("Network error")
 
             result = fetch_topic_mentions("AI", "US")
 
     assert result == []
+
+
+async def test_fetch_topic_mentions_async_success() -> None:
+    """fetch_topic_mentions_async uses the shared HTTP client and parses results."""
+    import httpx
+
+    from services.topic_mentions import fetch_topic_mentions_async
+
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={
+            "news_results": [
+                {"title": "Async News", "link": "https://example.com/a", "source": {"name": "Wire"}, "position": 1},
+            ]
+        })
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch.dict(os.environ, {"SERPAPI_KEY": "test-key"}, clear=False):
+        with patch("services.topic_mentions.get_async_http_client", return_value=client):
+            result = await fetch_topic_mentions_async("AI", "FR", limit=5)
+    await client.aclose()
+
+    assert [r["title"] for r in result] == ["Async News"]
+    assert seen[0].url.params["engine"] == "google_news"
+    assert seen[0].url.params["gl"] == "fr"
+    assert seen[0].url.params["hl"] == "fr"
+
+
+async def test_fetch_topic_mentions_async_error_returns_empty() -> None:
+    """fetch_topic_mentions_async returns empty list on HTTP errors."""
+    import httpx
+
+    from services.topic_mentions import fetch_topic_mentions_async
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(503)))
+    with patch.dict(os.environ, {"SERPAPI_KEY": "test-key"}, clear=False):
+        with patch("services.topic_mentions.get_async_http_client", return_value=client):
+            result = await fetch_topic_mentions_async("AI", "US")
+    await client.aclose()
+
+    assert result == []
+
+
+async def test_async_http_client_is_shared() -> None:
+    """get_async_http_client reuses one client until closed."""
+    from services.http_client import close_async_http_client, get_async_http_client
+
+    first = get_async_http_client()
+    assert get_async_http_client() is first
+    await close_async_http_client()
+    assert first.is_closed
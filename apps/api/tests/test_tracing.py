@@ -0,0 +1,66 @@
+"""Tests for worker tracing spans."""
+
+from unittest.mock import patch
+
+import pytest
+
+from services.tracing import current_span, span, trace
+
+
+def test_spans_nest_under_trace() -> None:
+    """span() records children of the active span with durations and attributes."""
+    with trace("refresh", country="US") as root:
+        with span("scraper") as scraper:
+            with span("goto"):
+                pass
+            scraper.set(items=25)
+        with span("save_trends"):
+            pass
+
+    tree = root.to_dict()
+    assert tree["attrs"] == {"country": "US"}
+    assert [c["name"] for c in tree["children"]] == ["scraper", "save_trends"]
+    assert tree["children"][0]["attrs"] == {"items": 25}
+    assert tree["children"][0]["children"][0]["name"] == "goto"
+    assert tree["duration_ms"] >= tree["children"][0]["duration_ms"]
+    assert current_span() is None
+
+
+def test_span_outside_trace_is_noop() -> None:
+    """Without an active trace, span() yields None and records nothing."""
+    with span("goto") as stage:
+        assert stage is None
+
+
+def test_span_records_errors() -> None:
+    """An exception escaping a span is recorded on it and re-raised."""
+    with trace("refresh") as root:
+        with pytest.raises(ValueError):
+            with span("csv_download"):
+                raise ValueError("bad csv")
+
+    assert root.children[0].attrs["error"] == "ValueError: bad csv"
+
+
+def test_get_trending_topics_records_tier_spans(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Each tier tried by get_trending_topics gets a span with its item count."""
+    from services.trends import get_trending_topics
+
+    monkeypatch.setenv("TRENDS_USE_FEED", "true")
+    monkeypatch.setenv("TRENDS_USE_SCRAPER", "true")
+
+    class _Scraper:
+        def scrape(self, country: str) -> list[dict]:
+            with span("goto"):
+                pass
+            return [{"title": "A"}]
+
+    with patch("services.trends_feed.fetch_trending_feed", return_value=[]):
+        with trace("refresh") as root:
+            topics, source = get_trending_topics("US", scraper=_Scraper())
+
+    assert source == "scraper"
+    feed, scraper = root.to_dict()["children"]
+    assert (feed["name"], feed["attrs"]) == ("feed", {"items": 0})
+    assert (scraper["name"], scraper["attrs"]) == ("scraper", {"items": 1})
+    assert scraper["children"][0]["name"] == "goto"
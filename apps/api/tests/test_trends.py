@@ -1,6 +1,8 @@
 """Tests for the Google Trends API endpoint and service."""
 
 import os
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from unittest.mock import MagicMock, patch
 
@@ -8,7 +10,9 @@ import pandas as pd
 import pytest
 from fastapi.testclient import TestClient
 
+from main import trends_response_cache
 from models import TrendsDocument
+from services.trends_store import trends_etag
 
 
 def test_trends_returns_topics_for_country(client: TestClient) -> None:
@@ -130,9 +134,359 @@ def test_trends_empty_result(client: TestClient) -> None:
     assert data["source"] == "fallback"
 
 
+_ETAG = trends_etag("abc123", datetime(2026, 3, 1, 12, 0, 0))
+
+
+def _etag_doc() -> TrendsDocument:
+    return TrendsDocument(
+        country="US",
+        topics=[{"title": "Topic A"}],
+        source="scraper",
+        fetched_at=datetime(2026, 3, 1, 12, 0, 0),
+        updated_at=datetime(2026, 3, 1, 12, 0, 0),
+        topics_hash="abc123",
+    )
+
+
+def test_trends_sets_etag_and_last_modified(client: TestClient) -> None:
+    """GET /trends from DB returns ETag (topics hash and fetched_at) and Last-Modified (fetched_at)."""
+    with patch("main.get_trends_from_db", return_value=_etag_doc()):
+        response = client.get("/trends?country=US")
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{_ETAG}"'
+    assert response.headers["last-modified"] == "Sun, 01 Mar 2026 12:00:00 GMT"
+
+
+def test_trends_if_none_match_returns_304(client: TestClient) -> None:
+    """GET /trends with a matching If-None-Match returns an empty 304."""
+    with patch("main.get_trends_from_db", return_value=_etag_doc()):
+        response = client.get("/trends?country=US", headers={"If-None-Match": f'W/"other", "{_ETAG}"'})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == f'"{_ETAG}"'
+
+
+def test_trends_if_none_match_mismatch_returns_200(client: TestClient) -> None:
+    """If-None-Match takes precedence over If-Modified-Since and a mismatch returns the payload."""
+    with patch("main.get_trends_from_db", return_value=_etag_doc()):
+        response = client.get(
+            "/trends?country=US",
+            headers={"If-None-Match": '"stale"', "If-Modified-Since": "Mon, 02 Mar 2026 00:00:00 GMT"},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["topics"][0]["title"] == "Topic A"
+
+
+def test_trends_if_modified_since(client: TestClient) -> None:
+    """If-Modified-Since at or after fetched_at returns 304, earlier returns 200."""
+    with patch("main.get_trends_from_db", return_value=_etag_doc()):
+        not_modified = client.get("/trends?country=US", headers={"If-Modified-Since": "Sun, 01 Mar 2026 12:00:00 GMT"})
+        modified = client.get("/trends?country=US", headers={"If-Modified-Since": "Sun, 01 Mar 2026 11:59:59 GMT"})
+
+    assert not_modified.status_code == 304
+    assert modified.status_code == 200
+
+
+def test_trends_fallback_has_no_etag(client: TestClient) -> None:
+    """Fallback responses are not cacheable validators."""
+    response = client.get("/trends?country=US", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+_STORED_TOPICS = [{"title": "Café", "search_volume": "1M+"}, {"title": "Topic B"}]
+
+
+@contextmanager
+def _stored_trends(client: TestClient):
+    """In-memory MongoDB where /trends is served from responses stored by the real save_trends."""
+    from benchmarks.memory_mongo import memory_mongo
+    from services.trends_store_async import get_trends_response
+
+    with memory_mongo(), patch("main.get_trends_response", get_trends_response), \
+            patch("main.get_trends_from_db", side_effect=AssertionError("hot path must not build the document")):
+        yield lambda headers=None: client.get("/trends?country=US", headers=headers or {})
+
+
+def _stored_response(client: TestClient, headers: dict[str, str] | None = None):
+    """GET /trends?country=US served from a response stored by the real save_trends (in-memory MongoDB)."""
+    import asyncio
+
+    from services.trends_store import save_trends
+    from services.trends_store_async import get_trends_from_db
+
+    with _stored_trends(client) as get:
+        save_trends("US", _STORED_TOPICS, source="feed")
+        response = get(headers)
+        doc = asyncio.run(get_trends_from_db("US"))
+    return response, doc
+
+
+def test_trends_serves_stored_bytes_matching_built_payload(client: TestClient) -> None:
+    """The stored JSON body is byte-identical to the payload /trends would build from the document."""
+    from fastapi.responses import JSONResponse
+
+    from main import _trends_payload
+
+    response, doc = _stored_response(client, {"Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-type"] == "application/json"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["etag"] == f'"{trends_etag(doc.topics_hash, doc.fetched_at)}"'
+    # As read back from MongoDB: naive UTC at millisecond precision
+    fetched = doc.fetched_at.replace(tzinfo=None, microsecond=doc.fetched_at.microsecond // 1000 * 1000)
+    assert response.content == JSONResponse(_trends_payload("US", doc.model_copy(update={"fetched_at": fetched}))).body
+
+
+def test_trends_serves_stored_gzip_and_304_across_encodings(client: TestClient) -> None:
+    """gzip clients get the stored gzip body; its ETag revalidates for any encoding."""
+    response, doc = _stored_response(client, {"Accept-Encoding": "gzip;q=1.0, br;q=0"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == f'"{trends_etag(doc.topics_hash, doc.fetched_at)}-gzip"'
+    assert response.json()["topics"][0]["title"] == "Café"
+
+
+def test_trends_stored_etag_revalidates_across_encodings_until_refresh(client: TestClient) -> None:
+    """A variant's ETag gets a 304 for any encoding; re-saving identical topics changes fetched_at, so a 200."""
+    from services.trends_store import save_trends
+
+    with _stored_trends(client) as get:
+        save_trends("US", _STORED_TOPICS, source="feed")
+        first = get({"Accept-Encoding": "gzip"})
+        not_modified = get({"If-None-Match": first.headers["etag"], "Accept-Encoding": "identity"})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+        time.sleep(0.002)  # distinct fetched_at at MongoDB's millisecond precision
+        save_trends("US", _STORED_TOPICS, source="feed")
+        trends_response_cache.clear()  # as the next version poll would
+        refreshed = get({"If-None-Match": first.headers["etag"], "Accept-Encoding": "identity"})
+
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != first.headers["etag"].replace("-gzip", "")
+    assert refreshed.json()["fetched_at"] != first.json()["fetched_at"]
+
+
+def test_trends_sort_filter_and_paging(client: TestClient) -> None:
+    """sort / min_volume / limit / offset are applied on the server with a view-specific ETag."""
+    doc = TrendsDocument(
+        country="US",
+        topics=[
+            {"title": "A", "search_volume": "1K+", "volume": 1_000},
+            {"title": "B", "search_volume": "50K+", "volume": 50_000},
+            {"title": "C"},
+            {"title": "D", "search_volume": "20K+", "volume": 20_000},
+        ],
+        source="feed",
+        fetched_at=datetime(2026, 3, 1, 12, 0, 0),
+        updated_at=datetime(2026, 3, 1, 12, 0, 0),
+        topics_hash="abc123",
+    )
+    with patch("main.get_trends_from_db", return_value=doc):
+        full = client.get("/trends?country=US")
+        view = client.get("/trends?country=US&sort=volume&min_volume=5000&limit=1&offset=1")
+        revalidated = client.get(
+            "/trends?country=US&sort=volume&min_volume=5000&limit=1&offset=1",
+            headers={"If-None-Match": view.headers["etag"]},
+        )
+        other_view = client.get("/trends?country=US&sort=volume", headers={"If-None-Match": view.headers["etag"]})
+
+    assert [t["title"] for t in full.json()["topics"]] == ["A", "B", "C", "D"]
+    assert [t["title"] for t in view.json()["topics"]] == ["D"]
+    assert view.json()["source"] == "db"
+    assert view.headers["etag"].startswith('"abc123.') and view.headers["etag"] != full.headers["etag"]
+    assert revalidated.status_code == 304
+    assert other_view.status_code == 200
+    assert [t["title"] for t in other_view.json()["topics"]] == ["B", "D", "A", "C"]
+
+
+def test_trends_view_params_are_validated(client: TestClient) -> None:
+    """Unknown sort keys and out-of-range paging values are rejected."""
+    assert client.get("/trends?country=US&sort=title").status_code == 422
+    assert client.get("/trends?country=US&limit=0").status_code == 422
+    assert client.get("/trends?country=US&min_volume=-1").status_code == 422
+    assert client.get("/trends?country=US&offset=-1").status_code == 422
+
+
+def test_negotiate_encoding() -> None:
+    """Highest q wins among stored codings; ties prefer br, then gzip; identity is the default."""
+    from main import _negotiate_encoding
+
+    stored = {"identity": b"", "gzip": b"", "br": b""}
+    assert _negotiate_encoding("gzip, deflate, br", stored) == "br"
+    assert _negotiate_encoding("gzip, deflate, br", {"identity": b"", "gzip": b""}) == "gzip"
+    assert _negotiate_encoding("br;q=0.5, gzip", stored) == "gzip"
+    assert _negotiate_encoding("*", stored) == "br"
+    assert _negotiate_encoding("deflate", stored) == "identity"
+    assert _negotiate_encoding("", stored) == "identity"
+    assert _negotiate_encoding("gzip;q=0, identity;q=0.1", stored) == "identity"
+
+
+def test_trends_batch_returns_map_and_flags_missing(client: TestClient) -> None:
+    """GET /trends/batch returns one entry per country and flags countries without data."""
+    now = datetime.now(timezone.utc)
+    docs = {
+        "US": TrendsDocument(country="US", topics=[{"title": "US Topic"}], source="scraper", fetched_at=now, updated_at=now),
+        "GB": TrendsDocument(country="GB", topics=[{"title": "GB Topic"}], source="scraper", fetched_at=now, updated_at=now),
+    }
+    with patch("main.get_trends_for_countries", return_value=docs) as mock_get:
+        response = client.get("/trends/batch?countries=us, GB,FR,us")
+
+    assert response.status_code == 200
+    data = response.json()["countries"]
+    assert list(data) == ["US", "GB", "FR"]
+    assert data["US"]["topics"][0]["title"] == "US Topic"
+    assert data["US"]["source"] == "db"
+    assert data["US"]["missing"] is False
+    assert data["FR"] == {"country": "FR", "topics": [], "source": "fallback", "missing": True}
+    mock_get.assert_called_once_with(["US", "GB", "FR"])
+
+
+def test_trends_batch_serves_cached_countries(client: TestClient) -> None:
+    """GET /trends/batch only queries countries missing from the cache."""
+    now = datetime.now(timezone.utc)
+    us = TrendsDocument(country="US", topics=[{"title": "US Topic"}], source="scraper", fetched_at=now, updated_at=now)
+    with patch("main.get_trends_from_db", return_value=us):
+        client.get("/trends?country=US")
+    with patch("main.get_trends_for_countries", return_value={}) as mock_get:
+        response = client.get("/trends/batch?countries=US,DE")
+
+    assert response.json()["countries"]["US"]["missing"] is False
+    mock_get.assert_called_once_with(["DE"])
+
+
+def test_trends_batch_invalid_country_returns_400(client: TestClient) -> None:
+    """GET /trends/batch validates every code like /trends."""
+    response = client.get("/trends/batch?countries=US,USA")
+    assert response.status_code == 400
+    assert "Invalid" in response.json()["detail"]
+
+    response = client.get("/trends/batch?countries=,")
+    assert response.status_code == 400
+
+
+def test_trends_batch_db_unreachable_returns_fallbacks(client: TestClient) -> None:
+    """GET /trends/batch when DB unreachable returns empty fallbacks for every country."""
+    with patch("main.get_trends_for_countries", side_effect=Exception("Connection refused")):
+        response = client.get("/trends/batch?countries=US,GB")
+
+    assert response.status_code == 200
+    assert all(entry["missing"] for entry in response.json()["countries"].values())
+
+
 # --- Service layer tests ---
 
 
+def _history(*docs: dict):
+    async def gen(*args, **kwargs):
+        for doc in docs:
+            yield doc
+    return gen
+
+
+def test_trends_history_streams_snapshots(client: TestClient) -> None:
+    """GET /trends/history returns the snapshots in the range as one JSON document."""
+    newer = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    older = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    docs = [
+        {"country": "US", "topics": [{"title": "B"}], "source": "feed", "fetched_at": newer.replace(tzinfo=None)},
+        {"country": "US", "topics": [{"title": "A"}], "source": "scraper", "fetched_at": older},
+    ]
+    with patch("main.iter_trends_history", side_effect=_history(*docs)) as mock_iter:
+        response = client.get("/trends/history?country=us&from=2026-01-01T00:00:00Z&to=2026-01-03T00:00:00Z&limit=5")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    data = response.json()
+    assert data["country"] == "US"
+    assert [s["topics"][0]["title"] for s in data["snapshots"]] == ["B", "A"]
+    assert data["snapshots"][0]["fetched_at"] == newer.isoformat()
+    code, start, end, limit = mock_iter.call_args[0]
+    assert (code, start, end, limit) == ("US", older, datetime(2026, 1, 3, tzinfo=timezone.utc), 5)
+
+
+def test_trends_history_rejects_inverted_range(client: TestClient) -> None:
+    """from after to is a 400."""
+    response = client.get("/trends/history?country=US&from=2026-02-01T00:00:00Z&to=2026-01-01T00:00:00Z")
+    assert response.status_code == 400
+
+
+def test_trends_history_limit_is_bounded(client: TestClient) -> None:
+    """limit above HISTORY_MAX_LIMIT is rejected."""
+    assert client.get("/trends/history?country=US&limit=100000").status_code == 422
+
+
+def test_trends_history_db_unreachable_returns_empty(client: TestClient) -> None:
+    """A failing cursor yields an empty history instead of a 500."""
+    async def failing(*args, **kwargs):
+        raise Exception("Connection refused")
+        yield  # pragma: no cover
+
+    with patch("main.iter_trends_history", side_effect=failing):
+        response = client.get("/trends/history?country=FR")
+
+    assert response.status_code == 200
+    assert response.json() == {"country": "FR", "snapshots": []}
+
+
+def test_trends_changes_returns_stored_delta(client: TestClient) -> None:
+    """GET /trends/changes returns the delta stored by save_trends."""
+    now = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    stored = {
+        "country": "US",
+        "fetched_at": now.replace(tzinfo=None),
+        "previous_fetched_at": datetime(2026, 1, 1),
+        "new": [{"title": "C", "rank": 2}],
+        "dropped": [{"title": "A", "previous_rank": 1}],
+        "moved": [],
+    }
+    with patch("main.get_trends_changes", return_value=stored) as mock_get:
+        response = client.get("/trends/changes?country=us")
+
+    mock_get.assert_awaited_once_with("US")
+    data = response.json()
+    assert data["source"] == "db"
+    assert data["new"] == stored["new"]
+    assert data["dropped"] == stored["dropped"]
+    assert data["fetched_at"] == now.isoformat()
+    assert data["previous_fetched_at"] == "2026-01-01T00:00:00+00:00"
+
+
+def test_trends_changes_empty_when_missing_or_db_down(client: TestClient) -> None:
+    """No delta yet, or an unreachable DB, returns empty lists."""
+    with patch("main.get_trends_changes", side_effect=Exception("Connection refused")):
+        response = client.get("/trends/changes?country=FR")
+
+    assert response.status_code == 200
+    assert response.json() == {"country": "FR", "new": [], "dropped": [], "moved": [], "source": "fallback"}
+
+
+def test_worker_runs_returns_reports(client: TestClient) -> None:
+    """GET /worker/runs returns stored run reports with UTC timestamps."""
+    runs = [{"started_at": datetime(2026, 1, 1, 6), "finished_at": datetime(2026, 1, 1, 6, 1), "ok": 2, "failed": 0,
+             "countries": [{"country": "US", "ok": True, "source": "feed", "items": 25, "stages": []}]}]
+    with patch("main.get_worker_runs", return_value=runs) as mock_get:
+        response = client.get("/worker/runs?limit=5")
+
+    mock_get.assert_awaited_once_with(5)
+    data = response.json()["runs"]
+    assert data[0]["started_at"] == "2026-01-01T06:00:00+00:00"
+    assert data[0]["countries"][0]["source"] == "feed"
+
+
+def test_worker_runs_db_unreachable_returns_empty(client: TestClient) -> None:
+    """An unreachable DB returns no runs instead of a 500."""
+    with patch("main.get_worker_runs", side_effect=Exception("Connection refused")):
+        assert client.get("/worker/runs").json() == {"runs": []}
+
+
 def test_get_trending_topics_returns_list() -> None:
     """get_trending_topics returns list of trend dicts from API."""
     from services.trends import get_trending_topics
@@ -225,7 +579,7 @@ def test_get_trending_topics_serpapi_when_scraper_fails() -> None:
     with patch.dict(os.environ, {"SERPAPI_KEY": "test-key"}, clear=False):
         with patch("services.trends_scraper.scrape_trending_topics") as mock_scrape:
             mock_scrape.return_value = []  # scraper returns empty
-            with patch("services.trends.requests.get") as mock_get:
+            with patch("requests.get") as mock_get:
                 mock_get.return_value = mock_resp
 
                 topics, source = get_trending_topics("US")
@@ -234,6 +588,23 @@ def test_get_trending_topics_serpapi_when_scraper_fails() -> None:
     assert source == "serpapi"
 
 
+def test_get_trending_topics_uses_scraper_session() -> None:
+    """get_trending_topics scrapes through the given session instead of launching a browser."""
+    from services.trends import get_trending_topics
+
+    session = MagicMock()
+    session.scrape.return_value = [{"title": "Scraped", "search_volume": "10K+"}]
+
+    with patch.dict(os.environ, {"TRENDS_USE_SCRAPER": "true", "TRENDS_USE_MOCK": "false"}, clear=False):
+        with patch("services.trends_scraper.scrape_trending_topics") as mock_scrape:
+            topics, source = get_trending_topics("FR", scraper=session)
+
+    session.scrape.assert_called_once_with("FR")
+    mock_scrape.assert_not_called()
+    assert topics == [{"title": "Scraped", "search_volume": "10K+"}]
+    assert source == "scraper"
+
+
 def test_extract_titles_from_title_column() -> None:
     """_extract_titles uses 'title' column when present."""
     from services.trends import _extract_titles
@@ -260,6 +631,24 @@ def test_extract_titles_fallback_last_column() -> None:
     assert _extract_titles(df) == ["P", "Q"]
 
 
+def test_extract_titles_from_records() -> None:
+    """_extract_titles accepts plain records and strings without pandas."""
+    from services.trends import _extract_titles
+
+    assert _extract_titles([{"title": " A "}, {"title": "B"}, {"title": ""}, {"title": None}]) == ["A", "B"]
+    assert _extract_titles([{"entityNames": ["X", "Y"]}, {"entityNames": "Z"}]) == ["X, Y", "Z"]
+    assert _extract_titles(["P", "P", "Q"]) == ["P", "Q"]
+    assert _extract_titles([]) == []
+
+
+def test_extract_titles_skips_nan() -> None:
+    """Missing DataFrame cells are skipped."""
+    from services.trends import _extract_titles
+
+    df = pd.DataFrame({"title": ["A", None, float("nan")]})
+    assert _extract_titles(df) == ["A"]
+
+
 def test_fetch_via_serpapi_success() -> None:
     """_fetch_via_serpapi returns topic titles from API response."""
     from services.trends import _fetch_via_serpapi
@@ -273,7 +662,7 @@ def test_fetch_via_serpapi_success() -> None:
         ]
     }
 
-    with patch("services.trends.requests.get") as mock_get:
+    with patch("requests.get") as mock_get:
         mock_get.return_value = mock_resp
 
         result = _fetch_via_serpapi("US", "api-key")
@@ -285,9 +674,66 @@ def test_fetch_via_serpapi_error_returns_empty() -> None:
     """_fetch_via_serpapi returns empty list on error."""
     from services.trends import _fetch_via_serpapi
 
-    with patch("services.trends.requests.get") as mock_get:
+    with patch("requests.get") as mock_get:
         mock_get.side_effect = Exception("Timeout")
 
         result = _fetch_via_serpapi("US", "api-key")
 
     assert result == []
+
+
+def test_trends_search_matches_across_countries(client: TestClient) -> None:
+    """/trends/search loads the index from MongoDB and matches by prefix, ignoring accents."""
+    entries = {
+        "FR": {"titles": ["Météo France", "PSG"], "title_tokens": None, "volumes": [None, 50000], "updated_at": None},
+        "BE": {"titles": ["Meteo Bruxelles"], "title_tokens": [["meteo", "bruxelles"]], "volumes": [None],
+               "updated_at": None},
+    }
+    with patch("main.get_trends_search_entries", return_value=entries) as mock_get:
+        response = client.get("/trends/search?q=METEO")
+        client.get("/trends/search?q=psg")
+    assert response.status_code == 200
+    assert response.json() == {
+        "query": "METEO",
+        "countries": ["BE", "FR"],
+        "matches": [
+            {"country": "BE", "title": "Meteo Bruxelles", "rank": 1},
+            {"country": "FR", "title": "Météo France", "rank": 1},
+        ],
+    }
+    mock_get.assert_awaited_once_with(None)  # the second request is served from the mirror
+
+
+def test_trends_search_db_unreachable_returns_empty(client: TestClient) -> None:
+    with patch("main.get_trends_search_entries", side_effect=Exception("Connection refused")):
+        response = client.get("/trends/search?q=anything")
+    assert response.status_code == 200
+    assert response.json() == {"query": "anything", "countries": [], "matches": []}
+    assert client.get("/trends/search?q=").status_code == 422
+
+
+def test_trends_global_groups_titles_across_countries(client: TestClient) -> None:
+    """/trends/global clusters near-duplicate titles from every country, most countries first."""
+    entries = {
+        "US": {"titles": ["Champions League final", "Weather"], "volumes": [500000, None], "updated_at": None},
+        "GB": {"titles": ["Champions League Final 2026"], "volumes": [200000], "updated_at": None},
+        "DE": {"titles": ["Wetter"], "volumes": [None], "updated_at": None},
+    }
+    with patch("main.get_trends_cluster_entries", return_value=entries) as mock_get:
+        response = client.get("/trends/global")
+        client.get("/trends/global?min_countries=1")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["countries"] == 3
+    assert [(c["title"], c["countries"], c["volume"]) for c in body["clusters"]] == [
+        ("Champions League final", ["GB", "US"], 700000),
+    ]
+    mock_get.assert_awaited_once_with(None)  # the second request is served from the mirror
+    assert client.get("/trends/global?min_countries=0").status_code == 422
+
+
+def test_trends_global_db_unreachable_returns_empty(client: TestClient) -> None:
+    with patch("main.get_trends_cluster_entries", side_effect=Exception("Connection refused")):
+        response = client.get("/trends/global")
+    assert response.status_code == 200
+    assert response.json() == {"countries": 0, "clusters": []}
@@ -0,0 +1,202 @@
+"""Tests for the in-process trends cache."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+
+from models import TrendsDocument
+from services.trends_cache import TrendsCache
+
+
+def _doc(country: str = "US", updated_at: datetime | None = None) -> TrendsDocument:
+    now = updated_at or datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return TrendsDocument(country=country, topics=[{"title": "A"}], source="scraper", fetched_at=now, updated_at=now)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_hit_skips_loader() -> None:
+    """A second get within the TTL is served without calling the loader."""
+    cache = TrendsCache(ttl=60)
+    loader = AsyncMock(return_value=_doc())
+
+    first = await cache.get("US", loader)
+    second = await cache.get("US", loader)
+
+    assert first is second
+    loader.assert_awaited_once_with("US")
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+async def test_entry_expires_after_ttl() -> None:
+    """Entries older than the TTL are reloaded."""
+    clock = _Clock()
+    cache = TrendsCache(ttl=10, clock=clock)
+    loader = AsyncMock(return_value=_doc())
+
+    await cache.get("US", loader)
+    clock.now = 11
+    await cache.get("US", loader)
+
+    assert loader.await_count == 2
+
+
+async def test_lru_eviction() -> None:
+    """The least recently used country is evicted at maxsize."""
+    cache = TrendsCache(maxsize=2, ttl=60)
+    loader = AsyncMock(side_effect=lambda c: _doc(c))
+
+    await cache.get("US", loader)
+    await cache.get("GB", loader)
+    await cache.get("US", loader)  # US becomes most recent
+    await cache.get("FR", loader)  # evicts GB
+
+    assert cache.stats()["entries"] == 2
+    await cache.get("US", loader)
+    await cache.get("GB", loader)
+    assert [c.args[0] for c in loader.await_args_list] == ["US", "GB", "FR", "GB"]
+
+
+async def test_single_flight_on_concurrent_miss() -> None:
+    """Concurrent misses for the same country share one loader call."""
+    cache = TrendsCache(ttl=60)
+    calls = 0
+
+    async def loader(country: str) -> TrendsDocument:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return _doc(country)
+
+    results = await asyncio.gather(*(cache.get("US", loader) for _ in range(10)))
+
+    assert calls == 1
+    assert all(r is results[0] for r in results)
+
+
+async def test_loader_error_is_not_cached() -> None:
+    """A failing load propagates and the next call retries."""
+    cache = TrendsCache(ttl=60)
+    loader = AsyncMock(side_effect=[Exception("down"), _doc()])
+
+    try:
+        await cache.get("US", loader)
+    except Exception as e:
+        assert str(e) == "down"
+    assert (await cache.get("US", loader)).country == "US"
+
+
+async def test_version_change_invalidates_country() -> None:
+    """Entries whose updated_at differs from the version document are dropped."""
+    clock = _Clock()
+    cache = TrendsCache(ttl=300, poll_interval=5, clock=clock)
+    old = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    new = old + timedelta(hours=1)
+    loader = AsyncMock(side_effect=[_doc("US", old), _doc("GB", old), _doc("US", new)])
+    versions = AsyncMock(return_value={"version": 1, "countries": {"US": old, "GB": old}})
+
+    await cache.get("US", loader, versions)
+    await cache.get("GB", loader, versions)
+
+    # Worker refreshed US; picked up on the next poll
+    versions.return_value = {"version": 2, "countries": {"US": new, "GB": old}}
+    clock.now = 6
+    refreshed = await cache.get("US", loader, versions)
+    await cache.get("GB", loader, versions)
+
+    assert refreshed.updated_at == new
+    assert loader.await_count == 3
+    assert cache.stats()["invalidations"] == 1
+
+
+async def test_refresh_during_inflight_load_is_not_missed() -> None:
+    """A version bump polled while a load is running must not let the pre-refresh document stick until the TTL."""
+    clock = _Clock()
+    cache = TrendsCache(ttl=300, poll_interval=5, clock=clock)
+    old = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    new = old + timedelta(hours=1)
+    versions = AsyncMock(return_value={"version": 1, "countries": {"US": old}})
+    await cache.poll(versions)
+
+    release = asyncio.Event()
+    docs = iter([_doc("US", old), _doc("US", new)])
+
+    async def loader(country: str) -> TrendsDocument:
+        doc = next(docs)  # read before the worker's save lands
+        await release.wait()
+        return doc
+
+    slow = asyncio.create_task(cache.get("US", loader, versions))
+    await asyncio.sleep(0)
+    # The worker saves US and another request polls the new version while the load is still running
+    versions.return_value = {"version": 2, "countries": {"US": new}}
+    clock.now = 6
+    await cache.poll(versions)
+    release.set()
+    assert (await slow).updated_at == old  # the in-flight caller still gets what it read
+
+    for t in (12, 18, 100, 299):
+        clock.now = t
+        assert (await cache.get("US", loader, versions)).updated_at == new
+
+
+async def test_poll_is_throttled() -> None:
+    """The version document is read at most once per poll_interval."""
+    clock = _Clock()
+    cache = TrendsCache(ttl=300, poll_interval=5, clock=clock)
+    loader = AsyncMock(return_value=_doc())
+    versions = AsyncMock(return_value=None)
+
+    for _ in range(3):
+        await cache.get("US", loader, versions)
+    clock.now = 5
+    await cache.get("US", loader, versions)
+
+    assert versions.await_count == 2
+
+
+async def test_get_many_loads_misses_in_one_call() -> None:
+    """get_many serves hits from cache and loads all misses with one loader call."""
+    cache = TrendsCache(ttl=60)
+    await cache.get("US", AsyncMock(return_value=_doc("US")))
+    loader = AsyncMock(return_value={"GB": _doc("GB")})
+
+    result = await cache.get_many(["US", "GB", "FR"], loader)
+
+    loader.assert_awaited_once_with(["GB", "FR"])
+    assert result["US"].country == "US"
+    assert result["GB"].country == "GB"
+    assert result["FR"] is None
+    # Missing countries are cached too
+    await cache.get_many(["FR"], loader)
+    assert loader.await_count == 1
+
+
+async def test_disabled_when_ttl_zero() -> None:
+    """ttl=0 disables caching entirely."""
+    cache = TrendsCache(ttl=0)
+    loader = AsyncMock(return_value=_doc())
+
+    await cache.get("US", loader)
+    await cache.get("US", loader)
+
+    assert loader.await_count == 2
+
+
+def test_trends_endpoint_uses_cache(client: TestClient) -> None:
+    """GET /trends only reads MongoDB once for repeat requests."""
+    with patch("main.get_trends_from_db", return_value=_doc()) as mock_get:
+        first = client.get("/trends?country=US")
+        second = client.get("/trends?country=us")
+
+    assert first.json() == second.json()
+    mock_get.assert_called_once_with("US")
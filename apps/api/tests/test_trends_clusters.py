@@ -0,0 +1,60 @@
+"""Tests for MinHash signatures and the /trends/global LSH cluster index."""
+
+import struct
+
+from services.trends_clusters import NUM_PERM, TrendsClusterIndex, minhash, shingles, similarity
+
+
+def _sim(a: str, b: str) -> float:
+    fmt = f"<{NUM_PERM}Q"
+    return similarity(struct.unpack(fmt, minhash(a)), struct.unpack(fmt, minhash(b)))
+
+
+def test_shingles_fold_and_skip_short_words() -> None:
+    assert shingles("Météo") == shingles("meteo")
+    assert "vs" not in shingles("Arsenal vs Chelsea")
+    assert "2026" in shingles("UCL final 2026")
+    assert shingles("FC") == {"fc", " fc", "fc "}  # short words count when nothing else is left
+
+
+def test_minhash_is_deterministic_and_tracks_similarity() -> None:
+    assert minhash("Champions League final") == minhash("champions league FINAL")
+    assert len(minhash("x")) == NUM_PERM * 8
+    assert _sim("Champions League final", "Champions League Final 2026") >= 0.7
+    assert _sim("Real Madrid vs Barcelona", "Real Madrid - Barcelone") >= 0.6
+    assert _sim("Arsenal vs Chelsea", "Real Madrid vs Barcelona") < 0.2
+
+
+def test_clusters_group_near_duplicates_and_rank_by_countries_then_volume() -> None:
+    index = TrendsClusterIndex()
+    index.replace_country("US", ["Champions League final", "Taylor Swift tour"], volumes=[500000, 100000])
+    index.replace_country("GB", ["Champions League Final 2026", "Arsenal vs Chelsea"], volumes=[200000, 50000])
+    index.replace_country("FR", ["champions league final", "Real Madrid - Barcelone"], volumes=[None, 20000])
+    index.replace_country("ES", ["Real Madrid vs Barcelona"], volumes=[900000])
+
+    clusters = index.clusters()
+    assert [(c["title"], c["countries"], c["volume"]) for c in clusters] == [
+        ("Champions League final", ["FR", "GB", "US"], 700000),
+        ("Real Madrid vs Barcelona", ["ES", "FR"], 920000),
+    ]
+    assert clusters[0]["country_count"] == 3
+    assert clusters[0]["topics"][0] == {"country": "FR", "title": "champions league final", "rank": 1}
+    assert index.clusters(limit=1) == clusters[:1]
+    singles = index.clusters(min_countries=1)
+    assert [c["title"] for c in singles[2:]] == ["Taylor Swift tour", "Arsenal vs Chelsea"]
+
+
+def test_replacing_a_country_only_relinks_its_titles() -> None:
+    index = TrendsClusterIndex()
+    index.replace_country("US", ["Champions League final"])
+    index.replace_country("GB", ["Champions League final"], signatures=[minhash("Champions League final")])
+    assert index.stats()["links"] == 1
+
+    index.replace_country("GB", ["Election results"])
+    assert index.clusters() == []
+    assert index.stats() == {"countries": 2, "topics": 2, "buckets": 32, "links": 0}
+
+    index.replace_country("DE", ["Champions League Finale"])
+    assert index.clusters()[0]["countries"] == ["DE", "US"]
+    index.remove_country("DE")
+    assert index.clusters() == []
@@ -0,0 +1,36 @@
+"""Tests for refresh-over-refresh trends deltas."""
+
+from services.trends_diff import diff_topics
+
+
+def test_diff_new_dropped_and_moved() -> None:
+    """Topics are classified by title; rank_change is positive when a topic climbs."""
+    previous = [{"title": "A", "search_volume": "1M+"}, {"title": "B"}, {"title": "C"}]
+    current = [{"title": "B"}, {"title": "A", "search_volume": "1M+"}, {"title": "D", "search_volume": "5K+"}]
+
+    delta = diff_topics(previous, current)
+
+    assert delta["new"] == [{"title": "D", "rank": 3, "search_volume": "5K+"}]
+    assert delta["dropped"] == [{"title": "C", "previous_rank": 3}]
+    assert delta["moved"] == [
+        {"title": "B", "rank": 1, "previous_rank": 2, "rank_change": 1},
+        {"title": "A", "rank": 2, "search_volume": "1M+", "previous_rank": 1, "rank_change": -1,
+         "previous_search_volume": "1M+"},
+    ]
+
+
+def test_diff_volume_change_at_same_rank() -> None:
+    """A volume change alone counts as moved with rank_change 0."""
+    delta = diff_topics([{"title": "A", "search_volume": "10K+"}], [{"title": "A", "search_volume": "50K+"}])
+
+    assert delta["moved"] == [{
+        "title": "A", "rank": 1, "search_volume": "50K+", "previous_rank": 1, "rank_change": 0,
+        "previous_search_volume": "10K+",
+    }]
+
+
+def test_diff_matches_titles_case_and_space_insensitively() -> None:
+    """Unchanged topics (modulo case and whitespace) produce an empty delta."""
+    delta = diff_topics([{"title": "World  Cup"}], [{"title": "world cup"}])
+
+    assert delta == {"new": [], "dropped": [], "moved": []}
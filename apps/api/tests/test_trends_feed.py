@@ -0,0 +1,105 @@
+"""Tests for the browserless trending-now feed fetcher."""
+
+import os
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from services.trends_feed import _parse_trending_feed, fetch_trending_feed
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _response(name: str) -> MagicMock:
+    resp = MagicMock()
+    resp.content = (FIXTURES / name).read_bytes()
+    resp.raise_for_status.return_value = None
+    return resp
+
+
+def test_parse_trending_feed_us_fixture() -> None:
+    """_parse_trending_feed maps title/approx_traffic/pubDate and skips blanks and duplicates."""
+    result = _parse_trending_feed((FIXTURES / "trending_rss_us.xml").read_bytes())
+
+    assert [t["title"] for t in result] == ["champions league final", "nba playoffs", "weather tomorrow"]
+    assert result[0]["search_volume"] == "500000+"
+    assert result[0]["started"] == "Sat, 30 May 2026 19:40:00 -0700"
+    # First occurrence wins for duplicate titles
+    assert result[1]["search_volume"] == "200000+"
+
+
+def test_parse_trending_feed_keeps_accents() -> None:
+    """Localized feeds keep non-ASCII titles."""
+    result = _parse_trending_feed((FIXTURES / "trending_rss_fr.xml").read_bytes())
+
+    assert result[0] == {
+        "title": "Élection présidentielle",
+        "search_volume": "100000+",
+        "started": "Sun, 31 May 2026 08:30:00 +0200",
+    }
+
+
+def test_parse_trending_feed_invalid_xml_returns_empty() -> None:
+    """Malformed responses (e.g. an HTML consent page) parse to an empty list."""
+    assert _parse_trending_feed(b"<html><body>Before you continue") == []
+
+
+def test_fetch_trending_feed_uses_shared_session() -> None:
+    """fetch_trending_feed calls the pooled session with the geo parameter."""
+    session = MagicMock()
+    session.get.return_value = _response("trending_rss_fr.xml")
+
+    with patch("services.trends_feed.get_session", return_value=session):
+        result = fetch_trending_feed("fr")
+
+    assert session.get.call_args[1]["params"] == {"geo": "FR"}
+    assert [t["title"] for t in result] == ["Élection présidentielle", "Roland-Garros"]
+
+
+def test_fetch_trending_feed_error_returns_empty() -> None:
+    """fetch_trending_feed returns [] on HTTP errors."""
+    session = MagicMock()
+    session.get.side_effect = requests.ConnectionError("refused")
+
+    with patch("services.trends_feed.get_session", return_value=session):
+        assert fetch_trending_feed("US") == []
+
+
+def test_get_session_is_shared() -> None:
+    """get_session returns one pooled session."""
+    from services.trends_feed import get_session
+
+    assert get_session() is get_session()
+
+
+def test_get_trending_topics_prefers_feed() -> None:
+    """get_trending_topics uses the feed first and never launches the scraper when it succeeds."""
+    from services.trends import get_trending_topics
+
+    session = MagicMock()
+    session.get.return_value = _response("trending_rss_us.xml")
+    scraper = MagicMock()
+
+    with patch.dict(os.environ, {"TRENDS_USE_FEED": "true", "TRENDS_USE_MOCK": "false"}, clear=False):
+        with patch("services.trends_feed.get_session", return_value=session):
+            topics, source = get_trending_topics("US", scraper=scraper)
+
+    assert source == "feed"
+    assert topics[0]["title"] == "champions league final"
+    scraper.scrape.assert_not_called()
+
+
+def test_get_trending_topics_falls_back_to_scraper_when_feed_fails() -> None:
+    """get_trending_topics falls back to Playwright when the feed returns nothing."""
+    from services.trends import get_trending_topics
+
+    scraper = MagicMock()
+    scraper.scrape.return_value = [{"title": "Scraped"}]
+
+    with patch.dict(os.environ, {"TRENDS_USE_FEED": "true", "TRENDS_USE_SCRAPER": "true", "TRENDS_USE_MOCK": "false"}, clear=False):
+        with patch("services.trends_feed.fetch_trending_feed", return_value=[]):
+            topics, source = get_trending_topics("US", scraper=scraper)
+
+    assert source == "scraper"
+    assert topics == [{"title": "Scraped"}]
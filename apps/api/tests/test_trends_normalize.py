@@ -0,0 +1,91 @@
+"""Tests for search volume / start time normalization and server-side topic selection."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from services.trends_normalize import normalize_topic, parse_search_volume, parse_started, select_topics
+
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("200K+", 200_000),
+        ("2M+", 2_000_000),
+        ("1,000+", 1_000),
+        ("1.5M+", 1_500_000),
+        ("500+", 500),
+        ("200 k+", 200_000),
+        ("2 M+", 2_000_000),
+        ("1 Md+", 1_000_000_000),
+        ("20 000+", 20_000),
+        ("200.000+", 200_000),
+        ("50 Tsd.+", 50_000),
+        ("1,5 Mio.+", 1_500_000),
+        ("2 Mrd.+", 2_000_000_000),
+        ("", None),
+        (None, None),
+        ("lots", None),
+        ("5 zillion+", None),
+    ],
+)
+def test_parse_search_volume(text, expected) -> None:
+    """US/GB, FR and DE volume strings become approximate search counts."""
+    assert parse_search_volume(text) == expected
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("5 hours ago", datetime(2026, 10, 17, 7, 0, tzinfo=timezone.utc)),
+        ("an hour ago", datetime(2026, 10, 17, 11, 0, tzinfo=timezone.utc)),
+        ("30 minutes ago", datetime(2026, 10, 17, 11, 30, tzinfo=timezone.utc)),
+        ("1 day ago", datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)),
+        ("yesterday", datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)),
+        ("il y a 5 heures", datetime(2026, 10, 17, 7, 0, tzinfo=timezone.utc)),
+        ("Il y a 30 min", datetime(2026, 10, 17, 11, 30, tzinfo=timezone.utc)),
+        ("il y a 2 jours", datetime(2026, 10, 15, 12, 0, tzinfo=timezone.utc)),
+        ("vor 5 Stunden", datetime(2026, 10, 17, 7, 0, tzinfo=timezone.utc)),
+        ("vor einer Stunde", datetime(2026, 10, 17, 11, 0, tzinfo=timezone.utc)),
+        ("vor 2 Tagen", datetime(2026, 10, 15, 12, 0, tzinfo=timezone.utc)),
+        ("Fri, 17 Oct 2026 08:00:00 -0700", datetime(2026, 10, 17, 15, 0, tzinfo=timezone.utc)),
+        ("2026-10-17T08:00:00Z", datetime(2026, 10, 17, 8, 0, tzinfo=timezone.utc)),
+        ("October 17, 2026 at 8:00:00 AM UTC-7", datetime(2026, 10, 17, 15, 0, tzinfo=timezone.utc)),
+        ("2 months ago", None),
+        ("Active", None),
+        ("", None),
+    ],
+)
+def test_parse_started(text, expected) -> None:
+    """Relative (en/fr/de) and absolute start times resolve to UTC against the refresh time."""
+    assert parse_started(text, NOW) == expected
+
+
+def test_normalize_topic_adds_parsed_fields_and_keeps_display_strings() -> None:
+    """Parseable values gain volume/started_at; unparseable ones are left out."""
+    topic = {"title": "A", "search_volume": "200K+", "started": "5 hours ago"}
+    assert normalize_topic(topic, NOW) == {**topic, "volume": 200_000, "started_at": "2026-10-17T07:00:00Z"}
+    assert normalize_topic({"title": "B", "search_volume": "?"}, NOW) == {"title": "B", "search_volume": "?"}
+
+
+def test_select_topics_sorts_filters_and_pages() -> None:
+    """Volume sorts highest first and started newest first, missing values last; paging follows."""
+    topics = [
+        {"title": "A", "volume": 1_000, "started_at": "2026-10-17T10:00:00Z"},
+        {"title": "B"},
+        {"title": "C", "volume": 50_000, "started_at": "2026-10-17T06:00:00Z"},
+        # Saved before normalization: parsed on the fly against fetched_at
+        {"title": "D", "search_volume": "20K+", "started": "1 hour ago"},
+    ]
+
+    def titles(**kwargs) -> list[str]:
+        return [t["title"] for t in select_topics(topics, NOW, **kwargs)]
+
+    assert titles() == ["A", "B", "C", "D"]
+    assert titles(sort="volume") == ["C", "D", "A", "B"]
+    assert titles(sort="started") == ["D", "A", "C", "B"]
+    assert titles(sort="volume", min_volume=10_000) == ["C", "D"]
+    assert titles(sort="volume", limit=2, offset=1) == ["D", "A"]
+    assert titles(offset=10) == []
@@ -132,3 +132,234 @@ def test_parse_trends_csv_nonexistent_returns_empty() -> None:
     """_parse_trends_csv returns empty list for nonexistent path."""
     result = _parse_trends_csv(Path("/nonexistent/path.csv"))
     assert result == []
+
+
+# --- ScraperSession ---
+
+
+class _FakePage:
+    def __init__(self, heap_bytes: int = 0) -> None:
+        self.heap_bytes = heap_bytes
+        self.closed = False
+
+    def evaluate(self, script: str) -> int:
+        return self.heap_bytes
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _FakeContext:
+    def __init__(self, heap_bytes: int = 0) -> None:
+        self.heap_bytes = heap_bytes
+        self.closed = False
+        self.cookies_cleared = 0
+        self.routes: list = []
+
+    def route(self, pattern: str, handler) -> None:
+        self.routes.append((pattern, handler))
+
+    def new_page(self) -> _FakePage:
+        return _FakePage(self.heap_bytes)
+
+    def clear_cookies(self) -> None:
+        self.cookies_cleared += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _FakeBrowser:
+    def __init__(self, heap_bytes: int = 0) -> None:
+        self.heap_bytes = heap_bytes
+        self.contexts: list[_FakeContext] = []
+        self.closed = False
+
+    def is_connected(self) -> bool:
+        return not self.closed
+
+    def new_context(self, **kwargs) -> _FakeContext:
+        ctx = _FakeContext(self.heap_bytes)
+        self.contexts.append(ctx)
+        return ctx
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _session(browser: _FakeBrowser, **kwargs):
+    from services.trends_scraper import ScraperSession
+
+    session = ScraperSession(**kwargs)
+    session._browser = browser
+    return session
+
+
+def test_scraper_session_reuses_and_recycles_contexts() -> None:
+    """ScraperSession reuses one context across countries and replaces it after max uses."""
+    from unittest.mock import patch
+
+    browser = _FakeBrowser()
+    session = _session(browser, max_context_uses=2)
+    with patch("services.trends_scraper._scrape_page", side_effect=lambda page, c, fast=True: [{"title": c}]):
+        results = [session.scrape(c) for c in ("US", "GB", "FR")]
+
+    assert results == [[{"title": "US"}], [{"title": "GB"}], [{"title": "FR"}]]
+    assert len(browser.contexts) == 2
+    assert browser.contexts[0].closed  # recycled after 2 uses
+    assert browser.contexts[0].cookies_cleared == 1
+    assert session.stats()["contexts_recycled"] == 1
+
+    session.close()
+    assert browser.closed
+    assert browser.contexts[1].closed
+
+
+def test_scraper_session_recycles_context_over_memory_limit() -> None:
+    """A context whose page heap exceeds the memory limit is closed after the scrape."""
+    from unittest.mock import patch
+
+    browser = _FakeBrowser(heap_bytes=600 * 1024 * 1024)
+    session = _session(browser, max_context_uses=10, max_context_memory_mb=512)
+    with patch("services.trends_scraper._scrape_page", return_value=[{"title": "A"}]):
+        session.scrape("US")
+        session.scrape("GB")
+
+    assert len(browser.contexts) == 2
+    assert all(c.closed for c in browser.contexts)
+
+
+def test_scraper_session_failure_returns_empty_and_drops_context() -> None:
+    """A page failure returns [] and the context is not reused."""
+    from unittest.mock import patch
+
+    browser = _FakeBrowser()
+    session = _session(browser)
+    with patch("services.trends_scraper._scrape_page", side_effect=Exception("timeout")):
+        assert session.scrape("US") == []
+
+    assert browser.contexts[0].closed
+    assert session.stats()["contexts_idle"] == 0
+
+
+def test_scrape_trending_topics_closes_its_session() -> None:
+    """scrape_trending_topics runs a one-off session and closes it."""
+    from unittest.mock import patch
+
+    from services.trends_scraper import ScraperSession, scrape_trending_topics
+
+    with patch.object(ScraperSession, "scrape", return_value=[{"title": "A"}]) as mock_scrape, \
+            patch.object(ScraperSession, "close") as mock_close:
+        assert scrape_trending_topics("US") == [{"title": "A"}]
+
+    mock_scrape.assert_called_once_with("US")
+    mock_close.assert_called_once()
+
+
+def test_fast_session_installs_route_blocking() -> None:
+    """Fast-mode sessions register the resource-blocking route on new contexts."""
+    from unittest.mock import patch
+
+    from services.trends_scraper import _block_non_essential
+
+    browser = _FakeBrowser()
+    fast = _session(browser, fast=True)
+    slow = _session(_FakeBrowser(), fast=False)
+    with patch("services.trends_scraper._scrape_page", return_value=[]):
+        fast.scrape("US")
+        slow.scrape("US")
+
+    assert browser.contexts[0].routes == [("**/*", _block_non_essential)]
+    assert slow._browser.contexts[0].routes == []
+
+
+def test_block_non_essential_aborts_heavy_and_tracking_requests() -> None:
+    """Images, fonts, media and analytics are aborted; documents and XHR continue."""
+    from unittest.mock import MagicMock
+
+    from services.trends_scraper import _block_non_essential
+
+    def _route(resource_type: str, url: str) -> MagicMock:
+        route = MagicMock()
+        route.request.resource_type = resource_type
+        route.request.url = url
+        _block_non_essential(route)
+        return route
+
+    assert _route("image", "https://trends.google.com/logo.png").abort.called
+    assert _route("font", "https://fonts.gstatic.com/x.woff2").abort.called
+    assert _route("script", "https://www.googletagmanager.com/gtag.js").abort.called
+    assert _route("document", "https://trends.google.com/trending?geo=US").continue_.called
+    assert _route("xhr", "https://trends.google.com/_/TrendsUi/data").continue_.called
+
+
+def test_scrape_page_uses_event_waits_not_sleeps() -> None:
+    """_scrape_page waits on rows/menu/download events and never sleeps for a fixed time."""
+    from unittest.mock import MagicMock
+
+    from services.trends_scraper import _scrape_page
+
+    page = MagicMock()
+    page.locator.return_value.count.return_value = 0
+
+    _scrape_page(page, "US", fast=True)
+
+    assert page.goto.call_args[1]["wait_until"] == "domcontentloaded"
+    page.wait_for_selector.assert_called_once()
+    page.wait_for_timeout.assert_not_called()
+
+    page = MagicMock()
+    _scrape_page(page, "US", fast=False)
+    assert page.goto.call_args[1]["wait_until"] == "networkidle"
+    page.wait_for_timeout.assert_not_called()
+
+
+# --- DOM extraction ---
+
+
+def test_extract_from_dom_uses_one_evaluate_and_keeps_rules() -> None:
+    """_extract_from_dom reads every row in one page.evaluate, skipping UI labels and duplicates."""
+    from unittest.mock import MagicMock
+
+    from services.trends_scraper import _extract_from_dom
+
+    page = MagicMock()
+    page.evaluate.return_value = {
+        "rows": [
+            ["Export", "", ""],
+            ["Lakers", "100K+", "2 hours ago"],
+            ["Lakers", "50K+", "1 hour ago"],
+            ["x", "", ""],
+            *[[f"Topic {i}", "1K+", ""] for i in range(5)],
+        ],
+        "fallback": [["Ignored"]],
+    }
+
+    items = _extract_from_dom(page)
+
+    page.evaluate.assert_called_once()
+    page.locator.assert_not_called()
+    page.get_by_role.assert_not_called()
+    assert items[0] == {"title": "Lakers", "search_volume": "100K+", "started": "2 hours ago"}
+    assert [i["title"] for i in items] == ["Lakers", *[f"Topic {i}" for i in range(5)]]
+
+
+def test_extract_from_dom_falls_back_to_selectors_when_rows_are_sparse() -> None:
+    """With fewer than 5 row titles, fallback column titles are added (deduped, skip list applied)."""
+    from services.trends_scraper import _items_from_rows
+
+    items = _items_from_rows([["Only one", "", ""]], [["Only one", "Export"], ["Second", "Third"]])
+    assert items == [{"title": "Only one"}, {"title": "Second"}, {"title": "Third"}]
+
+
+def test_extract_from_dom_saved_page_matches_per_cell_extraction() -> None:
+    """On the saved trending page, the single evaluate yields the same items as per-cell reads."""
+    from benchmarks.bench_scraper import FIXTURE, FixturePage, legacy_extract_from_dom
+    from services.trends_scraper import LIMIT, _extract_from_dom
+
+    page = FixturePage(FIXTURE.read_text(encoding="utf-8"))
+    items = _extract_from_dom(page)
+    assert page.roundtrips == 1
+    assert len(items) == LIMIT
+    assert all(i["search_volume"] and i["started"] for i in items)
+    assert legacy_extract_from_dom(page) == items
@@ -0,0 +1,95 @@
+"""Tests for the /trends/search tokenizer and in-memory index."""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+
+from services.trends_search import CountryMirror, TrendsSearchIndex, fold, tokenize
+
+
+def test_fold_and_tokenize_are_case_and_accent_insensitive() -> None:
+    assert fold("Café Müller") == "cafe muller"
+    assert tokenize("Ligue des Champions: PSG – Bayern, PSG") == ["ligue", "des", "champions", "psg", "bayern"]
+    assert tokenize("Ōsaka ÉTÉ") == ["osaka", "ete"]
+    assert tokenize("  – ") == []
+
+
+def test_search_matches_prefixes_of_every_query_token() -> None:
+    index = TrendsSearchIndex()
+    index.replace_country("FR", ["Ligue des Champions", "Météo Paris"], volumes=[200000, None])
+    index.replace_country("US", ["Champions League final", "Weather"])
+    index.replace_country("DE", ["Champions League", "Wetter"])
+
+    assert index.search("champ") == [
+        {"country": "DE", "title": "Champions League", "rank": 1},
+        {"country": "FR", "title": "Ligue des Champions", "rank": 1, "volume": 200000},
+        {"country": "US", "title": "Champions League final", "rank": 1},
+    ]
+    assert [m["country"] for m in index.search("CHAMP LEAG")] == ["DE", "US"]
+    assert index.search("meteo") == [{"country": "FR", "title": "Météo Paris", "rank": 2}]
+    assert index.search("champions weather") == []
+    assert index.search("champ", limit=1) == [{"country": "DE", "title": "Champions League", "rank": 1}]
+    assert index.search("!!") == []
+
+
+def test_replace_and_remove_country_update_postings() -> None:
+    index = TrendsSearchIndex()
+    index.replace_country("US", ["Alpha", "Beta"], title_tokens=[["alpha"], ["beta"]])
+    index.replace_country("US", ["Gamma"])
+
+    assert index.search("alpha") == []
+    assert index.search("gam") == [{"country": "US", "title": "Gamma", "rank": 1}]
+    assert index.stats() == {"countries": 1, "topics": 1, "tokens": 1}
+    index.remove_country("US")
+    assert index.stats() == {"countries": 0, "topics": 0, "tokens": 0}
+
+
+def test_sync_loads_everything_once_then_only_changed_countries() -> None:
+    t1 = datetime(2026, 10, 17, 8, tzinfo=timezone.utc)
+    t2 = datetime(2026, 10, 17, 9, tzinfo=timezone.utc)
+    now = [0.0]
+    index = TrendsSearchIndex(poll_interval=5.0, clock=lambda: now[0])
+    loader = AsyncMock(side_effect=[
+        {
+            "US": {"titles": ["Alpha"], "title_tokens": [["alpha"]], "volumes": [None], "updated_at": t1},
+            "GB": {"titles": ["Beta"], "title_tokens": [["beta"]], "volumes": [None], "updated_at": t1},
+        },
+        {"GB": {"titles": ["Gamma"], "title_tokens": [["gamma"]], "volumes": [500], "updated_at": t2}},
+    ])
+    versions = AsyncMock(return_value={"version": 2, "countries": {"US": t1, "GB": t2}})
+
+    asyncio.run(index.sync(loader, versions))
+    loader.assert_awaited_once_with(None)
+    asyncio.run(index.sync(loader, versions))  # within the poll interval: no DB call
+    versions.assert_not_awaited()
+
+    now[0] = 10.0
+    asyncio.run(index.sync(loader, versions))
+    assert loader.await_args_list[1].args == (["GB"],)
+    assert index.search("beta") == []
+    assert index.search("gamma") == [{"country": "GB", "title": "Gamma", "rank": 1, "volume": 500}]
+    assert index.search("alpha") == [{"country": "US", "title": "Alpha", "rank": 1}]
+
+
+def test_search_is_sub_millisecond_for_100_countries() -> None:
+    index = TrendsSearchIndex()
+    for c in range(120):
+        index.replace_country(f"C{c}", [f"Topic {c} number {i} Champions" for i in range(25)])
+    index.search("champ")  # warm up
+    start = time.perf_counter()
+    for _ in range(20):
+        index.search("number 7")
+    assert (time.perf_counter() - start) / 20 < 0.005  # generous bound for slow CI machines
+
+
+def test_country_mirror_requires_replace_entry() -> None:
+    """CountryMirror is abstract: a subclass without _replace_entry fails when created."""
+
+    class Incomplete(CountryMirror):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
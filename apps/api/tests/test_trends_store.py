@@ -6,20 +6,24 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from models import TrendsDocument
+from services.trends_store import trends_etag
 
 
 def test_save_trends_upserts() -> None:
-    """save_trends calls update_one with upsert."""
+    """save_trends calls find_one_and_update with upsert."""
     from services.trends_store import save_trends
 
-    with patch("services.trends_store.get_trends_collection") as mock_get:
+    with patch("services.trends_store.get_trends_collection") as mock_get, \
+            patch("services.trends_store.get_trends_meta_collection"), \
+            patch("services.trends_store.get_trends_snapshots_collection"), \
+            patch("services.trends_store.get_trends_changes_collection"):
         mock_coll = MagicMock()
         mock_get.return_value = mock_coll
 
         save_trends("US", [{"title": "Topic 1"}, {"title": "Topic 2"}], source="api")
 
-        mock_coll.update_one.assert_called_once()
-        call_args = mock_coll.update_one.call_args
+        mock_coll.find_one_and_update.assert_called_once()
+        call_args = mock_coll.find_one_and_update.call_args
         assert call_args[0][0] == {"country": "US"}
         assert "$set" in call_args[0][1]
         assert call_args[0][1]["$set"]["topics"] == [{"title": "Topic 1"}, {"title": "Topic 2"}]
@@ -65,3 +69,206 @@ def test_get_trends_from_db_returns_document() -> None:
         assert result.country == "US"
         assert [t["title"] for t in result.topics] == ["A", "B"]
         assert result.source == "api"
+
+
+def test_save_trends_bumps_version_document() -> None:
+    """save_trends increments the trends version and records the country's updated_at."""
+    from services.trends_store import TRENDS_VERSION_ID, save_trends
+
+    with patch("services.trends_store.get_trends_collection") as mock_get, \
+            patch("services.trends_store.get_trends_meta_collection") as mock_meta, \
+            patch("services.trends_store.get_trends_snapshots_collection"), \
+            patch("services.trends_store.get_trends_changes_collection"):
+        save_trends("fr", ["A"], source="scraper")
+
+    written = mock_get.return_value.find_one_and_update.call_args[0][1]["$set"]
+    filt, update = mock_meta.return_value.update_one.call_args[0]
+    assert filt == {"_id": TRENDS_VERSION_ID}
+    assert update["$inc"] == {"version": 1}
+    assert update["$set"] == {"countries.FR": written["updated_at"]}
+    assert mock_meta.return_value.update_one.call_args[1]["upsert"] is True
+
+
+def test_save_trends_appends_snapshot() -> None:
+    """save_trends inserts a history snapshot matching the upserted document."""
+    from services.trends_store import save_trends
+
+    with patch("services.trends_store.get_trends_collection") as mock_get, \
+            patch("services.trends_store.get_trends_meta_collection"), \
+            patch("services.trends_store.get_trends_snapshots_collection") as mock_snap, \
+            patch("services.trends_store.get_trends_changes_collection"):
+        save_trends("de", [{"title": "A", "search_volume": "10K+"}], source="feed")
+
+    written = mock_get.return_value.find_one_and_update.call_args[0][1]["$set"]
+    snapshot = mock_snap.return_value.insert_one.call_args[0][0]
+    assert snapshot == {
+        "country": "DE",
+        "topics": written["topics"],
+        "topics_hash": written["topics_hash"],
+        "source": "feed",
+        "fetched_at": written["fetched_at"],
+    }
+    assert snapshot is not written
+
+
+def test_save_trends_stores_changes_against_replaced_topics() -> None:
+    """save_trends diffs against the document it replaced and upserts the delta."""
+    from pymongo import ReturnDocument
+
+    from services.trends_store import save_trends
+
+    before = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with patch("services.trends_store.get_trends_collection") as mock_get, \
+            patch("services.trends_store.get_trends_meta_collection"), \
+            patch("services.trends_store.get_trends_snapshots_collection"), \
+            patch("services.trends_store.get_trends_changes_collection") as mock_changes:
+        mock_get.return_value.find_one_and_update.return_value = {"topics": ["A", "B"], "fetched_at": before}
+        changes = save_trends("us", [{"title": "B"}, {"title": "C"}], source="feed")
+
+    kwargs = mock_get.return_value.find_one_and_update.call_args[1]
+    assert kwargs["return_document"] is ReturnDocument.BEFORE
+    assert kwargs["projection"] == {"_id": 0, "topics": 1, "fetched_at": 1}
+    assert changes["previous_fetched_at"] == before
+    assert changes["new"] == [{"title": "C", "rank": 2}]
+    assert changes["dropped"] == [{"title": "A", "previous_rank": 1}]
+    assert changes["moved"] == [{"title": "B", "rank": 1, "previous_rank": 2, "rank_change": 1}]
+    filt, update = mock_changes.return_value.update_one.call_args[0]
+    assert filt == {"country": "US"}
+    assert update == {"$set": changes}
+
+
+def test_save_trends_first_save_has_no_changes() -> None:
+    """Without a previous document there is nothing to diff against."""
+    from services.trends_store import save_trends
+
+    with patch("services.trends_store.get_trends_collection") as mock_get, \
+            patch("services.trends_store.get_trends_meta_collection"), \
+            patch("services.trends_store.get_trends_snapshots_collection"), \
+            patch("services.trends_store.get_trends_changes_collection") as mock_changes:
+        mock_get.return_value.find_one_and_update.return_value = None
+        assert save_trends("US", ["A"]) is None
+
+    mock_changes.return_value.update_one.assert_not_called()
+
+
+def test_topics_hash_is_stable_and_content_based() -> None:
+    """topics_hash ignores key order and changes with the topics."""
+    from services.trends_store import topics_hash
+
+    a = topics_hash([{"title": "A", "search_volume": "1M+"}])
+    assert a == topics_hash([{"search_volume": "1M+", "title": "A"}])
+    assert a != topics_hash([{"title": "A", "search_volume": "2M+"}])
+
+
+def test_get_trends_from_db_computes_missing_topics_hash() -> None:
+    """Legacy documents without topics_hash get one computed on read."""
+    from services.trends_store import get_trends_from_db, topics_hash
+
+    now = datetime.now(timezone.utc)
+    doc = {"country": "US", "topics": ["A"], "source": "api", "fetched_at": now, "updated_at": now}
+    with patch("services.trends_store.get_trends_collection") as mock_get:
+        mock_get.return_value.find_one.return_value = doc
+        result = get_trends_from_db("US")
+
+    assert result.topics_hash == topics_hash([{"title": "A"}])
+
+
+def test_save_trends_stores_preserialized_response() -> None:
+    """save_trends writes the /trends JSON body with a gzip variant; no topics means no stored body."""
+    import gzip
+    import json
+
+    from services.trends_store import save_trends
+
+    with patch("services.trends_store.get_trends_collection") as mock_get, \
+            patch("services.trends_store.get_trends_meta_collection"), \
+            patch("services.trends_store.get_trends_snapshots_collection"), \
+            patch("services.trends_store.get_trends_changes_collection"):
+        save_trends("us", [{"title": "A"}], source="feed")
+        written = mock_get.return_value.find_one_and_update.call_args[0][1]["$set"]
+        save_trends("us", [], source="feed")
+        empty = mock_get.return_value.find_one_and_update.call_args[0][1]["$set"]
+
+    response = written["response"]
+    assert response["etag"] == trends_etag(written["topics_hash"], written["fetched_at"])
+    body = json.loads(response["encodings"]["identity"])
+    assert body["country"] == "US" and body["source"] == "db" and body["topics"] == [{"title": "A"}]
+    assert body["fetched_at"] == written["fetched_at"].replace(tzinfo=None, microsecond=written["fetched_at"].microsecond // 1000 * 1000).isoformat()
+    assert gzip.decompress(response["encodings"]["gzip"]) == response["encodings"]["identity"]
+    assert empty["response"] is None
+
+
+def test_save_trends_stores_brotli_variant_when_available() -> None:
+    """With the brotli package installed, a br body is stored as well."""
+    brotli = pytest.importorskip("brotli")
+    from services.trends_store import _build_trends_doc
+
+    encodings = _build_trends_doc("US", ["A"], "feed")["response"]["encodings"]
+    assert brotli.decompress(encodings["br"]) == encodings["identity"]
+
+
+def test_save_trends_parses_volume_and_started_at() -> None:
+    """save_trends stores numeric volume and absolute started_at; the hash covers the stored topics."""
+    from services.trends_store import save_trends, topics_hash
+
+    topics = [{"title": "A", "search_volume": "200K+", "started": "2 hours ago"}, {"title": "B"}]
+    with patch("services.trends_store.get_trends_collection") as mock_get, \
+            patch("services.trends_store.get_trends_meta_collection"), \
+            patch("services.trends_store.get_trends_snapshots_collection"), \
+            patch("services.trends_store.get_trends_changes_collection"):
+        save_trends("fr", topics, source="feed")
+
+    written = mock_get.return_value.find_one_and_update.call_args[0][1]["$set"]
+    first = written["topics"][0]
+    assert first["volume"] == 200_000
+    started_at = datetime.fromisoformat(first["started_at"].replace("Z", "+00:00"))
+    assert abs((written["fetched_at"] - started_at).total_seconds() - 7200) < 2
+    assert written["topics"][1] == {"title": "B"}
+    assert written["topics_hash"] == topics_hash(written["topics"])
+
+
+def test_topics_hash_changes_when_started_at_moves() -> None:
+    """The same relative start time saved at different refresh times is a different body, so a different ETag."""
+    from services.trends_store import _build_trends_doc
+
+    topics = [{"title": "A", "started": "5 hours ago"}]
+    with patch("services.trends_store.datetime") as mock_dt:
+        mock_dt.now.return_value = datetime(2026, 10, 17, 8, tzinfo=timezone.utc)
+        first = _build_trends_doc("US", topics, "feed")
+        mock_dt.now.return_value = datetime(2026, 10, 17, 12, tzinfo=timezone.utc)
+        second = _build_trends_doc("US", topics, "feed")
+
+    assert first["topics"][0]["started_at"] != second["topics"][0]["started_at"]
+    assert first["topics_hash"] != second["topics_hash"]
+    assert first["response"]["etag"] != second["response"]["etag"]
+
+
+def test_save_trends_stores_search_tokens_per_title() -> None:
+    """save_trends stores folded title tokens for /trends/search, kept out of the history snapshot."""
+    from services.trends_store import save_trends
+
+    with patch("services.trends_store.get_trends_collection") as mock_get, \
+            patch("services.trends_store.get_trends_meta_collection"), \
+            patch("services.trends_store.get_trends_snapshots_collection") as mock_snap, \
+            patch("services.trends_store.get_trends_changes_collection"):
+        save_trends("fr", [{"title": "Météo: Tempête Ciarán"}, {"title": "PSG"}], source="feed")
+
+    written = mock_get.return_value.find_one_and_update.call_args[0][1]["$set"]
+    assert written["title_tokens"] == [["meteo", "tempete", "ciaran"], ["psg"]]
+    assert "title_tokens" not in mock_snap.return_value.insert_one.call_args[0][0]
+
+
+def test_save_trends_stores_minhash_signatures_per_title() -> None:
+    """save_trends stores one MinHash signature per title for /trends/global, kept out of the history snapshot."""
+    from services.trends_clusters import minhash
+    from services.trends_store import save_trends
+
+    with patch("services.trends_store.get_trends_collection") as mock_get, \
+            patch("services.trends_store.get_trends_meta_collection"), \
+            patch("services.trends_store.get_trends_snapshots_collection") as mock_snap, \
+            patch("services.trends_store.get_trends_changes_collection"):
+        save_trends("gb", [{"title": "Champions League final"}, "Weather"], source="feed")
+
+    written = mock_get.return_value.find_one_and_update.call_args[0][1]["$set"]
+    assert written["title_minhash"] == [minhash("Champions League final"), minhash("Weather")]
+    assert "title_minhash" not in mock_snap.return_value.insert_one.call_args[0][0]
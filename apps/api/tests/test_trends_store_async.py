@@ -0,0 +1,160 @@
+"""Tests for async trends storage."""
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from models import TrendsDocument
+
+
+class _Cursor:
+    def __init__(self, rows: list[dict]) -> None:
+        self._it = iter(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+async def test_save_trends_upserts() -> None:
+    """Async save_trends awaits find_one_and_update with upsert."""
+    from services.trends_store_async import save_trends
+
+    with patch("services.trends_store_async.get_async_trends_collection") as mock_get, \
+            patch("services.trends_store_async.get_async_trends_meta_collection") as mock_meta, \
+            patch("services.trends_store_async.get_async_trends_snapshots_collection") as mock_snap, \
+            patch("services.trends_store_async.get_async_trends_changes_collection") as mock_changes:
+        mock_coll = MagicMock()
+        mock_coll.find_one_and_update = AsyncMock(return_value={"topics": [{"title": "Topic 2"}]})
+        mock_get.return_value = mock_coll
+        mock_meta.return_value.update_one = AsyncMock()
+        mock_snap.return_value.insert_one = AsyncMock()
+        mock_changes.return_value.update_one = AsyncMock()
+
+        changes = await save_trends("us", ["Topic 1", {"title": "Topic 2"}], source="scraper")
+
+        mock_coll.find_one_and_update.assert_awaited_once()
+        call_args = mock_coll.find_one_and_update.call_args
+        assert call_args[0][0] == {"country": "US"}
+        assert call_args[0][1]["$set"]["topics"] == [{"title": "Topic 1"}, {"title": "Topic 2"}]
+        assert call_args[0][1]["$set"]["source"] == "scraper"
+        assert call_args[1]["upsert"] is True
+        mock_meta.return_value.update_one.assert_awaited_once()
+        mock_snap.return_value.insert_one.assert_awaited_once()
+        mock_changes.return_value.update_one.assert_awaited_once()
+        assert [t["title"] for t in changes["new"]] == ["Topic 1"]
+
+
+async def test_get_trends_from_db_returns_none_when_empty() -> None:
+    """Async get_trends_from_db returns None when no document exists."""
+    from services.trends_store_async import get_trends_from_db
+
+    with patch("services.trends_store_async.get_async_trends_collection") as mock_get:
+        mock_coll = MagicMock()
+        mock_coll.find_one = AsyncMock(return_value=None)
+        mock_get.return_value = mock_coll
+
+        assert await get_trends_from_db("US") is None
+
+
+async def test_get_trends_from_db_returns_document() -> None:
+    """Async get_trends_from_db returns TrendsDocument when data exists."""
+    from services.trends_store_async import get_trends_from_db
+
+    now = datetime.now(timezone.utc)
+    doc = {"country": "FR", "topics": ["A", {"title": "B"}], "source": "scraper", "fetched_at": now, "updated_at": now}
+    with patch("services.trends_store_async.get_async_trends_collection") as mock_get:
+        mock_coll = MagicMock()
+        mock_coll.find_one = AsyncMock(return_value=doc)
+        mock_get.return_value = mock_coll
+
+        result = await get_trends_from_db("fr")
+
+    assert mock_coll.find_one.call_args[0][0] == {"country": "FR"}
+    assert "response" not in mock_coll.find_one.call_args[0][1]
+    assert isinstance(result, TrendsDocument)
+    assert [t["title"] for t in result.topics] == ["A", "B"]
+    assert result.source == "scraper"
+
+
+async def test_get_trends_for_countries_uses_single_in_query() -> None:
+    """get_trends_for_countries issues one projected $in query and maps results by country."""
+    from services.trends_store_async import get_trends_for_countries
+
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"country": "US", "topics": [{"title": "A"}], "source": "scraper", "fetched_at": now, "updated_at": now},
+        {"country": "GB", "topics": [{"title": "B"}], "source": "scraper", "fetched_at": now, "updated_at": now},
+    ]
+
+    with patch("services.trends_store_async.get_async_trends_collection") as mock_get:
+        mock_get.return_value.find = MagicMock(return_value=_Cursor(rows))
+        result = await get_trends_for_countries(["us", "gb", "fr"])
+
+    query, projection = mock_get.return_value.find.call_args[0]
+    assert query == {"country": {"$in": ["US", "GB", "FR"]}}
+    assert projection["_id"] == 0
+    assert set(result) == {"US", "GB"}
+    assert result["GB"].topics == [{"title": "B"}]
+
+
+async def test_get_trends_search_entries_maps_titles_tokens_and_volumes() -> None:
+    """get_trends_search_entries reads every country (or the changed ones) into search index entries."""
+    from services.trends_store_async import get_trends_search_entries
+
+    now = datetime.now(timezone.utc)
+    rows = [{
+        "country": "US",
+        "topics": [{"title": "Alpha", "volume": 2000}, "Legacy"],
+        "title_tokens": [["alpha"], ["legacy"]],
+        "updated_at": now,
+    }]
+
+    with patch("services.trends_store_async.get_async_trends_collection") as mock_get:
+        mock_get.return_value.find = MagicMock(return_value=_Cursor(rows))
+        result = await get_trends_search_entries(["us"])
+
+    query, projection = mock_get.return_value.find.call_args[0]
+    assert query == {"country": {"$in": ["US"]}}
+    assert "title_tokens" in projection and "title_minhash" not in projection and "response" not in projection
+    assert result == {"US": {
+        "titles": ["Alpha", "Legacy"], "title_tokens": [["alpha"], ["legacy"]], "volumes": [2000, None], "updated_at": now,
+    }}
+
+
+async def test_get_trends_cluster_entries_reads_stored_signatures() -> None:
+    """get_trends_cluster_entries projects titles and MinHash signatures, not search tokens."""
+    from services.trends_store_async import get_trends_cluster_entries
+
+    rows = [{"country": "GB", "topics": [{"title": "A"}], "title_minhash": [b"sig"], "updated_at": None}]
+
+    with patch("services.trends_store_async.get_async_trends_collection") as mock_get:
+        mock_get.return_value.find = MagicMock(return_value=_Cursor(rows))
+        result = await get_trends_cluster_entries()
+
+    query, projection = mock_get.return_value.find.call_args[0]
+    assert query == {}
+    assert "title_minhash" in projection and "title_tokens" not in projection
+    assert result == {"GB": {"titles": ["A"], "volumes": [None], "updated_at": None, "title_minhash": [b"sig"]}}
+
+
+async def test_iter_trends_history_uses_batched_projected_cursor() -> None:
+    """iter_trends_history queries the time range newest first on a batched, projected cursor."""
+    from services.trends_store_async import HISTORY_BATCH_SIZE, iter_trends_history
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2026, 2, 1, tzinfo=timezone.utc)
+    rows = [{"country": "US", "topics": [{"title": "A"}], "source": "feed", "fetched_at": end}]
+    with patch("services.trends_store_async.get_async_trends_snapshots_collection") as mock_get:
+        mock_get.return_value.find = MagicMock(return_value=_Cursor(rows))
+        result = [doc async for doc in iter_trends_history("us", start, end, limit=10)]
+
+    (query, projection), kwargs = mock_get.return_value.find.call_args
+    assert query == {"country": "US", "fetched_at": {"$gte": start, "$lte": end}}
+    assert projection["_id"] == 0 and "topics_hash" not in projection
+    assert kwargs == {"sort": [("fetched_at", -1)], "limit": 10, "batch_size": HISTORY_BATCH_SIZE}
+    assert result == rows
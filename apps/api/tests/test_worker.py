@@ -0,0 +1,217 @@
+"""Tests for the trends worker."""
+
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import worker
+
+
+def test_run_saves_every_country_sequentially() -> None:
+    """run() fetches and saves each configured country in order."""
+    with patch.dict(os.environ, {"TRENDS_COUNTRIES": "us,GB", "TRENDS_WORKER_CONCURRENCY": "1"}), \
+            patch("worker.get_trending_topics", side_effect=lambda c, scraper=None: ([{"title": f"{c} topic"}], "scraper")), \
+            patch("worker.save_trends") as mock_save:
+        worker.run()
+
+    assert [c.args[0] for c in mock_save.call_args_list] == ["US", "GB"]
+    mock_save.assert_any_call("US", [{"title": "US topic"}], source="scraper")
+
+
+def test_run_concurrent_is_bounded_and_isolates_failures() -> None:
+    """run(concurrency=N) scrapes in parallel, never above N, and one failure doesn't stop others."""
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_fetch(country: str, scraper=None):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        if country == "FR":
+            raise RuntimeError("scrape failed")
+        return [{"title": country}], "scraper"
+
+    with patch.dict(os.environ, {"TRENDS_COUNTRIES": "US,GB,FR,DE,JP,IN"}), \
+            patch("worker.get_trending_topics", side_effect=fake_fetch), \
+            patch("worker.save_trends") as mock_save:
+        worker.run(concurrency=3)
+
+    assert 1 < peak <= 3
+    saved = sorted(c.args[0] for c in mock_save.call_args_list)
+    assert saved == ["DE", "GB", "IN", "JP", "US"]
+
+
+def test_get_concurrency_from_env() -> None:
+    """TRENDS_WORKER_CONCURRENCY sets the default concurrency; invalid values fall back to 1."""
+    with patch.dict(os.environ, {"TRENDS_WORKER_CONCURRENCY": "4"}):
+        assert worker.get_concurrency() == 4
+    with patch.dict(os.environ, {"TRENDS_WORKER_CONCURRENCY": "nope"}):
+        assert worker.get_concurrency() == 1
+
+
+def test_search_budget_is_shared_cap() -> None:
+    """SearchBudget hands out at most `limit` searches."""
+    budget = worker.SearchBudget(2)
+    assert [budget.take() for _ in range(3)] == [True, True, False]
+    assert budget.used == 2
+
+
+def test_prefetch_mentions_top_n_within_budget() -> None:
+    """prefetch_mentions fetches the top N topics and stops at the run budget."""
+    topics = [{"title": "A"}, {"title": "B"}, {"title": "C"}, {"title": "D"}]
+    budget = worker.SearchBudget(2)
+
+    with patch.dict(os.environ, {"SERPAPI_KEY": "key"}), \
+            patch("worker.fetch_topic_mentions", return_value=[{"title": "m", "link": "x"}]) as mock_fetch, \
+            patch("worker.save_mentions") as mock_save:
+        saved = worker.prefetch_mentions("US", topics, budget, top_n=3, concurrency=2)
+
+    assert saved == 2
+    assert mock_fetch.call_count == 2
+    assert {c.args[1] for c in mock_save.call_args_list} <= {"A", "B", "C"}
+    assert all(c.kwargs["limit"] == 25 for c in mock_fetch.call_args_list)
+
+
+def test_prefetch_mentions_requires_serpapi_key() -> None:
+    """prefetch_mentions is a no-op without SERPAPI_KEY."""
+    with patch.dict(os.environ, {"SERPAPI_KEY": ""}), patch("worker.fetch_topic_mentions") as mock_fetch:
+        assert worker.prefetch_mentions("US", [{"title": "A"}], worker.SearchBudget(5), top_n=1) == 0
+    mock_fetch.assert_not_called()
+
+
+def test_refresh_country_runs_prefetch_stage_after_save() -> None:
+    """refresh_country prefetches mentions after save_trends when enabled."""
+    calls: list[str] = []
+    with patch.dict(os.environ, {"TRENDS_PREFETCH_MENTIONS": "2", "SERPAPI_KEY": "key"}), \
+            patch("worker.get_trending_topics", return_value=([{"title": "A"}], "feed")), \
+            patch("worker.save_trends", side_effect=lambda *a, **kw: calls.append("save")), \
+            patch("worker.prefetch_mentions", side_effect=lambda *a, **kw: calls.append("prefetch") or 1):
+        assert worker.refresh_country("US", budget=worker.SearchBudget(5)) is True
+
+    assert calls == ["save", "prefetch"]
+
+
+def test_write_metrics_file(tmp_path) -> None:
+    """The worker writes its metrics in Prometheus text format to the given file."""
+    from worker import write_metrics_file
+
+    path = tmp_path / "worker.prom"
+    write_metrics_file(str(path))
+
+    assert "# TYPE hanfani_scraper_outcomes_total counter" in path.read_text()
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_run_returns_report_with_stage_timings() -> None:
+    """run() returns a report with per-country source, item count, errors and nested stages."""
+    def fake_fetch(country: str, scraper=None):
+        if country == "FR":
+            raise RuntimeError("scrape failed")
+        return [{"title": "A"}, {"title": "B"}], "feed"
+
+    with patch.dict(os.environ, {"TRENDS_COUNTRIES": "US,FR"}), \
+            patch("worker.get_trending_topics", side_effect=fake_fetch), \
+            patch("worker.save_trends", return_value=None):
+        report = worker.run(concurrency=1)
+
+    assert (report["ok"], report["failed"], report["concurrency"]) == (1, 1, 1)
+    assert report["finished_at"] >= report["started_at"]
+    us, fr = report["countries"]
+    assert us["country"] == "US" and us["ok"] is True
+    assert (us["source"], us["items"]) == ("feed", 2)
+    assert [s["name"] for s in us["stages"]] == ["get_trending_topics", "save_trends"]
+    assert fr["ok"] is False
+    assert fr["error"] == "RuntimeError: scrape failed"
+    assert fr["stages"][0]["attrs"]["error"] == "RuntimeError: scrape failed"
+
+
+def test_main_persists_run_report() -> None:
+    """The worker entry point stores the run report in worker_runs."""
+    report = {"ok": 1, "failed": 0, "duration_ms": 12.0, "countries": []}
+    with patch("worker.open_client"), patch("worker.ensure_indexes"), patch("worker.close_client"), \
+            patch("worker.run", return_value=report), \
+            patch("worker.save_worker_run") as mock_save:
+        worker.main([])
+
+    mock_save.assert_called_once_with(report)
+
+
+def test_daemon_reschedules_by_change_and_retries_failures() -> None:
+    """daemon() refreshes due countries, stores a report per batch and reschedules each from its result."""
+    clock = [0.0]
+    stop = threading.Event()
+    calls: list[tuple[float, str]] = []
+
+    def fake_fetch(country: str, scraper=None):
+        calls.append((clock[0], country))
+        if country == "FR" and clock[0] < 600:
+            raise RuntimeError("scrape failed")
+        return [{"title": "A"}], "feed"
+
+    def fake_save(country, topics, source="api"):
+        return {"new": ["A"], "dropped": [], "moved": []} if country == "US" else {"new": [], "dropped": [], "moved": []}
+
+    def fake_wait(timeout=None):
+        clock[0] += timeout
+        if clock[0] >= 3000:
+            stop.set()
+        return stop.is_set()
+
+    env = {
+        "TRENDS_COUNTRIES": "US,GB,FR",
+        "TRENDS_REFRESH_MIN_MINUTES": "10",
+        "TRENDS_REFRESH_MAX_MINUTES": "60",
+        "TRENDS_REFRESH_RETRY_MINUTES": "5",
+    }
+    with patch.dict(os.environ, env), patch("worker.get_trending_topics", side_effect=fake_fetch), \
+            patch("worker.save_trends", side_effect=fake_save), patch("worker.save_worker_run") as mock_save_run, \
+            patch.object(stop, "wait", side_effect=fake_wait):
+        worker.daemon(concurrency=1, stop=stop, clock=lambda: clock[0])
+
+    assert calls[:3] == [(0.0, "US"), (0.0, "GB"), (0.0, "FR")]
+    # FR retried after 5 min, then 10; US (all topics new) every 10 min; GB (unchanged) not before 60 min
+    assert [t for t, c in calls if c == "FR"][:3] == [0.0, 300.0, 900.0]
+    assert [t for t, c in calls if c == "US"] == [0.0, 600.0, 1200.0, 1800.0, 2400.0]
+    assert [t for t, c in calls if c == "GB"] == [0.0]
+    assert mock_save_run.call_count >= 5
+    assert mock_save_run.call_args_list[0].args[0]["failed"] == 1
+
+
+def test_daemon_retries_fallback_source_with_backoff() -> None:
+    """When every live source fails (sample topics saved with source="fallback"), the country backs off."""
+    clock = [0.0]
+    stop = threading.Event()
+    calls: list[float] = []
+
+    def fake_fetch(country: str, scraper=None):
+        calls.append(clock[0])
+        return [{"title": "Sample"}], "fallback"
+
+    def fake_wait(timeout=None):
+        clock[0] += timeout
+        if clock[0] >= 3000:
+            stop.set()
+        return stop.is_set()
+
+    env = {
+        "TRENDS_COUNTRIES": "US",
+        "TRENDS_REFRESH_MIN_MINUTES": "10",
+        "TRENDS_REFRESH_MAX_MINUTES": "60",
+        "TRENDS_REFRESH_RETRY_MINUTES": "5",
+    }
+    with patch.dict(os.environ, env), patch("worker.get_trending_topics", side_effect=fake_fetch), \
+            patch("worker.save_trends", return_value={"new": [], "dropped": [], "moved": []}), \
+            patch("worker.save_worker_run"), patch.object(stop, "wait", side_effect=fake_wait), \
+            patch("worker.RefreshScheduler.record_failure", autospec=True,
+                  side_effect=worker.RefreshScheduler.record_failure) as mock_failure:
+        worker.daemon(concurrency=1, stop=stop, clock=lambda: clock[0])
+
+    # Retried after 5, 10, 20 min (backoff), not after the 60 min max interval
+    assert calls[:4] == [0.0, 300.0, 900.0, 2100.0]
+    assert mock_failure.call_count >= 3
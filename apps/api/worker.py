@@ -7,35 +7,202 @@ Run manually or schedule with cron (e.g. every 24 hours):
 
   0 0 * * * /path/to/apps/api/run-worker.sh
 
+Or keep it running with --daemon: each country is refreshed on its own
+adaptive interval (see services/scheduler.py) instead of once a day.
+With --distributed, several worker processes share one pass by claiming
+countries through leases in MongoDB (see services/leases.py).
+
 Set MONGODB_URI and MONGODB_DB for your environment.
+Scrape several countries in parallel with --concurrency N (or TRENDS_WORKER_CONCURRENCY=N).
+Prefetch SerpApi mentions for the top N topics with TRENDS_PREFETCH_MENTIONS=N.
 """
 
 from __future__ import annotations
 
+import argparse
 import os
 import sys
+import queue
+import signal
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any
 
 # Ensure apps/api is on path when run as module
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from db import close_client, ensure_indexes, get_pool_stats, open_client
+from services import metrics
+from services.leases import LeaseLost, LeaseManager
+from services.mentions_store import save_mentions
+from services.scheduler import RefreshScheduler, change_ratio
+from services.topic_mentions import API_LIMIT, fetch_topic_mentions
+from services.tracing import span, trace
 from services.trends import get_trending_topics
+from services.trends_scraper import ScraperSession
 from services.trends_store import save_trends
+from services.worker_runs_store import save_worker_run
 
 # Countries to scrape (configurable via env: TRENDS_COUNTRIES=US,GB,FR,...)
 DEFAULT_COUNTRIES = ["US", "GB", "FR", "DE", "IN", "JP", "BR", "CA", "AU", "ES", "CR"]
 
 
-def run() -> None:
-    """Scrape trends for all configured countries and save to MongoDB."""
+def get_countries() -> list[str]:
+    """Countries to refresh: TRENDS_COUNTRIES if set, else DEFAULT_COUNTRIES."""
     countries_str = os.getenv("TRENDS_COUNTRIES", "")
-    countries = [c.strip().upper() for c in countries_str.split(",") if c.strip()] if countries_str else DEFAULT_COUNTRIES
+    return [c.strip().upper() for c in countries_str.split(",") if c.strip()] if countries_str else DEFAULT_COUNTRIES
 
-    for country in countries:
+
+def get_concurrency() -> int:
+    """Number of countries scraped in parallel (TRENDS_WORKER_CONCURRENCY, default 1)."""
+    try:
+        return max(1, int(os.getenv("TRENDS_WORKER_CONCURRENCY", "1")))
+    except ValueError:
+        return 1
+
+
+class SearchBudget:
+    """Per-run cap on SerpApi searches, shared by every worker thread."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(0, limit)
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        """Reserve one search; False once the budget is spent."""
+        with self._lock:
+            if self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+
+def get_prefetch_top_n() -> int:
+    """Topics per country to prefetch mentions for (TRENDS_PREFETCH_MENTIONS, default 0 = off)."""
+    try:
+        return max(0, int(os.getenv("TRENDS_PREFETCH_MENTIONS", "0")))
+    except ValueError:
+        return 0
+
+
+def prefetch_mentions(
+    country: str,
+    topics: list,
+    budget: SearchBudget,
+    top_n: int | None = None,
+    concurrency: int | None = None,
+) -> int:
+    """
+    Fetch SerpApi mentions for a country's top topics and store them for /trends/mentions.
+
+    Bounded by `concurrency` parallel calls (TRENDS_PREFETCH_CONCURRENCY, default 4)
+    and by the shared per-run `budget`. No-op without SERPAPI_KEY.
+
+    Returns:
+        Number of topics whose mentions were saved.
+    """
+    if not os.getenv("SERPAPI_KEY", "").strip():
+        return 0
+    n = get_prefetch_top_n() if top_n is None else top_n
+    titles = [t.get("title", "") if isinstance(t, dict) else str(t) for t in topics[:n]]
+    titles = [t for t in titles if t]
+    if not titles:
+        return 0
+
+    def _prefetch(title: str) -> bool:
+        if not budget.take():
+            return False
+        mentions = fetch_topic_mentions(title, country, limit=API_LIMIT)
+        if not mentions:
+            return False
+        save_mentions(country, title, mentions)
+        return True
+
+    workers = concurrency or max(1, int(os.getenv("TRENDS_PREFETCH_CONCURRENCY", "4")))
+    with ThreadPoolExecutor(max_workers=min(workers, len(titles)), thread_name_prefix="mentions") as pool:
+        return sum(pool.map(_prefetch, titles))
+
+
+class RunReport:
+    """Structured report of one worker run: per-country stage timings, source and item counts."""
+
+    def __init__(self, concurrency: int) -> None:
+        self.concurrency = concurrency
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at: datetime | None = None
+        self.duration_ms: float | None = None
+        self.countries: list[dict[str, Any]] = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, entry: dict[str, Any]) -> None:
+        """Record one country's result (called from lane threads)."""
+        with self._lock:
+            self.countries.append(entry)
+
+    def finish(self) -> None:
+        self.finished_at = datetime.now(timezone.utc)
+        self.duration_ms = round((time.perf_counter() - self._start) * 1000, 2)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Document stored in worker_runs and served by /worker/runs."""
+        ok = sum(1 for c in self.countries if c["ok"])
+        return {
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_ms": self.duration_ms,
+            "concurrency": self.concurrency,
+            "ok": ok,
+            "failed": len(self.countries) - ok,
+            "countries": list(self.countries),
+        }
+
+
+def refresh_country(
+    country: str,
+    scraper: ScraperSession | None = None,
+    budget: SearchBudget | None = None,
+    report: RunReport | None = None,
+    still_leased: Callable[[], bool] | None = None,
+) -> bool:
+    """
+    Fetch and save trends for one country, then optionally prefetch mentions.
+
+    scraper: browser session to reuse (one per worker thread); None launches one per call.
+    budget: SerpApi budget for the mentions prefetch stage; None skips the stage.
+    report: run report receiving this country's stage timings, source and item count.
+    still_leased: checked right before save_trends (--distributed); when it returns
+        False the lease was lost and the country is not saved, since another worker
+        may now own it.
+
+    Errors are caught and reported so one failing country never stops the run.
+    Output is printed in one block so parallel refreshes don't interleave.
+
+    Returns:
+        True if the country was saved, False on error.
+    """
+    lines = [f"Fetching trends from Google Trends for {country}..."]
+    entry: dict[str, Any] = {"country": country}
+    error: Exception | None = None
+    with trace("refresh", country=country) as root:
         try:
-            print(f"Fetching trends from Google Trends for {country}...")
-            topics, source = get_trending_topics(country)
-            save_trends(country, topics, source=source)
-            print(f"Saved {len(topics)} topics for {country} (source={source})")
+            with span("get_trending_topics"):
+                topics, source = get_trending_topics(country, scraper=scraper)
+            entry.update(source=source, items=len(topics))
+            if still_leased is not None and not still_leased():
+                raise LeaseLost(f"lease on {country} lost before save; another worker owns it")
+            with span("save_trends"):
+                changes = save_trends(country, topics, source=source)
+            lines.append(f"Saved {len(topics)} topics for {country} (source={source})")
+            if changes is not None:
+                entry["changes"] = {k: len(changes[k]) for k in ("new", "dropped", "moved")}
+                lines.append(
+                    f"  changes: {len(changes['new'])} new, {len(changes['dropped'])} dropped, {len(changes['moved'])} moved"
+                )
             for i, t in enumerate(topics[:5], 1):
                 title = t.get("title", t) if isinstance(t, dict) else t
                 vol = t.get("search_volume", "") if isinstance(t, dict) else ""
@@ -46,12 +213,261 @@ def run() -> None:
                 if started:
                     extra.append(f"started={started}")
                 suffix = f"  [{', '.join(extra)}]" if extra else ""
-                print(f"  {i}. {title}{suffix}")
+                lines.append(f"  {i}. {title}{suffix}")
             if len(topics) > 5:
-                print(f"  ... and {len(topics) - 5} more")
+                lines.append(f"  ... and {len(topics) - 5} more")
+            if budget is not None and get_prefetch_top_n() > 0:
+                with span("prefetch_mentions") as stage:
+                    try:
+                        count = prefetch_mentions(country, topics, budget)
+                        if stage is not None:
+                            stage.set(items=count)
+                        lines.append(f"Prefetched mentions for {count} topics ({budget.used}/{budget.limit} searches used)")
+                    except Exception as e:
+                        lines.append(f"Mentions prefetch failed for {country}: {e}")
+        except Exception as e:
+            error = e
+            entry["error"] = f"{type(e).__name__}: {e}"
+
+    if report is not None:
+        tree = root.to_dict()
+        report.add({**entry, "ok": error is None, "duration_ms": tree["duration_ms"], "stages": tree.get("children", [])})
+
+    print("\n".join(lines), flush=True)
+    if error is not None:
+        print(f"Error fetching {country}: {error}", file=sys.stderr, flush=True)
+        return False
+    return True
+
+
+def _run_lane(pending: queue.Queue[str], budget: SearchBudget, report: RunReport | None = None) -> None:
+    """Refresh countries from the queue until empty, sharing one browser for the lane."""
+    with ScraperSession() as scraper:
+        while True:
+            try:
+                country = pending.get_nowait()
+            except queue.Empty:
+                return
+            refresh_country(country, scraper=scraper, budget=budget, report=report)
+
+
+def _refresh_batch(countries: list[str], concurrency: int, budget: SearchBudget) -> RunReport:
+    """Refresh `countries` over up to `concurrency` lanes and return the finished report."""
+    workers = min(concurrency, len(countries))
+    pending: queue.Queue[str] = queue.Queue()
+    for country in countries:
+        pending.put(country)
+    report = RunReport(max(1, workers))
+
+    if workers <= 1:
+        _run_lane(pending, budget, report)
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="trends") as pool:
+            for future in [pool.submit(_run_lane, pending, budget, report) for _ in range(workers)]:
+                future.result()
+
+    report.finish()
+    return report
+
+
+def _get_budget() -> SearchBudget:
+    return SearchBudget(int(os.getenv("TRENDS_PREFETCH_BUDGET", "50")))
+
+
+def run(concurrency: int | None = None) -> dict[str, Any]:
+    """
+    Scrape trends for all configured countries and save to MongoDB.
+
+    Each lane (one per concurrent slot) launches a single browser and reuses it
+    for all of its countries.
+
+    Args:
+        concurrency: Max countries scraped at once. Defaults to TRENDS_WORKER_CONCURRENCY (1).
+
+    Returns:
+        The run report (RunReport.to_dict): per-country stage durations, source and item counts.
+    """
+    report = _refresh_batch(get_countries(), concurrency or get_concurrency(), _get_budget())
+    return report.to_dict()
+
+
+def _run_leased_lane(
+    countries: list[str],
+    leases: LeaseManager,
+    budget: SearchBudget,
+    report: RunReport,
+    poll_s: float,
+) -> None:
+    """Claim and refresh countries until every one has been attempted by some worker in this pass."""
+    with ScraperSession() as scraper:
+        while True:
+            country = leases.claim_next(countries)
+            if country is None:
+                if not leases.pending(countries):
+                    return
+                # The rest are leased elsewhere: wait for them to finish or for a dead worker's lease to expire
+                time.sleep(poll_s)
+                continue
+            ok = False
+            try:
+                with leases.keep_alive(country) as lost:
+                    ok = refresh_country(
+                        country, scraper=scraper, budget=budget, report=report,
+                        still_leased=lambda: leases.still_leased(country, lost),
+                    )
+            finally:
+                leases.release(country, ok)
+
+
+def run_distributed(concurrency: int | None = None, leases: LeaseManager | None = None) -> dict[str, Any]:
+    """
+    Refresh the configured countries together with other workers running this mode.
+
+    Each country is claimed with an atomic lease (services/leases.py), heartbeated
+    while it is scraped and released after save_trends, so no two workers scrape
+    the same country and a crashed worker's countries are picked up once its
+    lease expires. Returns this worker's report (only the countries it refreshed).
+    """
+    countries = get_countries()
+    leases = leases or LeaseManager()
+    workers = max(1, min(concurrency or get_concurrency(), len(countries)))
+    poll_s = min(5.0, leases.ttl_s / 4)
+    budget = _get_budget()
+    report = RunReport(workers)
+    print(f"Distributed worker {leases.owner}: {len(leases.pending(countries))} countries pending", flush=True)
+
+    if workers <= 1:
+        _run_leased_lane(countries, leases, budget, report, poll_s)
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="trends") as pool:
+            lanes = [pool.submit(_run_leased_lane, countries, leases, budget, report, poll_s) for _ in range(workers)]
+            for future in lanes:
+                future.result()
+
+    report.finish()
+    return {**report.to_dict(), "owner": leases.owner}
+
+
+def _reschedule(scheduler: RefreshScheduler, report: RunReport, now: float) -> None:
+    """
+    Feed each refreshed country's outcome and topic churn back into the schedule.
+
+    A "fallback" source means every live source failed and the static sample
+    topics were saved: that is retried with backoff, not treated as a quiet country.
+    """
+    for entry in report.countries:
+        country = entry["country"]
+        if entry["ok"] and entry.get("source") != "fallback":
+            changes = entry.get("changes")
+            interval = scheduler.record_success(country, change_ratio(changes, entry.get("items", 0)), now)
+            print(f"Next refresh for {country} in {interval / 60:.0f} min", flush=True)
+        else:
+            delay = scheduler.record_failure(country, now)
+            failures = scheduler.state(country).failures
+            print(f"Retrying {country} in {delay / 60:.0f} min (failure {failures})", flush=True)
+
+
+def daemon(
+    concurrency: int | None = None,
+    stop: threading.Event | None = None,
+    clock: Any = time.time,
+) -> None:
+    """
+    Keep refreshing countries as they fall due until `stop` is set.
+
+    Countries start due immediately. Every due country is refreshed in one
+    batch (same lanes as run()), the batch report is stored in worker_runs,
+    and each country is rescheduled from its result: changed topics shorten
+    its interval, unchanged ones lengthen it, failures back off exponentially.
+    The mentions prefetch budget (TRENDS_PREFETCH_BUDGET) is per day.
+    """
+    stop = stop or threading.Event()
+    scheduler = RefreshScheduler.from_env(get_countries(), now=clock())
+    workers = concurrency or get_concurrency()
+    budget, budget_reset_at = _get_budget(), clock() + 24 * 60 * 60
+    metrics_file = os.getenv("TRENDS_WORKER_METRICS_FILE", "").strip()
+
+    while not stop.is_set():
+        now = clock()
+        if now >= budget_reset_at:
+            budget, budget_reset_at = _get_budget(), now + 24 * 60 * 60
+        due = scheduler.pop_due(now)
+        if due:
+            report = _refresh_batch(due, workers, budget)
+            _reschedule(scheduler, report, clock())
+            try:
+                save_worker_run(report.to_dict())
+            except Exception as e:
+                print(f"Could not save run report: {e}", file=sys.stderr)
+            if metrics_file:
+                write_metrics_file(metrics_file)
+            continue
+        next_due = scheduler.next_due()
+        stop.wait(max(0.0, next_due - now) if next_due is not None else None)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Worker entry point: reuse one MongoDB pool for the whole run, then close it."""
+    parser = argparse.ArgumentParser(description="Scrape Google Trends and save to MongoDB.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Countries scraped in parallel (default: TRENDS_WORKER_CONCURRENCY or 1)",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--distributed",
+        action="store_true",
+        help="Share the pass with other workers: claim countries through MongoDB leases",
+    )
+    mode.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and refresh each country on its own adaptive interval (instead of one pass)",
+    )
+    args = parser.parse_args(argv)
+
+    open_client()
+    try:
+        ensure_indexes()
+    except Exception as e:
+        print(f"Could not create MongoDB indexes: {e}", file=sys.stderr)
+    try:
+        if args.daemon:
+            stop = threading.Event()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda *_: stop.set())
+            daemon(concurrency=args.concurrency, stop=stop)
+            return
+        report = (run_distributed if args.distributed else run)(concurrency=args.concurrency)
+        print(f"Run finished: {report['ok']} ok, {report['failed']} failed in {report['duration_ms'] / 1000:.1f}s")
+        try:
+            save_worker_run(report)
         except Exception as e:
-            print(f"Error fetching {country}: {e}", file=sys.stderr)
+            print(f"Could not save run report: {e}", file=sys.stderr)
+    finally:
+        print(f"MongoDB pool: {get_pool_stats()}")
+        close_client()
+        metrics_file = os.getenv("TRENDS_WORKER_METRICS_FILE", "").strip()
+        if metrics_file:
+            write_metrics_file(metrics_file)
+
+
+def write_metrics_file(path: str) -> None:
+    """
+    Write this run's metrics in Prometheus text format (node_exporter textfile collector).
+
+    Written to a temporary file and renamed so the collector never reads a partial file.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(metrics.render())
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Could not write metrics to {path}: {e}", file=sys.stderr)
 
 
 if __name__ == "__main__":
-    run()
+    main()